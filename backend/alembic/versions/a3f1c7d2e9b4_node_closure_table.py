@@ -0,0 +1,52 @@
+"""node closure table
+
+Revision ID: a3f1c7d2e9b4
+Revises: 4c389bbebfad
+Create Date: 2026-10-17 10:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c7d2e9b4'
+down_revision: Union[str, None] = '4c389bbebfad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('node_closure',
+    sa.Column('ancestor_id', sa.BigInteger(), nullable=False),
+    sa.Column('descendant_id', sa.BigInteger(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['node.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['node.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_node_closure_descendant_depth', 'node_closure', ['descendant_id', 'depth'], unique=False)
+
+    # 기존 프로젝트 전체를 한 번의 재귀 쿼리로 backfill
+    op.execute(
+        """
+        INSERT INTO node_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE walk(ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM node
+            UNION ALL
+            SELECT w.ancestor_id, n.id, w.depth + 1
+            FROM walk w
+            JOIN node n ON n.parent_id = w.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM walk
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_node_closure_descendant_depth', table_name='node_closure')
+    op.drop_table('node_closure')
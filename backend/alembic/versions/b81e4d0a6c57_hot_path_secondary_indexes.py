@@ -0,0 +1,52 @@
+"""hot path secondary indexes
+
+Revision ID: b81e4d0a6c57
+Revises: a3f1c7d2e9b4
+Create Date: 2026-10-17 11:03:27.544190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81e4d0a6c57'
+down_revision: Union[str, None] = 'a3f1c7d2e9b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial WHERE)
+INDEXES = [
+    ('ix_node_project_id', 'node', ['project_id'], None),
+    ('ix_node_parent_id', 'node', ['parent_id'], None),
+    ('ix_tag_project_id', 'tag', ['project_id'], None),
+    ('ix_tag_node_node_id', 'tag_node', ['node_id'], None),
+    ('ix_tag_summary_tag_id', 'tag_summary', ['tag_id'], None),
+    ('ix_project_user_role_user_id', 'project_user_role', ['user_id'], None),
+    ('ix_project_active', 'project', ['id'], "is_deleted = false"),
+    ('ix_node_project_active_root', 'node', ['project_id'], "parent_id IS NULL AND state = 'ACTIVE'"),
+]
+# vote.tag_summary_id 는 UNIQUE(tag_summary_id, voter_id) 인덱스의 선두 컬럼이라 별도 인덱스가 필요 없습니다.
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 운영 중 테이블 잠금을 피하기 위해 CONCURRENTLY 로 생성 (트랜잭션 밖에서 실행)
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,33 @@
+"""node position gist index
+
+Revision ID: d47a0b3e8c21
+Revises: c5d92a7e1f03
+Create Date: 2026-10-17 15:20:52.870134
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd47a0b3e8c21'
+down_revision: Union[str, None] = 'c5d92a7e1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_node_pos_gist', 'node', [sa.text('point(pos_x, pos_y)')], unique=False,
+            postgresql_using='gist', postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_node_pos_gist', table_name='node', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,47 @@
+"""denormalized project/tag counters
+
+Revision ID: e92b6f14a7d3
+Revises: d47a0b3e8c21
+Create Date: 2026-10-17 19:05:11.402318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e92b6f14a7d3'
+down_revision: Union[str, None] = 'd47a0b3e8c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('project', sa.Column('node_count', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('project', sa.Column('tag_count', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('tag', sa.Column('node_count', sa.BigInteger(), server_default='0', nullable=False))
+
+    # 기존 데이터 backfill
+    op.execute(
+        """
+        UPDATE project p SET
+            node_count = (SELECT count(*) FROM node n WHERE n.project_id = p.id),
+            tag_count  = (SELECT count(*) FROM tag t WHERE t.project_id = p.id)
+        """
+    )
+    op.execute(
+        """
+        UPDATE tag t SET
+            node_count = (SELECT count(*) FROM tag_node tn WHERE tn.tag_id = t.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tag', 'node_count')
+    op.drop_column('project', 'tag_count')
+    op.drop_column('project', 'node_count')
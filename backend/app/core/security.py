@@ -1,13 +1,20 @@
+import os
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import FrozenSet, Optional
 
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
+from app.utils.tracing import span
+
 SECRET_KEY = "CHANGE_ME_TO_A_RANDOM_SECRET"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# /_debug 엔드포인트를 쓸 수 있는 사용자 id (쉼표 구분). 비어 있으면 아무도 쓸 수 없습니다.
+ADMIN_USER_IDS: FrozenSet[str] = frozenset(
+    u.strip() for u in os.getenv("ADMIN_USER_IDS", "").split(",") if u.strip()
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -23,10 +30,19 @@ def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with span("auth.decode"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         sub = payload.get("sub")
         if sub is None:
             raise credentials_exc
         return sub
     except JWTError:
         raise credentials_exc
+
+def require_admin(uid: str = Depends(get_current_user_id)) -> str:
+    """
+    ADMIN_USER_IDS 에 있는 사용자만 통과시킵니다 (운영/디버그 엔드포인트용).
+    """
+    if uid not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return uid
@@ -2,6 +2,7 @@
 from .user import User
 from .project import Project
 from .node import Node
+from .node_closure import NodeClosure
 from .tag import Tag
 from .vote import Vote
 from .history import ProjectHistory
@@ -12,4 +13,5 @@ from .node_metrics import NodeMetrics
 from .node_version import NodeVersion
 from .invite_token import InviteToken
 from .activity_log import ActivityLog
+from .ai_suggestion import AiSuggestion
 from .base import Base
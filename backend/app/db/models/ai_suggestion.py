@@ -0,0 +1,17 @@
+# app/db/models/ai_suggestion.py
+from sqlalchemy import Column, String, Float, Text, DateTime
+from datetime import datetime
+from app.db.models.base import Base
+
+class AiSuggestion(Base):
+    """
+    AI 아이디어 캐시의 2차(Postgres) 저장소.
+    key = 정규화된 프롬프트 + 모델 + temperature 의 sha256
+    """
+    __tablename__ = "ai_suggestion"
+
+    key = Column(String(64), primary_key=True)
+    model = Column(String(64), nullable=False)
+    temperature = Column(Float, nullable=False)
+    answer = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
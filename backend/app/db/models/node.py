@@ -1,5 +1,5 @@
 # app/db/models/node.py
-from sqlalchemy import Column, BigInteger, Text, Float, Integer, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, BigInteger, Text, Float, Integer, ForeignKey, Enum, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.models.base import Base
@@ -14,8 +14,8 @@ class Node(Base):
     __tablename__ = "node"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    project_id = Column(BigInteger, ForeignKey("project.id", ondelete="CASCADE"), nullable=False)
-    parent_id = Column(BigInteger, ForeignKey("node.id", ondelete="SET NULL"), nullable=True)
+    project_id = Column(BigInteger, ForeignKey("project.id", ondelete="CASCADE"), nullable=False, index=True)
+    parent_id = Column(BigInteger, ForeignKey("node.id", ondelete="SET NULL"), nullable=True, index=True)
     author_id = Column(BigInteger, ForeignKey("app_user.id"), nullable=True)
     content = Column(Text, nullable=False)
     state = Column(Enum(NodeStateEnum, name="node_state_t"), nullable=False)
@@ -28,3 +28,13 @@ class Node(Base):
 
     project = relationship("Project", backref="nodes", foreign_keys=[project_id])
     parent = relationship("Node", remote_side=[id], foreign_keys=[parent_id])
+
+    __table_args__ = (
+        # create_nodes의 "활성 루트 존재 여부" 검사용
+        Index(
+            "ix_node_project_active_root", "project_id",
+            postgresql_where=text("parent_id IS NULL AND state = 'ACTIVE'"),
+        ),
+        # 뷰포트(bbox) 조회용 공간 인덱스: point(pos_x, pos_y) <@ box(...)
+        Index("ix_node_pos_gist", text("point(pos_x, pos_y)"), postgresql_using="gist"),
+    )
@@ -0,0 +1,20 @@
+# app/db/models/node_closure.py
+from sqlalchemy import Column, BigInteger, Integer, ForeignKey, PrimaryKeyConstraint, Index
+from app.db.models.base import Base
+
+class NodeClosure(Base):
+    """
+    노드 트리의 closure table.
+    (ancestor_id, descendant_id, depth) 한 행이 "ancestor의 depth 단계 아래에 descendant가 있다"를 뜻하며,
+    모든 노드는 자기 자신과의 depth=0 행을 가집니다.
+    """
+    __tablename__ = "node_closure"
+
+    ancestor_id = Column(BigInteger, ForeignKey("node.id", ondelete="CASCADE"), nullable=False)
+    descendant_id = Column(BigInteger, ForeignKey("node.id", ondelete="CASCADE"), nullable=False)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+        Index("ix_node_closure_descendant_depth", "descendant_id", "depth"),
+    )
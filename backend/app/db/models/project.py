@@ -1,5 +1,5 @@
 # app/db/models/project.py
-from sqlalchemy import Column, BigInteger, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, BigInteger, String, Text, DateTime, ForeignKey, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.models.base import Base
@@ -12,7 +12,14 @@ class Project(Base):
     name = Column(String(120), nullable=False)
     description = Column(Text, nullable=True)
     is_deleted = Column(Boolean, nullable=False, default=False)
+    # 비정규화 카운터 (app.utils.counters 가 변경 경로에서 증감, 주기적으로 reconcile)
+    node_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    tag_count = Column(BigInteger, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    owner = relationship("User", backref="projects", foreign_keys=[owner_id])
\ No newline at end of file
+    owner = relationship("User", backref="projects", foreign_keys=[owner_id])
+
+    __table_args__ = (
+        Index("ix_project_active", "id", postgresql_where=text("is_deleted = false")),
+    )
\ No newline at end of file
@@ -12,7 +12,7 @@ class ProjectUserRole(Base):
     __tablename__ = "project_user_role"
 
     project_id = Column(BigInteger, ForeignKey("project.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(BigInteger, ForeignKey("app_user.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(BigInteger, ForeignKey("app_user.id", ondelete="CASCADE"), nullable=False, index=True)
     role = Column(Enum(RoleType, name="role_t"), nullable=False)
     invited_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     accepted_at = Column(DateTime(timezone=True), nullable=True)
@@ -7,8 +7,9 @@ class Tag(Base):
     __tablename__ = "tag"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    project_id = Column(BigInteger, ForeignKey("project.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(BigInteger, ForeignKey("project.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(80), nullable=False)
     color = Column(String(7), nullable=True)
+    node_count = Column(BigInteger, nullable=False, default=0, server_default="0")  # 연결된 tag_node 수 (비정규화)
 
     project = relationship("Project", backref="tags", foreign_keys=[project_id])
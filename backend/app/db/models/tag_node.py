@@ -1,5 +1,5 @@
 # app/db/models/tag_node.py
-from sqlalchemy import Column, BigInteger, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy import Column, BigInteger, ForeignKey, PrimaryKeyConstraint, Index
 from app.db.models.base import Base
 
 class TagNode(Base):
@@ -10,4 +10,6 @@ class TagNode(Base):
 
     __table_args__ = (
         PrimaryKeyConstraint("tag_id", "node_id"),
+        # PK가 tag_id로 시작하므로 node_id 기준 조회용 인덱스를 따로 둡니다
+        Index("ix_tag_node_node_id", "node_id"),
     )
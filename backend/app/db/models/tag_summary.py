@@ -7,6 +7,6 @@ class TagSummary(Base):
     __tablename__ = "tag_summary"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    tag_id = Column(BigInteger, ForeignKey("tag.id", ondelete="CASCADE"), nullable=False)
+    tag_id = Column(BigInteger, ForeignKey("tag.id", ondelete="CASCADE"), nullable=False, index=True)
     summary_text = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
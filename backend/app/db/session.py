@@ -2,6 +2,9 @@
 import os
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from app.db.models.base import Base
+from app.db import stats
+from app.db.slow_queries import slow_query_log
+from app.utils.metrics import InstrumentedPool, DB_POOL_CHECKED_OUT
 from dotenv import load_dotenv
 
 # .env 불러오기
@@ -12,11 +15,43 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL 환경 변수가 설정되지 않았습니다.")
 
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+# ── 엔진 설정 (환경 변수로 조정) ───────────────────────────────────────
+DB_ECHO = _flag("DB_ECHO", "false")                                # SQL 로그 (운영에서는 끔)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))        # 커넥션 대기 제한(초)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))        # 커넥션 재생성 주기(초)
+DB_POOL_PRE_PING = _flag("DB_POOL_PRE_PING", "true")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 = 제한 없음
+
+connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS > 0:
+    connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True,
-    pool_size=10,
-    max_overflow=20,
+    echo=DB_ECHO,
+    poolclass=InstrumentedPool,          # checkout 대기 시간 계측
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args,
 )
+stats.install(engine.sync_engine)
+slow_query_log.install(engine)            # DB_SLOW_QUERY_MS 이상 걸린 쿼리 기록
+DB_POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout())
+
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
 
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
\ No newline at end of file
+# ── 공용 DB 세션 의존성 ───────────────────────────────────────────────
+async def get_db():
+    async with AsyncSessionLocal() as session:
+        yield session
\ No newline at end of file
@@ -0,0 +1,195 @@
+# app/db/slow_queries.py
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db import stats
+
+logger = logging.getLogger(__name__)
+
+# ── 설정 ──────────────────────────────────────────────────────────────
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))          # 이 시간(ms) 이상이면 느린 쿼리로 기록
+DB_SLOW_QUERY_EXPLAIN = os.getenv("DB_SLOW_QUERY_EXPLAIN", "false").lower() in ("1", "true", "yes")
+DB_SLOW_QUERY_MAX = int(os.getenv("DB_SLOW_QUERY_MAX", "200"))          # 보관할 fingerprint 수
+DB_SLOW_QUERY_RAW_PARAMS = os.getenv("DB_SLOW_QUERY_RAW_PARAMS", "false").lower() in ("1", "true", "yes")  # 로컬 디버깅용
+SAMPLES_PER_FINGERPRINT = 5
+PARAMS_REPR_LIMIT = 500
+
+_explaining: ContextVar[bool] = ContextVar("slow_query_explaining", default=False)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+_LOCKING = re.compile(r"\bfor\s+(?:no\s+key\s+)?(?:update|share|key\s+share)\b")
+
+
+def normalize(statement: str) -> str:
+    """
+    리터럴과 바인드 파라미터를 ? 로 바꾸고 IN (...) 목록을 접어,
+    값만 다른 같은 쿼리가 같은 문자열이 되도록 합니다.
+    """
+    text = _STRING.sub("?", statement)
+    text = _PARAM.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _IN_LIST.sub("(...)", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize(statement).encode("utf-8")).hexdigest()[:16]
+
+
+def redact(parameters: Any) -> Any:
+    """
+    샘플에 남길 바인드 파라미터: 문자열/바이트(비밀번호 해시, 토큰, 본문 등)는 길이만 남기고,
+    숫자·불리언·날짜 같은 값은 그대로 둡니다 (어떤 id 로 느렸는지는 알 수 있도록).
+    """
+    if isinstance(parameters, (list, tuple)):
+        return [redact(p) for p in parameters]
+    if isinstance(parameters, dict):
+        return {k: redact(v) for k, v in parameters.items()}
+    if isinstance(parameters, str):
+        return f"<str:{len(parameters)}>"
+    if isinstance(parameters, (bytes, bytearray, memoryview)):
+        return f"<bytes:{len(parameters)}>"
+    return parameters
+
+
+def explain_options(statement: str) -> str:
+    """
+    실제로 실행해도 안전한 일반 SELECT 만 ANALYZE 합니다.
+    WITH 로 시작하는 문장은 데이터 변경 CTE(WITH ... UPDATE/DELETE/INSERT)일 수 있고,
+    SELECT ... FOR UPDATE/SHARE 는 행 잠금을 잡으므로 둘 다 계획만 봅니다.
+    """
+    text = statement.lstrip().lower()
+    if text.startswith("select") and not _LOCKING.search(text):
+        return "ANALYZE, BUFFERS, FORMAT JSON"
+    return "FORMAT JSON"
+
+
+class SlowQueryLog:
+    """
+    느린 쿼리를 정규화된 fingerprint 별로 집계합니다.
+    - 횟수 / 총·최대 시간 / 출처 라우트 / 최근 샘플(원문 + 바인드 파라미터)
+    - explain=True 이면 fingerprint 당 첫 샘플의 실행 계획을 비동기로 수집
+      (잠금 없는 일반 SELECT 만 EXPLAIN (ANALYZE, BUFFERS), 그 외는 실제 실행을 피하려고 EXPLAIN 만)
+    - 샘플의 바인드 파라미터는 redact() 로 문자열 값을 가립니다 (DB_SLOW_QUERY_RAW_PARAMS=true 이면 원문)
+    """
+
+    def __init__(self, threshold_ms: float, explain: bool, max_entries: int):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._engine: Optional[AsyncEngine] = None
+        self._tasks: set = set()
+
+    # ── 엔진 훅 ──
+    def install(self, engine: AsyncEngine) -> None:
+        """
+        EXPLAIN 에 쓸 엔진을 기억하고 stats 의 쿼리 시간 측정에 콜백을 붙입니다
+        (시간 측정 훅은 stats.install 이 엔진에 한 번만 등록).
+        """
+        self._engine = engine
+        stats.add_listener(self._observe)
+
+    def _observe(self, statement: str, parameters: Any, executemany: bool, elapsed: float) -> None:
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms < self.threshold_ms or _explaining.get():
+            return
+        current = stats.current()
+        self.record(statement, parameters, elapsed_ms, current.route if current else "", executemany)
+
+    # ── 집계 ──
+    def record(self, statement: str, parameters: Any, elapsed_ms: float, route: str, executemany: bool = False) -> None:
+        key = fingerprint(statement)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = {
+                "fingerprint": key,
+                "statement": normalize(statement),
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "routes": {},
+                "samples": deque(maxlen=SAMPLES_PER_FINGERPRINT),
+                "explain": None,
+                "first_seen": datetime.utcnow(),
+            }
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            if self.explain and not executemany:
+                self._schedule_explain(entry, statement, parameters)
+        self.entries.move_to_end(key)
+
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["last_seen"] = datetime.utcnow()
+        if route:
+            entry["routes"][route] = entry["routes"].get(route, 0) + 1
+        entry["samples"].append({
+            "at": entry["last_seen"],
+            "duration_ms": round(elapsed_ms, 2),
+            "route": route,
+            "statement": statement,
+            "params": repr(parameters if DB_SLOW_QUERY_RAW_PARAMS else redact(parameters))[:PARAMS_REPR_LIMIT],
+        })
+        logger.warning("slow query %.1fms [%s] %s: %s", elapsed_ms, key, route or "-", normalize(statement)[:200])
+
+    # ── EXPLAIN (별도 커넥션, 백그라운드) ──
+    def _schedule_explain(self, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        if self._engine is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._explain(entry, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        _explaining.set(True)
+        options = explain_options(statement)
+        try:
+            async with self._engine.connect() as conn:
+                if "ANALYZE" in options:
+                    # 함수 호출 등으로 쓰기가 일어나더라도 실패하도록 (어차피 롤백)
+                    await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                result = await conn.exec_driver_sql(f"EXPLAIN ({options}) {statement}", parameters)
+                entry["explain"] = result.scalar()
+                await conn.rollback()
+        except Exception as e:
+            entry["explain"] = {"error": str(e)}
+
+    def snapshot(self, limit: int = 50, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        rows = sorted(self.entries.values(), key=lambda e: e.get(order_by, 0), reverse=True)[:limit]
+        return [
+            {
+                **{k: v for k, v in e.items() if k != "samples"},
+                "total_ms": round(e["total_ms"], 2),
+                "max_ms": round(e["max_ms"], 2),
+                "avg_ms": round(e["total_ms"] / e["count"], 2) if e["count"] else 0.0,
+                "samples": list(e["samples"]),
+            }
+            for e in rows
+        ]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+slow_query_log = SlowQueryLog(DB_SLOW_QUERY_MS, DB_SLOW_QUERY_EXPLAIN, DB_SLOW_QUERY_MAX)
@@ -0,0 +1,113 @@
+# app/db/stats.py
+
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DB_QUERY_WARN = int(os.getenv("DB_QUERY_WARN", "50"))   # 요청당 쿼리 수가 이보다 많으면 경고 (N+1 탐지)
+
+
+class QueryStats:
+    """
+    한 요청 동안 실행된 쿼리 수, 반환/변경 행 수, DB 시간(초).
+    route 는 요청 경로 ("GET /projects/1/nodes") 로, 느린 쿼리 로그에서 출처 표시에 씁니다.
+    """
+    __slots__ = ("route", "queries", "rows", "db_time")
+
+    def __init__(self, route: str = ""):
+        self.route = route
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+# 라우트별 누적값: route -> {"requests", "queries", "rows", "db_time", "max_queries"}
+ROUTE_TOTALS: Dict[str, Dict[str, float]] = {}
+
+# 쿼리가 끝날 때마다 (statement, parameters, executemany, 걸린 시간(초)) 로 호출할 콜백 (느린 쿼리 로그 등)
+QueryListener = Callable[[str, Any, bool, float], None]
+_listeners: List[QueryListener] = []
+
+
+def begin_request(route: str = "") -> QueryStats:
+    stats = QueryStats(route)
+    _current.set(stats)
+    return stats
+
+
+def current() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def end_request(route: str, stats: QueryStats) -> None:
+    totals = ROUTE_TOTALS.setdefault(
+        route, {"requests": 0, "queries": 0, "rows": 0, "db_time": 0.0, "max_queries": 0}
+    )
+    totals["requests"] += 1
+    totals["queries"] += stats.queries
+    totals["rows"] += stats.rows
+    totals["db_time"] += stats.db_time
+    totals["max_queries"] = max(totals["max_queries"], stats.queries)
+    if stats.queries > DB_QUERY_WARN:
+        logger.warning("%s ran %d queries in one request (possible N+1)", route, stats.queries)
+
+
+def snapshot() -> Dict[str, Any]:
+    return {
+        route: {
+            **totals,
+            "db_time": round(totals["db_time"], 4),
+            "avg_queries": round(totals["queries"] / totals["requests"], 2) if totals["requests"] else 0,
+        }
+        for route, totals in sorted(ROUTE_TOTALS.items())
+    }
+
+
+def add_listener(listener: QueryListener) -> None:
+    """
+    쿼리 시간 측정을 공유할 콜백을 등록합니다 (엔진 훅을 따로 달지 않도록).
+    """
+    _listeners.append(listener)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append((context, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()[1]
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        if cursor.rowcount and cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+    for listener in _listeners:
+        listener(statement, parameters, executemany, elapsed)
+
+
+def _handle_error(exception_context) -> None:
+    # 실행이 예외로 끝나면 after_cursor_execute 가 호출되지 않으므로 여기서 시작 시각을 꺼냄
+    # (남겨 두면 커넥션이 풀로 돌아간 뒤에도 스택이 계속 쌓임)
+    conn = exception_context.connection
+    starts = conn.info.get("query_start") if conn is not None else None
+    if starts and starts[-1][0] is exception_context.execution_context:
+        starts.pop()
+
+
+def install(engine: Engine) -> None:
+    """
+    동기 엔진(AsyncEngine.sync_engine)에 쿼리 계측 훅을 등록합니다.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -1,10 +1,35 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from app.routers import (
-    auth, users, projects, nodes, tags, votes, history, websocket
+    auth, users, projects, nodes, tags, votes, history, websocket, debug
 )
 from fastapi.middleware.cors import CORSMiddleware
+from app.utils.jobs import job_queue
+from app.utils.positions import position_buffer
+from app.utils.counters import counter_reconciler
+from app.utils import ws_manager
+from app.db import stats as db_stats
+from app.utils import metrics, tracing
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 백그라운드 AI 작업 워커 / 위치 버퍼 flush 루프 / 카운터 reconcile / WS backplane 시작, 종료 시 남은 위치 flush
+    await ws_manager.start()
+    await job_queue.start()
+    await position_buffer.start()
+    await counter_reconciler.start()
+    yield
+    await counter_reconciler.stop()
+    await position_buffer.stop()
+    await job_queue.stop()
+    await ws_manager.stop()
 
-app = FastAPI(title="BrainShare API", version="0.2.0")
+
+app = FastAPI(title="BrainShare API", version="0.2.0", lifespan=lifespan)
 
 # ✅ CORS 설정
 app.add_middleware(
@@ -13,7 +38,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-DB-Queries", "X-DB-Rows", "X-DB-Time-Ms", "ETag"],
 )
 
-for r in (auth, users, projects, nodes, tags, votes, history, websocket):
+
+# ✅ 요청별 DB 쿼리 수 / 행 수 / 시간을 응답 헤더로 노출 (N+1 회귀 확인용)
+@app.middleware("http")
+async def db_query_stats(request: Request, call_next):
+    stats = db_stats.begin_request(f"{request.method} {request.url.path}")
+    response = await call_next(request)
+    route = request.scope.get("route")
+    db_stats.end_request(f"{request.method} {getattr(route, 'path', request.url.path)}", stats)
+    response.headers["X-DB-Queries"] = str(stats.queries)
+    response.headers["X-DB-Rows"] = str(stats.rows)
+    response.headers["X-DB-Time-Ms"] = f"{stats.db_time * 1000:.1f}"
+    return response
+
+
+# ✅ 라우트별 지연 시간 히스토그램 / 처리 중 요청 수 / 샘플링된 요청 트레이스
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    method = request.method
+    metrics.HTTP_IN_FLIGHT.inc(method=method)
+    trace = tracing.start_trace(f"{method} {request.url.path}")
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        metrics.HTTP_IN_FLIGHT.dec(method=method)
+        route = getattr(request.scope.get("route"), "path", "unmatched")   # 원본 경로는 라벨 폭증을 일으키므로 쓰지 않음
+        metrics.HTTP_LATENCY.observe(
+            time.perf_counter() - start,
+            method=method,
+            route=route,
+            status=str(status_code),
+        )
+        tracing.finish_trace(trace, name=f"{method} {route}", path=request.url.path, status=status_code)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+for r in (auth, users, projects, nodes, tags, votes, history, websocket, debug):
     app.include_router(r.router)
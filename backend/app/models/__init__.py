@@ -11,14 +11,17 @@ from .node_metrics import *
 from .node_version import *
 from .invite_token import *
 from .activity_log import *
+from .job import *
 from .user import UserRead, UserCreate, UserSimple
 from .history import ProjectHistoryOut
 __all__ = (
     "UserCreate", "Token", "UserRead",
     "ProjectCreate", "ProjectUpdate", "ProjectOut",
-    "NodeCreate", "NodeUpdate", "NodeOut",
+    "NodeCreate", "NodeUpdate", "NodeOut", "NodeExpand",
+    "NodePosition", "NodePositionsUpdate",
     "TagCreate", "TagUpdate", "TagOut",
     "VoteOut", "HistoryOut",
     "TagSummaryOut", "TagNodeOut", "ProjectUserRoleOut",
     "NodeMetricsOut", "NodeVersionOut", "InviteTokenOut", "ActivityLogOut",
+    "JobOut",
 )
\ No newline at end of file
@@ -0,0 +1,15 @@
+# backend/app/models/job.py
+from pydantic import BaseModel
+from typing import Optional, Any
+from datetime import datetime
+
+class JobOut(BaseModel):
+    id: str
+    project_id: int
+    kind: str
+    status: str               # queued | running | done | failed
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
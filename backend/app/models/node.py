@@ -1,5 +1,5 @@
 # backend/app/models/node.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional,List
 from datetime import datetime
 
@@ -19,6 +19,27 @@ class NodeUpdate(BaseModel):
     pos_y: Optional[float] = None
     depth: Optional[int] = None
     order: Optional[int] = None
+    parent_id: Optional[int] = None  # 지정 시 해당 노드 아래로 서브트리 이동
+
+MAX_EXPAND_PARENTS = 50  # 배치 확장 한 번에 받을 부모 수
+
+class NodeExpand(BaseModel):
+    parent_ids: List[int] = Field(..., max_length=MAX_EXPAND_PARENTS)
+    offset_x: float = 0.0     # 부모 위치 기준 새 노드 배치 오프셋
+    offset_y: float = 120.0
+
+class NodeExpandFailure(BaseModel):
+    parent_id: int
+    status: int
+    detail: str
+
+class NodePosition(BaseModel):
+    node_id: int
+    pos_x: float
+    pos_y: float
+
+class NodePositionsUpdate(BaseModel):
+    positions: List[NodePosition]
 
 class NodeOut(BaseModel):
     id: int
@@ -38,3 +59,7 @@ class NodeOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class NodeExpandOut(BaseModel):
+    nodes: List[NodeOut]
+    failed: List[NodeExpandFailure] = []  # 생성에 실패한 부모 (있으면 207)
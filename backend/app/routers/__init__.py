@@ -1,8 +1,8 @@
 # backend/app/routers/__init.py
 # 개별 라우터를 main.py 에서 import 하기 쉽게 모아 둡니다
-from . import auth, users, projects, nodes, tags, votes, history, websocket
+from . import auth, users, projects, nodes, tags, votes, history, websocket, debug
 
 __all__ = [
     "auth", "users", "projects",
-    "nodes", "tags", "votes", "history", "websocket",
+    "nodes", "tags", "votes", "history", "websocket", "debug",
 ]
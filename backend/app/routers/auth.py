@@ -8,7 +8,7 @@ from passlib.context import CryptContext
 
 from app.models.auth import UserCreate, Token, UserRead
 from app.db.models.user import User  # User ORM 모델
-from app.db.session import AsyncSessionLocal
+from app.db.session import get_db
 from app.core.security import create_access_token
 from datetime import datetime
 
@@ -23,9 +23,6 @@ def hash_password(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
 
 # 회원가입입
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=UserRead)
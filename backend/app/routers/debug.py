@@ -1,33 +1,145 @@
 # backend/app/routers/debug.py
 
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.db.models.invite_token import InviteToken      # ORM 모델
-from app.db.session import AsyncSessionLocal
-from app.core.security import get_current_user_id as _uid  # 토큰에서 user_id 추출 헬퍼
+from app.db.session import get_db
+from app.core.security import require_admin as _admin  # ADMIN_USER_IDS 에 있는 사용자만 허용
+from app.utils.ai_cache import suggestion_cache
+from app.utils.jobs import job_queue
+from app.utils.positions import position_buffer
+from app.utils.helpers import membership_cache
+from app.db import stats as db_stats
+from app.db.slow_queries import slow_query_log
+from app.utils.tracing import ring_buffer
+from app.utils.counters import counter_reconciler
+from app.utils.summary_cache import summary_cache
+from app.utils import ws_manager
 
 
+# 운영 진단용 엔드포인트: 모두 관리자(ADMIN_USER_IDS) 전용
 router = APIRouter(prefix="/_debug", tags=["Debug"])
 
 
-# 비동기 세션 제공 헬퍼
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
-
-
 @router.get("/invites")
 async def list_invites(
-    uid: str = Depends(_uid),
+    uid: str = Depends(_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """
     현재 DB에 저장된 모든 InviteToken 레코드를 반환합니다.
     """
-    # (원하는 경우, `ensure_owner`나 `ensure_member` 등으로 권한 검증 로직을 추가할 수 있습니다.)
     stmt = select(InviteToken)
     result = await db.execute(stmt)
     invites = result.scalars().all()
     return invites
+
+
+@router.get("/ai-cache")
+async def ai_cache_stats(uid: str = Depends(_admin)):
+    """
+    AI 아이디어 캐시의 크기와 hit/miss 카운터를 반환합니다 (캐시 크기 조정용).
+    """
+    return suggestion_cache.stats()
+
+
+@router.get("/ai-jobs")
+async def ai_job_stats(uid: str = Depends(_admin)):
+    """
+    AI 작업 큐의 깊이, 대기 시간, 워커 사용률을 반환합니다 (워커 수 조정용).
+    """
+    return job_queue.stats()
+
+
+@router.get("/positions")
+async def position_buffer_stats(uid: str = Depends(_admin)):
+    """
+    위치 쓰기 버퍼의 대기 중인 노드 수와 받은/기록한 위치 수를 반환합니다.
+    """
+    return position_buffer.stats()
+
+
+@router.get("/membership-cache")
+async def membership_cache_stats(uid: str = Depends(_admin)):
+    """
+    멤버십/소유자 검사 캐시의 크기와 hit/miss 카운터를 반환합니다.
+    """
+    return membership_cache.stats()
+
+
+@router.get("/db")
+async def db_query_stats(uid: str = Depends(_admin)):
+    """
+    라우트별 누적 쿼리 수 / 행 수 / DB 시간과 요청당 평균·최대 쿼리 수를 반환합니다.
+    """
+    return db_stats.snapshot()
+
+
+@router.get("/traces")
+async def recent_traces(
+    limit: int = Query(20, ge=1, le=200),
+    name: Optional[str] = Query(None, description="트레이스 이름(METHOD /route) 부분 일치"),
+    min_ms: float = Query(0.0, ge=0, description="이 시간(ms) 이상 걸린 요청만"),
+    uid: str = Depends(_admin),
+):
+    """
+    샘플링된 최근 요청 트레이스(span 트리)를 최신순으로 반환합니다 (TRACE_SAMPLE_RATE).
+    """
+    return ring_buffer.recent(limit, name, min_ms)
+
+
+@router.get("/slow-queries")
+async def slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    order_by: str = Query("total_ms", pattern="^(total_ms|max_ms|count)$"),
+    uid: str = Depends(_admin),
+):
+    """
+    DB_SLOW_QUERY_MS 이상 걸린 쿼리를 정규화된 fingerprint 별로 집계해 반환합니다.
+    (횟수, 총/최대/평균 시간, 출처 라우트, 최근 샘플과 바인드 파라미터, 수집된 실행 계획)
+    """
+    return slow_query_log.snapshot(limit, order_by)
+
+
+@router.delete("/slow-queries", status_code=204)
+async def clear_slow_queries(uid: str = Depends(_admin)):
+    slow_query_log.clear()
+
+
+@router.get("/counters")
+async def counter_stats(uid: str = Depends(_admin)):
+    """
+    비정규화 카운터 reconcile 작업의 실행 횟수와 복구한 행 수를 반환합니다.
+    """
+    return counter_reconciler.stats()
+
+
+@router.post("/counters/reconcile")
+async def reconcile_counters(
+    project_id: Optional[int] = Query(None, description="지정하면 해당 프로젝트만 검사"),
+    uid: str = Depends(_admin),
+):
+    """
+    project/tag 카운터를 실제 COUNT 와 비교해 어긋난 행을 즉시 복구하고, 복구한 id 를 반환합니다.
+    """
+    return await counter_reconciler.run_once(project_id)
+
+
+@router.get("/summary-cache")
+async def summary_cache_stats(uid: str = Depends(_admin)):
+    """
+    프로젝트 요약 캐시의 크기, hit/miss, 304 응답 수, 무효화 횟수를 반환합니다.
+    """
+    return summary_cache.stats()
+
+
+@router.get("/ws")
+async def ws_stats(uid: str = Depends(_admin)):
+    """
+    WebSocket 연결 수, 송신 대기열 깊이, 전송/버림/대체된 메시지 수를 반환합니다.
+    """
+    return ws_manager.stats()
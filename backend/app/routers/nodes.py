@@ -1,143 +1,319 @@
 # backend/app/routers/nodes.py
 
-import uuid, re, openai, os
-from typing import List, Optional
+import uuid, json, asyncio
+from contextlib import nullcontext
+from typing import AsyncIterator, Dict, List, Optional
 
 
-from fastapi import APIRouter, Depends, Query, Path, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Path, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, insert, update, delete
+from sqlalchemy import select, insert, update, delete, func, literal_column
 
-from app.models.node import NodeCreate, NodeUpdate, NodeOut
+from app.models.node import (
+    NodeCreate, NodeUpdate, NodeOut, NodeExpand, NodeExpandFailure, NodeExpandOut, NodePositionsUpdate,
+)
+from app.models.job import JobOut
 from app.core.security import get_current_user_id as _uid
 from app.utils.helpers import ensure_member as _m, ensure_owner as _o
 from app.db.models.node import Node as NodeORM, NodeStateEnum
 from app.db.models.tag_node import TagNode
 from app.db.models.tag import Tag as TagORM
-from app.db.session import AsyncSessionLocal
-from app.routers.tags import get_descendant_node_ids
+from app.db.session import AsyncSessionLocal, get_db
+from app.utils.tree import get_descendant_node_ids, subtree_select, link_node, link_nodes, move_subtree
+from app.utils import ai
+from app.utils.jobs import job_queue
+from app.utils.positions import bulk_update_positions, position_buffer
+from app.utils.tracing import span, traced
+from app.utils.counters import bump_project, bump_tags, tally
+from app.utils.ws_manager import emit_delta
 
 router = APIRouter(prefix="/projects/{project_id}/nodes", tags=["Nodes"])
 
-openai.api_key = os.getenv("OPENAI_API_KEY")
 
-
-# ── DB 세션 의존성 ───────────────────────────────────────────────────
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
+# ── 내부 유틸: GHOST 노드 저장 ────────────────────────────────────────
+@traced("nodes.bulk_insert")
+async def _insert_ghost_nodes(db: AsyncSession, rows: List[dict]) -> List[NodeOut]:
+    """
+    GHOST 노드 행들을 bulk INSERT ... RETURNING 한 번으로 저장하고,
+    closure 행 추가와 부모 태그 상속도 각각 한 문장으로 처리합니다. (커밋은 호출자가)
+    반환하는 NodeOut 의 tags 에는 상속된 태그 id 가 들어 있습니다.
+    """
+    if not rows:
+        return []
+    result = await db.execute(
+        insert(NodeORM).returning(NodeORM, sort_by_parameter_order=True),
+        [{"state": NodeStateEnum.GHOST, **row} for row in rows],
+    )
+    nodes_created = list(result.scalars().all())
+    await link_nodes(db, [(n.id, n.parent_id) for n in nodes_created])
+    for project_id, count in tally(n.project_id for n in nodes_created).items():
+        await bump_project(db, project_id, nodes=count)
+
+    # 부모 태그 상속 (INSERT ... SELECT 한 번)
+    tags_by_node: Dict[int, List[int]] = {}
+    if any(n.parent_id is not None for n in nodes_created):
+        inherited = await db.execute(
+            insert(TagNode).from_select(
+                ["tag_id", "node_id"],
+                select(TagNode.tag_id, NodeORM.id)
+                .join(NodeORM, NodeORM.parent_id == TagNode.node_id)
+                .where(NodeORM.id.in_([n.id for n in nodes_created])),
+            ).returning(TagNode.tag_id, TagNode.node_id)
+        )
+        pairs = inherited.all()
+        await bump_tags(db, tally(tag_id for tag_id, _ in pairs))
+        for tag_id, node_id in pairs:
+            tags_by_node.setdefault(node_id, []).append(tag_id)
+    return [_node_out(n, tags_by_node.get(n.id)) for n in nodes_created]
 
 
-# ── 내부 유틸: AI Ghost Stub ────────────────────────────────────────────
-async def _gen_ai_nodes(project_id: int,body: NodeCreate, prompt: str, db: AsyncSession, uid: str = Depends(_uid)) -> List[NodeOut]:
+async def _ensure_parent(db: AsyncSession, project_id: int, parent_id) -> None:
     """
-    GPT로 유령 노드 한 개를 생성하고, 한 노드를 반환합니다.
+    부모 노드가 같은 프로젝트에 있는지 확인합니다 (없으면 404).
+    다른 프로젝트 노드를 부모로 주면 closure 행이 그 프로젝트의 조상 체인을 복사하게 되므로 link 전에 막습니다.
     """
-    nodes_created: List[NodeORM] = []
+    if parent_id in (None, 0, "", "0"):
+        return
+    found = await db.execute(
+        select(NodeORM.id).where(NodeORM.id == parent_id, NodeORM.project_id == project_id)
+    )
+    if found.first() is None:
+        raise HTTPException(status_code=404, detail="Parent node not found")
 
-    try:
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "당신은 창의적인 아이디어를 제공하는 도우미입니다."},
-                {"role": "user", "content": f"다음 주제와 관련된 새로운 아이디어를 간략한 문장 형태로 한 개 작성해줘: {prompt}"}
-            ],
-            max_tokens=256,
-            temperature=0.7,
-        )
-        answer = response.choices[0].message.content.strip()
-        first_line = answer.split('\n')[0]
-        ideas = [re.sub(r'^\d+\.\s*', '', first_line).strip()]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
-    # GHOST 노드 2개 생성
-    for idx, content in enumerate(ideas):
-        new_node = NodeORM(
+
+async def _persist_ghost_nodes(
+    project_id: int, body: NodeCreate, ideas: List[str], db: AsyncSession, uid: str
+) -> List[NodeOut]:
+    """
+    생성된 아이디어들을 GHOST 노드로 저장하고 부모 태그를 상속한 뒤 커밋합니다.
+    커밋 후 node:create delta 를 보냅니다.
+    """
+    parent_id = body.parent_id if body.parent_id not in (None, 0, "", "0") else None
+    nodes_created = await _insert_ghost_nodes(db, [
+        dict(
             project_id=project_id,
-            parent_id=body.parent_id if body.parent_id not in (None, 0, "", "0") else None,
+            parent_id=parent_id,
             author_id=int(uid),
             content=content,
-            state=NodeStateEnum.GHOST,
             depth=body.depth or 0,
             order_index=idx,
             pos_x=body.pos_x or 0.0,
             pos_y=body.pos_y or 0.0,
         )
-        db.add(new_node)
-        await db.flush()
-        nodes_created.append(new_node)
-
-    if body.parent_id is not None:
-        parent_tags = await db.execute(
-            select(TagNode.tag_id).where(TagNode.node_id == body.parent_id)
-        )
-        for (tag_id,) in parent_tags.all():
-            tagnode = TagNode(tag_id=tag_id, node_id=new_node.id)
-            db.add(tagnode)
+        for idx, content in enumerate(ideas)
+    ])
+    with span("nodes.commit"):
         await db.commit()
+    await emit_delta(project_id, "node:create", [o.model_dump(mode="json") for o in nodes_created])
+    return nodes_created
 
-    await db.commit()
-    # 두 노드 모두 refresh
-    for node in nodes_created:
-        await db.refresh(node)
 
-    # 두 노드를 모두 NodeOut 형태로 변환하여 반환
-    return [NodeOut.from_orm(n) for n in nodes_created]
+# ── 내부 유틸: AI Ghost ───────────────────────────────────────────────
+async def _gen_ai_nodes(
+    project_id: int, body: NodeCreate, prompt: str, db: AsyncSession, uid: str, request: Request
+) -> List[NodeOut]:
+    """
+    GPT로 유령 노드 한 개를 생성하고, 한 노드를 반환합니다.
+    LLM 호출은 비동기 클라이언트로 수행하며, 클라이언트가 끊기면 취소됩니다.
+    """
+    await db.close()  # LLM 호출 동안 커넥션을 풀에 반납 (저장 시 다시 획득)
+    with span("nodes.ai.generate"):
+        ideas = await ai.cancel_on_disconnect(request, ai.generate_ideas(prompt))
+    return await _persist_ghost_nodes(project_id, body, ideas, db, uid)
+
+
+async def _run_ai_job(project_id: int, body: NodeCreate, uid: str) -> List[dict]:
+    """
+    작업 큐 워커에서 실행되는 AI 생성.
+    LLM 호출 동안에는 DB 커넥션을 잡지 않고, 저장할 때만 세션을 엽니다.
+    """
+    ideas = await ai.generate_ideas(body.ai_prompt)
+    async with AsyncSessionLocal() as session:
+        nodes_created = await _persist_ghost_nodes(project_id, body, ideas, session, uid)
+    return [o.model_dump(mode="json") for o in nodes_created]
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_ai_nodes(project_id: int, body: NodeCreate, uid: str) -> AsyncIterator[str]:
+    """
+    AI 제안을 SSE로 스트리밍합니다.
+    - event: delta  → 생성 중인 텍스트 조각
+    - event: node   → 첫 줄이 완성되어 GHOST 노드가 저장된 결과 (List[NodeOut])
+    - event: error  → 생성/저장 실패
+    첫 줄만 사용하므로 줄바꿈이 나오는 즉시 업스트림을 닫고 노드를 저장합니다.
+    응답 스트리밍 중에는 요청 의존성 세션이 이미 닫혀 있으므로 별도 세션을 엽니다.
+    """
+    text = ""
+    stream = ai.stream_completion(body.ai_prompt)
+    try:
+        async for delta in stream:
+            text += delta
+            if "\n" in text.lstrip():
+                # 첫 줄 완성: 첫 줄 조각까지만 보내고 중단
+                head = delta.split("\n")[0]
+                if head:
+                    yield _sse("delta", {"text": head})
+                break
+            yield _sse("delta", {"text": delta})
+    except HTTPException as e:
+        yield _sse("error", {"status": e.status_code, "detail": e.detail})
+        return
+    finally:
+        await stream.aclose()
+
+    await ai.remember_answer(body.ai_prompt, text)
+    ideas = ai.parse_ideas(text)
+    async with AsyncSessionLocal() as session:
+        nodes_created = await _persist_ghost_nodes(project_id, body, ideas, session, uid)
+    yield _sse("node", [o.model_dump(mode="json") for o in nodes_created])
 
 
 # ── CRUD ───────────────────────────────────────────────────────────────
+NDJSON_CHUNK = 500  # NDJSON 스트리밍 시 서버 측 커서에서 한 번에 가져올 행 수
+
+
+def _node_list_query(
+    project_id: int,
+    tag_ids: Optional[str],
+    bbox: Optional[str],
+    max_depth: Optional[int],
+    after_id: Optional[int],
+    limit: Optional[int],
+):
+    """
+    list_nodes 공용 쿼리: (NodeORM, tag_ids 배열) 행을 id 순으로 반환합니다.
+    태그 id 목록은 SQL에서 노드별로 집계합니다.
+    """
+    node_tags = (
+        select(func.array_agg(TagNode.tag_id))
+        .where(TagNode.node_id == NodeORM.id)
+        .scalar_subquery()
+    )
+    query = (
+        select(NodeORM, func.coalesce(node_tags, literal_column("'{}'::bigint[]")).label("tag_ids"))
+        .where(NodeORM.project_id == project_id)
+    )
+
+    if tag_ids:
+        wanted = [int(tid) for tid in tag_ids.split(",")]
+        query = query.where(
+            NodeORM.id.in_(select(TagNode.node_id).where(TagNode.tag_id.in_(wanted)))
+        )
+
+    # 뷰포트 모드: point(pos_x, pos_y) GiST 인덱스로 화면 안의 노드만 조회
+    if bbox:
+        try:
+            min_x, min_y, max_x, max_y = (float(v) for v in bbox.split(","))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="bbox must be min_x,min_y,max_x,max_y")
+        query = query.where(
+            func.point(NodeORM.pos_x, NodeORM.pos_y).op("<@")(
+                func.box(func.point(min_x, min_y), func.point(max_x, max_y))
+            )
+        )
+    if max_depth is not None:
+        query = query.where(NodeORM.depth <= max_depth)
+
+    # keyset 페이지네이션: (id) 기준
+    if after_id is not None:
+        query = query.where(NodeORM.id > after_id)
+    query = query.order_by(NodeORM.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def _node_out(node: NodeORM, tag_ids: List[int]) -> NodeOut:
+    out = NodeOut.from_orm(node)
+    out.tags = list(tag_ids or [])
+    return out
+
+
+async def _stream_nodes_ndjson(query) -> AsyncIterator[str]:
+    """
+    서버 측 커서로 NDJSON_CHUNK 행씩 읽어 한 줄에 노드 하나씩 내보냅니다.
+    응답 스트리밍 중에는 요청 의존성 세션이 닫혀 있으므로 별도 세션을 엽니다.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=NDJSON_CHUNK))
+        async for rows in result.partitions():
+            yield "".join(_node_out(n, tags).model_dump_json() + "\n" for n, tags in rows)
+            session.expunge_all()  # 이미 보낸 노드는 identity map에서 제거해 메모리를 일정하게 유지
+
+
 @router.get("", response_model=List[NodeOut])
 async def list_nodes(
     project_id: int,
+    response: Response,
     tag_ids: Optional[str] = Query(None),
+    bbox: Optional[str] = Query(None, description="뷰포트 영역 min_x,min_y,max_x,max_y"),
+    max_depth: Optional[int] = Query(None, ge=0, description="줌 레벨별 상세도 제한 (depth 이하만)"),
+    after_id: Optional[int] = Query(None, description="keyset 커서: 이 id 다음부터"),
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    fmt: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
     uid: str = Depends(_uid),
     db: AsyncSession = Depends(get_db)
 ):
+    """
+    프로젝트 노드 목록.
+    - after_id/limit: id 기준 keyset 페이지네이션 (다음 커서는 X-Next-Cursor 헤더)
+    - format=ndjson: 전체 목록을 NDJSON으로 스트리밍 (메모리 사용량이 맵 크기와 무관)
+    """
     await _m(int(uid), project_id, db)
+    with span("nodes.list.flush_positions"):
+        await position_buffer.flush(project_id)  # 버퍼에 남은 위치를 먼저 기록해 최신 좌표를 읽음
 
-    query = select(NodeORM).where(NodeORM.project_id == project_id)
-
-    if tag_ids:
-        wanted = [int(tid) for tid in tag_ids.split(",")]
-        query = (
-            query.join(TagNode, NodeORM.id == TagNode.node_id)
-                 .where(TagNode.tag_id.in_(wanted))
-        )
+    query = _node_list_query(project_id, tag_ids, bbox, max_depth, after_id, limit)
 
-    result = await db.execute(query)
-    nodes = result.scalars().all()
-    node_ids = [n.id for n in nodes]
-    tag_result = await db.execute(
-        select(TagNode.node_id, TagNode.tag_id).where(TagNode.node_id.in_(node_ids))
-    )
-    tag_map = {}
-    for node_id, tag_id in tag_result.all():
-        tag_map.setdefault(node_id, []).append(tag_id)
+    if fmt == "ndjson":
+        return StreamingResponse(_stream_nodes_ndjson(query), media_type="application/x-ndjson")
 
-    # NodeOut에 tags 필드 추가해서 반환
-    outs = []
-    for n in nodes:
-        out = NodeOut.from_orm(n)
-        out.tags = tag_map.get(n.id, [])
-        outs.append(out)
+    with span("nodes.list.query"):
+        result = await db.execute(query)
+        rows = result.all()
+    with span("nodes.list.serialize", count=len(rows)):
+        outs = [_node_out(n, tags) for n, tags in rows]
 
+    if limit is not None and len(outs) == limit:
+        response.headers["X-Next-Cursor"] = str(outs[-1].id)
     return outs
-    #return [NodeOut.from_orm(n) for n in nodes]
 
 
 @router.post("", response_model=List[NodeOut], status_code=status.HTTP_201_CREATED)
 async def create_nodes(
     body: NodeCreate,
     project_id: int,
+    request: Request,
+    stream: bool = Query(False),
+    background: bool = Query(False),
     uid: str = Depends(_uid),
     db: AsyncSession = Depends(get_db)
 ):
     await _m(int(uid), project_id, db)
-
-    # ✅ 1. AI 모드: ai_prompt 처리
+    await _ensure_parent(db, project_id, body.parent_id)  # AI 경로 포함, 생성 전에 한 번 검사
+
+    # ✅ 0. AI 백그라운드 모드: 작업 ID만 즉시 반환 (완료는 폴링 또는 WebSocket job:done 이벤트)
+    if body.ai_prompt and background:
+        await db.close()  # 멤버 확인 후 커넥션을 바로 반납
+        job = job_queue.submit(project_id, "ai:generate", _run_ai_job, project_id, body, uid)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(JobOut(**job.to_dict())),
+        )
+    # ✅ 1. AI 모드: ai_prompt 처리 (stream=true 이면 SSE로 토큰 단위 전송)
+    if body.ai_prompt and stream:
+        return StreamingResponse(
+            _stream_ai_nodes(project_id, body, uid),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
     if body.ai_prompt:
-        return await _gen_ai_nodes(project_id, body, body.ai_prompt, db, uid)
+        return await _gen_ai_nodes(project_id, body, body.ai_prompt, db, uid, request)
 
     # ✅ 2. content 필수 검사
     if not body.content:
@@ -170,23 +346,141 @@ async def create_nodes(
         pos_x=body.pos_x or 0.0,
         pos_y=body.pos_y or 0.0,
     )
-    db.add(new_node)
-    await db.commit()
+    with span("nodes.create.insert"):
+        db.add(new_node)
+        await db.flush()
+        await link_node(db, new_node.id, new_node.parent_id)
+        await bump_project(db, project_id, nodes=1)
+    with span("nodes.commit"):
+        await db.commit()
     await db.refresh(new_node)
 
     # ✅ 5. 부모 태그 상속
+    inherited_tag_ids: List[int] = []
     if body.parent_id is not None:
         parent_tags = await db.execute(
             select(TagNode.tag_id).where(TagNode.node_id == body.parent_id)
         )
-        for (tag_id,) in parent_tags.all():
+        inherited_tag_ids = [tag_id for (tag_id,) in parent_tags.all()]
+        for tag_id in inherited_tag_ids:
             tagnode = TagNode(tag_id=tag_id, node_id=new_node.id)
             db.add(tagnode)
+        await bump_tags(db, tally(inherited_tag_ids))
         await db.commit()
 
-    return [NodeOut.from_orm(new_node)]
+    out = _node_out(new_node, inherited_tag_ids)
+    await emit_delta(project_id, "node:create", [out.model_dump(mode="json")])
+    return [out]
+
+
+@router.get("/jobs/{job_id}", response_model=JobOut)
+async def get_job(
+    project_id: int,
+    job_id: str,
+    uid: str = Depends(_uid),
+    db: AsyncSession = Depends(get_db)
+):
+    await _m(int(uid), project_id, db)
+    job = job_queue.get(job_id)
+    if not job or job.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobOut(**job.to_dict())
 
 
+@router.post("/expand", response_model=NodeExpandOut, status_code=status.HTTP_201_CREATED)
+async def expand_nodes(
+    body: NodeExpand,
+    project_id: int,
+    request: Request,
+    response: Response,
+    uid: str = Depends(_uid),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    여러 부모 노드(최대 MAX_EXPAND_PARENTS 개)를 한 번에 AI 확장합니다.
+    - 멤버십 검사 1회, 부모 조회 1회
+    - 부모별 LLM 호출은 ai.generate_many 로 병렬 수행 (슬롯 대기 시간 제한 없음)
+    - 생성된 GHOST 노드/closure/상속 태그는 한 트랜잭션에서 bulk insert
+    일부 부모의 생성이 실패하면 성공한 노드만 저장하고 207 과 함께 실패한 부모를 failed 에 담아 반환합니다.
+    모두 실패하면 첫 오류를 반환합니다.
+    """
+    await _m(int(uid), project_id, db)
+
+    parent_ids = list(dict.fromkeys(body.parent_ids))
+    if not parent_ids:
+        return NodeExpandOut(nodes=[])
+    await position_buffer.flush(project_id)  # 부모 좌표 기준으로 배치하므로 최신 위치 반영
+    with span("nodes.expand.load_parents", count=len(parent_ids)):
+        result = await db.execute(
+            select(NodeORM).where(NodeORM.id.in_(parent_ids), NodeORM.project_id == project_id)
+        )
+        parents = {p.id: p for p in result.scalars().all()}
+    missing = [pid for pid in parent_ids if pid not in parents]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Node not found: {missing}")
+
+    ordered = [parents[pid] for pid in parent_ids]
+    await db.close()  # LLM 호출 동안 커넥션을 풀에 반납 (저장 시 다시 획득)
+    with span("nodes.ai.generate", count=len(ordered)):
+        outcomes = await ai.cancel_on_disconnect(request, ai.generate_many([p.content for p in ordered]))
+    errors = [o for o in outcomes if isinstance(o, BaseException)]
+    if errors and len(errors) == len(outcomes):
+        raise errors[0]
+
+    rows = []
+    failed = []
+    for parent, ideas in zip(ordered, outcomes):
+        if isinstance(ideas, BaseException):
+            if isinstance(ideas, HTTPException):
+                failed.append(NodeExpandFailure(parent_id=parent.id, status=ideas.status_code, detail=str(ideas.detail)))
+            else:
+                failed.append(NodeExpandFailure(parent_id=parent.id, status=500, detail=str(ideas)))
+            continue
+        for idx, content in enumerate(ideas):
+            rows.append(dict(
+                project_id=project_id,
+                parent_id=parent.id,
+                author_id=int(uid),
+                content=content,
+                depth=parent.depth + 1,
+                order_index=idx,
+                pos_x=(parent.pos_x or 0.0) + body.offset_x,
+                pos_y=(parent.pos_y or 0.0) + body.offset_y,
+            ))
+    nodes_created = await _insert_ghost_nodes(db, rows)
+    with span("nodes.commit"):
+        await db.commit()
+    await emit_delta(project_id, "node:create", [o.model_dump(mode="json") for o in nodes_created])
+    if failed:
+        response.status_code = status.HTTP_207_MULTI_STATUS
+    return NodeExpandOut(nodes=nodes_created, failed=failed)
+
+
+@router.patch("/positions", response_model=Dict[str, int])
+async def update_positions(
+    body: NodePositionsUpdate,
+    project_id: int = Path(...),
+    uid: str = Depends(_uid),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    여러 노드의 위치를 한 번에 갱신합니다 (드래그 앤 드롭).
+    멤버십 검사 1회 + UPDATE ... FROM (VALUES ...) 1문장 + 커밋 1회.
+    """
+    await _m(int(uid), project_id, db)
+    async with position_buffer.direct_write(project_id, [p.node_id for p in body.positions]):
+        with span("nodes.positions.update", count=len(body.positions)):
+            updated = await bulk_update_positions(
+                db, project_id, ((p.node_id, p.pos_x, p.pos_y) for p in body.positions)
+            )
+        with span("nodes.commit"):
+            await db.commit()
+    if updated:
+        await emit_delta(project_id, "node:move", {
+            "nodes": [[p.node_id, p.pos_x, p.pos_y] for p in body.positions],
+        })
+    return {"updated": updated}
+
 
 @router.patch("/{node_id}", response_model=NodeOut)
 async def update_node(
@@ -198,36 +492,80 @@ async def update_node(
 ):
     await _m(int(uid), project_id, db)
 
+    # 위치만 바뀌는 요청(드래그 중)은 버퍼에 모았다가 주기적으로 한꺼번에 기록
+    position_only = (
+        (body.pos_x is not None or body.pos_y is not None)
+        and body.content is None and body.depth is None
+        and body.order is None and body.parent_id is None
+    )
+    if not position_only:
+        await position_buffer.flush(project_id)  # 응답/delta 가 버퍼에 있는 최신 위치를 담도록
+
     result = await db.execute(
         select(NodeORM).where(NodeORM.id == node_id, NodeORM.project_id == project_id)
     )
     node = result.scalar_one_or_none()
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
-    print("log")
-    print(body.pos_x)
-    updated = False
-    if body.content is not None:
-        node.content = body.content
-        updated = True
-    if body.pos_x is not None:
-        node.pos_x = body.pos_x
-        updated = True
-    if body.pos_y is not None:
-        node.pos_y = body.pos_y
-        updated = True
-    if body.depth is not None:
-        node.depth = body.depth
-        updated = True
-    if body.order is not None:
-        node.order_index = body.order
-        updated = True
 
+    if position_only:
+        prev_x, prev_y = position_buffer.pending(project_id, node_id) or (node.pos_x, node.pos_y)
+        pos_x = body.pos_x if body.pos_x is not None else prev_x
+        pos_y = body.pos_y if body.pos_y is not None else prev_y
+        position_buffer.put(project_id, node_id, pos_x, pos_y)
+        await emit_delta(project_id, "node:move", {"nodes": [[node_id, pos_x, pos_y]]})
+        out = NodeOut.from_orm(node)
+        out.pos_x, out.pos_y = pos_x, pos_y
+        return out
+    # 위치를 직접 쓰는 경우 버퍼의 예전 값이 나중에 덮어쓰지 않도록 커밋까지 flush 와 같은 잠금 안에서
+    moves = body.pos_x is not None or body.pos_y is not None
+    async with position_buffer.direct_write(project_id, [node_id]) if moves else nullcontext():
+        updated = False
+        depth_delta = 0
+        if body.content is not None:
+            node.content = body.content
+            updated = True
+        if body.pos_x is not None:
+            node.pos_x = body.pos_x
+            updated = True
+        if body.pos_y is not None:
+            node.pos_y = body.pos_y
+            updated = True
+        if body.depth is not None:
+            node.depth = body.depth
+            updated = True
+        if body.order is not None:
+            node.order_index = body.order
+            updated = True
+        if body.parent_id is not None and body.parent_id != node.parent_id:
+            # reparent: 새 부모 확인 후 closure table까지 함께 이동
+            result = await db.execute(
+                select(NodeORM).where(NodeORM.id == body.parent_id, NodeORM.project_id == project_id)
+            )
+            new_parent = result.scalar_one_or_none()
+            if not new_parent:
+                raise HTTPException(status_code=404, detail="Parent node not found")
+            old_depth = node.depth
+            await move_subtree(db, node, new_parent)
+            depth_delta = node.depth - old_depth
+            updated = True
+
+        if updated:
+            with span("nodes.commit"):
+                await db.commit()
+
+    out = None
     if updated:
-        await db.commit()
         await db.refresh(node)
+        out = NodeOut.from_orm(node)
+        # tags 는 여기서 읽지 않으므로 delta 에서 제외 (클라이언트 태그 목록을 덮어쓰지 않도록)
+        # depth_delta: reparent 시 자손 노드 depth 도 같은 만큼 바뀜
+        await emit_delta(project_id, "node:update", {
+            "node": out.model_dump(mode="json", exclude={"tags"}),
+            "depth_delta": depth_delta,
+        })
 
-    return NodeOut.from_orm(node)
+    return out or NodeOut.from_orm(node)
 
 
 @router.delete("/{node_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -248,19 +586,25 @@ async def delete_node(
         raise HTTPException(status_code=404, detail="Node not found")
 
     # (2) 모든 자식 노드 id 리스트 수집 (자기 자신 포함)
-    node_ids = await get_descendant_node_ids( node_id,db)
+    with span("nodes.delete.collect"):
+        node_ids = await get_descendant_node_ids(node_id, db)
 
-    # (3) 해당 노드들에 연결된 태그 관계 모두 삭제
-    await db.execute(
-        delete(TagNode).where(TagNode.node_id.in_(node_ids))
-    )
+    with span("nodes.delete.delete", count=len(node_ids)):
+        # (3) 해당 노드들에 연결된 태그 관계 모두 삭제
+        detached = await db.execute(
+            delete(TagNode).where(TagNode.node_id.in_(node_ids)).returning(TagNode.tag_id)
+        )
+        await bump_tags(db, tally(detached.scalars().all(), sign=-1))
 
-    # (4) 실제 노드들 삭제
-    await db.execute(
-        delete(NodeORM).where(NodeORM.id.in_(node_ids))
-    )
+        # (4) 실제 노드들 삭제
+        deleted = await db.execute(
+            delete(NodeORM).where(NodeORM.id.in_(node_ids))
+        )
+        await bump_project(db, project_id, nodes=-deleted.rowcount)
 
-    await db.commit()
+    with span("nodes.commit"):
+        await db.commit()
+    await emit_delta(project_id, "node:delete", {"ids": node_ids})
     return
 
 
@@ -272,6 +616,7 @@ async def activate_node(
     db: AsyncSession = Depends(get_db)
 ):
     await _m(int(uid), project_id, db)
+    await position_buffer.flush(project_id)  # 반환하는 NodeOut 에 최신 위치 반영
 
     result = await db.execute(
         select(NodeORM).where(NodeORM.id == node_id, NodeORM.project_id == project_id)
@@ -284,17 +629,22 @@ async def activate_node(
         raise HTTPException(status_code=400, detail="Node is not in GHOST state")
     node.state = NodeStateEnum.ACTIVE
 
-    # 1. 모든 자식 노드 조회
-    node_ids = await get_descendant_node_ids(node_id,db)
-
-    # 2. 자식 노드도 ACTIVE로 변경 (GHOST 상태만)
-    await db.execute(
-        update(NodeORM)
-        .where(NodeORM.id.in_(node_ids), NodeORM.state == NodeStateEnum.GHOST)
-        .values(state=NodeStateEnum.ACTIVE)
-    )
+    # 1~2. 자식 노드 중 GHOST 상태만 ACTIVE로 변경 (서브트리는 CTE 서브쿼리로 한 번에)
+    with span("nodes.activate.update"):
+        changed = await db.execute(
+            update(NodeORM)
+            .where(NodeORM.id.in_(subtree_select(node_id, states=[NodeStateEnum.GHOST])))
+            .values(state=NodeStateEnum.ACTIVE)
+            .returning(NodeORM.id)
+        )
+        changed_ids = set(changed.scalars().all())
+        changed_ids.add(node_id)
 
-    await db.commit()
+    with span("nodes.commit"):
+        await db.commit()
+    await emit_delta(project_id, "node:state", {
+        "ids": sorted(changed_ids), "state": NodeStateEnum.ACTIVE.value,
+    })
     await db.refresh(node)
     return NodeOut.from_orm(node)
 
@@ -307,6 +657,7 @@ async def deactivate_node(
     db: AsyncSession = Depends(get_db)
 ):
     await _m(int(uid), project_id, db)
+    await position_buffer.flush(project_id)  # 반환하는 NodeOut 에 최신 위치 반영
 
     # (1) 노드 존재 확인
     result = await db.execute(
@@ -316,17 +667,21 @@ async def deactivate_node(
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
 
-    # (2) 전체 자식 노드 id 수집 (자기자신 포함)
-    node_ids = await get_descendant_node_ids( node_id,db)
-
-    # (3) ACTIVE 상태인 노드만 GHOST로 일괄 비활성화
-    # bulk select
-    await db.execute(
-        update(NodeORM)
-        .where(NodeORM.id.in_(node_ids), NodeORM.state == NodeStateEnum.ACTIVE)
-        .values(state=NodeStateEnum.GHOST)
-    )
+    # (2)~(3) 서브트리(자기자신 포함) 중 ACTIVE 상태인 노드만 GHOST로 일괄 비활성화
+    with span("nodes.deactivate.update"):
+        changed = await db.execute(
+            update(NodeORM)
+            .where(NodeORM.id.in_(subtree_select(node_id, states=[NodeStateEnum.ACTIVE])))
+            .values(state=NodeStateEnum.GHOST)
+            .returning(NodeORM.id)
+        )
+        changed_ids = changed.scalars().all()
 
-    await db.commit()
+    with span("nodes.commit"):
+        await db.commit()
+    if changed_ids:
+        await emit_delta(project_id, "node:state", {
+            "ids": sorted(changed_ids), "state": NodeStateEnum.GHOST.value,
+        })
     await db.refresh(node)
     return NodeOut.from_orm(node)
@@ -3,7 +3,8 @@
 import uuid
 from typing import List, Dict, Any, Optional
 
-from fastapi import APIRouter, Depends, Path, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Path, Query, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, delete
 from sqlalchemy.orm import selectinload
@@ -17,7 +18,7 @@ from app.db.models.project import Project as ProjectORM
 from app.db.models.project_user_role import ProjectUserRole
 from app.db.models.node import Node as NodeORM
 from app.db.models.tag import Tag as TagORM
-from app.db.session import AsyncSessionLocal
+from app.db.session import get_db
 
 from fastapi import APIRouter, Depends, Path, HTTPException, status
 from sqlalchemy import select, func
@@ -31,16 +32,14 @@ from app.db.models.project import Project as ProjectORM
 from app.db.models.node import Node as NodeORM, NodeStateEnum  # ← Enum 같이 import
 from app.db.models.tag import Tag as TagORM
 from app.db.models.tag_node import TagNode
-from app.db.session import AsyncSessionLocal
+from app.db.session import get_db
+from app.utils.tree import link_node
+from app.utils.helpers import membership_cache
+from app.utils.tracing import span
+from app.utils.summary_cache import summary_cache, etag_matches
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
 
-# ── DB 세션 의존성 ────────────────────────────────────────────────
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
-
-
 # ── CRUD 기본 ────────────────────────────────────────────────────
 
 @router.get("", response_model=List[ProjectOut])
@@ -67,8 +66,9 @@ async def list_projects(
     if owned:
         query = query.where(ProjectORM.owner_id == int(uid))
 
-    result = await db.execute(query)
-    projects = result.scalars().all()
+    with span("projects.list.query"):
+        result = await db.execute(query)
+        projects = result.scalars().all()
     return [ProjectOut.from_orm(p) for p in projects]
 
 
@@ -89,6 +89,7 @@ async def create_project(
         name=body.name,
         description=body.description,
         is_deleted=False,
+        node_count=1,  # 아래에서 함께 만드는 루트 노드
     )
     db.add(new_proj)
     await db.flush()  # new_proj.id를 얻기 위해 flush
@@ -105,6 +106,8 @@ async def create_project(
         pos_y=400,
     )
     db.add(root)
+    await db.flush()
+    await link_node(db, root.id, None)
 
     # ( 프로젝트 생성 후, 멤버십 추가 )
     membership = ProjectUserRole(
@@ -116,6 +119,7 @@ async def create_project(
 
     await db.commit()
     await db.refresh(new_proj)
+    membership_cache.invalidate(new_proj.id)
     return ProjectOut.from_orm(new_proj)
 
 
@@ -128,7 +132,7 @@ async def get_project(
     """
     특정 프로젝트 상세 조회.
     - 멤버 권한 확인 (ensure_member)
-    - node_count, tag_count는 동적 집계해서 반환 필드에 포함
+    - node_count, tag_count는 project 행에 저장된 카운터를 그대로 반환
     """
     await _m(int(uid), project_id, db)
 
@@ -140,22 +144,8 @@ async def get_project(
     if not proj:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # (2) node_count 집계
-    result = await db.execute(
-        select(func.count(NodeORM.id)).where(NodeORM.project_id == project_id)
-    )
-    node_count = result.scalar_one()
-
-    # (3) tag_count 집계
-    result = await db.execute(
-        select(func.count(TagORM.id)).where(TagORM.project_id == project_id)
-    )
-    tag_count = result.scalar_one()
-
-    out = ProjectOut.from_orm(proj)
+    out = ProjectOut.from_orm(proj)  # node_count / tag_count 포함
     out.member_count = None  # 출력 스키마에 optional로 있지만, 필요시 별도 API로 제공 가능
-    out.node_count = node_count
-    out.tag_count = tag_count
     return out
 
 
@@ -179,6 +169,7 @@ async def update_project(
         proj.description = body.description
 
     await db.commit()
+    summary_cache.touch(project_id)
     await db.refresh(proj)
     return ProjectOut.from_orm(proj)
 
@@ -199,6 +190,8 @@ async def delete_project(
     # 소프트 딜리트
     proj.is_deleted = True
     await db.commit()
+    membership_cache.invalidate(project_id)
+    summary_cache.touch(project_id)
     return
 
 
@@ -217,7 +210,7 @@ async def invite_project(
     - InviteToken 테이블이 있으면, 해당 테이블에 레코드 저장
       (편의상 로직 생략, 필요 시 InviteToken ORM으로 바꾸세요)
     """
-    await _o(int(uid), project_id, db)
+    await _o(int(uid), project_id, db, load_project=False)
 
     # 예시: 단순 토큰 생성 (실제로는 InviteToken ORM에 저장)
     token = uuid.uuid4().hex
@@ -258,33 +251,25 @@ async def join_project(
         )
         db.add(membership)
         await db.commit()
+        membership_cache.invalidate(project_id, int(uid))
 
     return {"project_id": project_id, "status": "joined"}
 
 
 # ── 프로젝트 요약 ───────────────────────────────────────────────────────
-@router.get("/{project_id}/summary", response_model=Dict[str, Any])
-async def project_summary(
-    project_id: int = Path(...),
-    uid: str = Depends(_uid),
-    db: AsyncSession = Depends(get_db),
-):
-    await _o(int(uid), project_id, db)
-
-    # 1) 태그별 node_count 집계
-    tag_counts = await db.execute(
-        select(
-            TagORM.id.label("tag_id"),
-            TagORM.name.label("tag_name"),
-            func.count(NodeORM.id).label("node_count"),
+async def _build_summary(project_id: int, db: AsyncSession) -> Dict[str, Any]:
+    # 1) 태그별 node_count (tag 행에 저장된 카운터, 조인/집계 없음)
+    with span("projects.summary.tag_counts"):
+        tag_counts = await db.execute(
+            select(
+                TagORM.id.label("tag_id"),
+                TagORM.name.label("tag_name"),
+                TagORM.node_count,
+            )
+            .where(TagORM.project_id == project_id)
+            .order_by(TagORM.node_count.desc())
         )
-        .outerjoin(TagNode, TagORM.id == TagNode.tag_id)
-        .outerjoin(NodeORM, NodeORM.id == TagNode.node_id)
-        .where(TagORM.project_id == project_id)
-        .group_by(TagORM.id)
-        .order_by(func.count(NodeORM.id).desc())
-    )
-    rows = tag_counts.all()
+        rows = tag_counts.all()
 
     # 2) 결과 조합
     tag_summaries = [
@@ -297,14 +282,11 @@ async def project_summary(
     ]
 
     # 3) 최종 반환
-    # project_name, total_nodes, total_tags 등도 각각 집계
-    proj_obj = await db.get(ProjectORM, project_id)
-    total_nodes = (await db.execute(
-        select(func.count(NodeORM.id)).where(NodeORM.project_id == project_id)
-    )).scalar_one()
-    total_tags = (await db.execute(
-        select(func.count(TagORM.id)).where(TagORM.project_id == project_id)
-    )).scalar_one()
+    # project_name, total_nodes, total_tags 는 project 행의 카운터에서
+    with span("projects.summary.totals"):
+        proj_obj = await db.get(ProjectORM, project_id)
+        total_nodes = proj_obj.node_count
+        total_tags = proj_obj.tag_count
 
     return {
         "project_id": project_id,
@@ -312,4 +294,32 @@ async def project_summary(
         "total_nodes": total_nodes,
         "total_tags": total_tags,
         "tag_summaries": tag_summaries,
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/{project_id}/summary", response_model=Dict[str, Any])
+async def project_summary(
+    request: Request,
+    project_id: int = Path(...),
+    uid: str = Depends(_uid),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    프로젝트 요약. 결과는 변경(버전)이 있을 때까지 캐시하고 ETag 로 검증합니다.
+    If-None-Match 가 현재 ETag 와 같으면 본문 없이 304 를 반환합니다.
+    """
+    await _o(int(uid), project_id, db, load_project=False)
+
+    cached = summary_cache.get(project_id)
+    if cached is not None:
+        etag, payload = cached
+    else:
+        version = summary_cache.version(project_id)  # 계산 전에 읽어야 도중의 변경을 놓치지 않음
+        payload = await _build_summary(project_id, db)
+        etag = summary_cache.put(project_id, version, payload)
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        summary_cache.not_modified += 1
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(content=payload, headers=headers)
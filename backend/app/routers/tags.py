@@ -13,18 +13,16 @@ from app.utils.helpers import ensure_member as _m, ensure_owner as _o
 from app.db.models.tag import Tag as TagORM
 from app.db.models.tag_node import TagNode as TagNodeORM
 from app.db.models.node import Node as NodeORM
-from app.db.session import AsyncSessionLocal
+from app.db.session import get_db
+from app.utils.tree import get_descendant_node_ids
+from app.utils.tracing import span
+from app.utils.counters import bump_project, bump_tags
+from app.utils.ws_manager import emit_delta
 
 
 router = APIRouter(prefix="/projects/{project_id}/tags", tags=["Tags"])
 
 
-# ── DB 세션 의존성 ────────────────────────────────────────────────
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
-
-
 # ── 태그 목록 조회 ─────────────────────────────────────────────────
 @router.get("", response_model=List[TagOut])
 async def list_tags(
@@ -46,20 +44,7 @@ async def list_tags(
     if not tags:
         return []
 
-    # (2) 각 태그별 node_count 집계
-    #    -> TagNode 테이블에서 count(node_id) group by tag_id
-    tag_ids = [t.id for t in tags]
-    counts_result = await db.execute(
-        select(
-            TagNodeORM.tag_id,
-            func.count(TagNodeORM.node_id).label("node_count"),
-        )
-        .where(TagNodeORM.tag_id.in_(tag_ids))
-        .group_by(TagNodeORM.tag_id)
-    )
-    counts = {row.tag_id: row.node_count for row in counts_result.all()}
-
-    # (3) Pydantic 모델 생성
+    # (2) Pydantic 모델 생성 (node_count 는 태그 행에 저장된 카운터)
     out_list: List[TagOut] = []
     for t in tags:
         out_list.append(
@@ -68,7 +53,7 @@ async def list_tags(
                 project_id=t.project_id,
                 name=t.name,
                 color=t.color,
-                node_count=counts.get(t.id, 0),
+                node_count=t.node_count,
                 nodes=None,  # 목록 조회 시 상세 노드 ID는 포함하지 않음
             )
         )
@@ -96,11 +81,12 @@ async def create_tag(
         color=body.color,
     )
     db.add(new_tag)
+    await bump_project(db, project_id, tags=1)
     await db.commit()
     await db.refresh(new_tag)
 
     # 생성 직후 node_count는 0
-    return TagOut(
+    out = TagOut(
         id=new_tag.id,
         project_id=new_tag.project_id,
         name=new_tag.name,
@@ -108,6 +94,8 @@ async def create_tag(
         node_count=0,
         nodes=None,
     )
+    await emit_delta(project_id, "tag:create", {"tag": out.model_dump(mode="json")})
+    return out
 
 
 # ── 태그 상세 조회 ───────────────────────────────────────────────────
@@ -184,20 +172,16 @@ async def update_tag(
     await db.commit()
     await db.refresh(tag)
 
-    # (3) node_count만 재집계
-    node_count_result = await db.execute(
-        select(func.count(TagNodeORM.node_id)).where(TagNodeORM.tag_id == tag_id)
-    )
-    node_count = node_count_result.scalar_one()
-
-    return TagOut(
+    out = TagOut(
         id=tag.id,
         project_id=tag.project_id,
         name=tag.name,
         color=tag.color,
-        node_count=node_count,
+        node_count=tag.node_count,
         nodes=None,
     )
+    await emit_delta(project_id, "tag:update", {"tag": out.model_dump(mode="json")})
+    return out
 
 
 # ── 태그 삭제 ───────────────────────────────────────────────────────
@@ -224,10 +208,36 @@ async def delete_tag(
         raise HTTPException(status_code=404, detail="Tag not found")
 
     await db.delete(tag)
+    await bump_project(db, project_id, tags=-1)
     await db.commit()
+    await emit_delta(project_id, "tag:delete", {"id": tag_id})
     return
 
 
+# ── 태그-노드 연결 공통 검사 ─────────────────────────────────────────
+async def _check_tag_node(db: AsyncSession, project_id: int, tag_id: int, node_id: int) -> bool:
+    """
+    태그/노드가 프로젝트에 속하는지와 현재 연결 여부를 한 번의 쿼리로 확인합니다.
+    태그나 노드가 없으면 404, 있으면 연결 여부(bool)를 반환합니다.
+    """
+    row = await db.execute(
+        select(
+            select(TagORM.id).where(TagORM.id == tag_id, TagORM.project_id == project_id).exists(),
+            select(NodeORM.id).where(NodeORM.id == node_id, NodeORM.project_id == project_id).exists(),
+            select(TagNodeORM.tag_id).where(
+                TagNodeORM.tag_id == tag_id,
+                TagNodeORM.node_id == node_id
+            ).exists(),
+        )
+    )
+    tag_ok, node_ok, attached = row.one()
+    if not tag_ok:
+        raise HTTPException(status_code=404, detail="Tag not found")
+    if not node_ok:
+        raise HTTPException(status_code=404, detail="Node not found")
+    return attached
+
+
 # ── 태그-노드 연결 (attach) ─────────────────────────────────────────
 @router.post(
     "/{tag_id}/nodes/{node_id}",
@@ -246,68 +256,42 @@ async def attach_tag(
     - ensure_member 검사
     - 이미 연결되어 있으면 409 에러
     """
-    t0 = time.time()
-    await _m(int(uid), project_id, db)
-    t1 = time.time()
+    with span("tags.attach.auth"):
+        await _m(int(uid), project_id, db)
 
-    # (1) Tag가 project_id에 속하는지 확인
-    tag_row = await db.execute(
-        select(TagORM).where(TagORM.id == tag_id, TagORM.project_id == project_id)
-    )
-    tag = tag_row.scalar_one_or_none()
-    if not tag:
-        raise HTTPException(status_code=404, detail="Tag not found")
-    t2 = time.time()
+    # (1)~(3) Tag/Node 소속 확인 + 이미 연결된 적 있는지 검사 (쿼리 1회)
+    with span("tags.attach.validate"):
+        if await _check_tag_node(db, project_id, tag_id, node_id):
+            raise HTTPException(status_code=409, detail="Already attached")
 
-    # (2) Node가 project_id에 속하는지 확인
-    node_row = await db.execute(
-        select(NodeORM).where(NodeORM.id == node_id, NodeORM.project_id == project_id)
-    )
-    node = node_row.scalar_one_or_none()
-    if not node:
-        raise HTTPException(status_code=404, detail="Node not found")
-    t3 = time.time()
-        
-    
-
-    # (3) 이미 연결된 적 있는지 검사
-    exist = await db.execute(
-        select(TagNodeORM).where(
-            TagNodeORM.tag_id == tag_id,
-            TagNodeORM.node_id == node_id
-        )
-    )
-    if exist.scalar_one_or_none():
-        raise HTTPException(status_code=409, detail="Already attached")
-    t4 = time.time()
-    
     # (4) 모든 자손 노드 id 수집
-    node_ids = await get_descendant_node_ids(node_id,db)
-    t5 = time.time()
+    with span("tags.attach.collect"):
+        node_ids = await get_descendant_node_ids(node_id, db)
 
     # (5) 이미 연결된 관계는 제외하고 bulk insert
     # 이미 연결된 (tag_id, node_id) 목록 조회
-    exist_rows = await db.execute(
-        select(TagNodeORM.node_id)
-        .where(
-            TagNodeORM.tag_id == tag_id,
-            TagNodeORM.node_id.in_(node_ids)
+    with span("tags.attach.lookup"):
+        exist_rows = await db.execute(
+            select(TagNodeORM.node_id)
+            .where(
+                TagNodeORM.tag_id == tag_id,
+                TagNodeORM.node_id.in_(node_ids)
+            )
         )
-    )
-    already_attached = set(row[0] for row in exist_rows.all())
-    t6 = time.time()
+        already_attached = set(row[0] for row in exist_rows.all())
 
     # 신규 연결 대상만 추림
     # 연결
-    to_attach = [nid for nid in node_ids if nid not in already_attached]
-    db.add_all([TagNodeORM(tag_id=tag_id, node_id=nid) for nid in to_attach])
-    await db.commit()
-    t7 = time.time()
-    
-    print(f"타이밍: 권한:{t1-t0:.3f}s, 태그:{t2-t1:.3f}s, 노드:{t3-t2:.3f}s, 존재확인:{t4-t3:.3f}s, 자손수집:{t5-t4:.3f}s, 조희:{t6-t5:.3f}s, 연결:{t7-t6:.3f} 총합:{t7-t0:.3f}s")
+    with span("tags.attach.insert"):
+        to_attach = [nid for nid in node_ids if nid not in already_attached]
+        db.add_all([TagNodeORM(tag_id=tag_id, node_id=nid) for nid in to_attach])
+        await bump_tags(db, {tag_id: len(to_attach)})
+        await db.commit()
+    await emit_delta(project_id, "tag_node:attach", {"tag_id": tag_id, "node_ids": to_attach})
+
     return {"tag_id": tag_id, "node_id": node_id, "status": "attached"}
 
-import time
+
 # ── 태그-노드 연결 해제 (detach) ────────────────────────────────────
 @router.delete(
     "/{tag_id}/nodes/{node_id}",
@@ -326,70 +310,29 @@ async def detach_tag(
     - ensure_member 검사
     - 연결된 적 없으면 400 에러
     """
-    t0 = time.time()
-    await _m(int(uid), project_id, db)
-    t1 = time.time()
-
-    # (1) Tag 존재 여부 검사
-    tag_row = await db.execute(
-        select(TagORM).where(TagORM.id == tag_id, TagORM.project_id == project_id)
-    )
-    tag = tag_row.scalar_one_or_none()
-    if not tag:
-        raise HTTPException(status_code=404, detail="Tag not found")
-    t2 = time.time()
+    with span("tags.detach.auth"):
+        await _m(int(uid), project_id, db)
 
-    # (2) Node 존재 여부 검사
-    node_row = await db.execute(
-        select(NodeORM).where(NodeORM.id == node_id, NodeORM.project_id == project_id)
-    )
-    node = node_row.scalar_one_or_none()
-    if not node:
-        raise HTTPException(status_code=404, detail="Node not found")
-    t3 = time.time()
-
-    # (3) TagNode 연결 여부 검사
-    exist = await db.execute(
-        select(TagNodeORM).where(
-            TagNodeORM.tag_id == tag_id,
-            TagNodeORM.node_id == node_id
-        )
-    )
-    if not exist.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="Node not tagged")
-    t4 = time.time()
+    # (1)~(3) Tag/Node 존재 + TagNode 연결 여부 검사 (쿼리 1회)
+    with span("tags.detach.validate"):
+        if not await _check_tag_node(db, project_id, tag_id, node_id):
+            raise HTTPException(status_code=400, detail="Node not tagged")
 
     # (4) 모든 자손 노드 id 수집 (자기 자신 포함)
-    node_ids = await get_descendant_node_ids(node_id,db)  # ← 앞서 정의한 함수 재사용
-    t5 = time.time()
+    with span("tags.detach.collect"):
+        node_ids = await get_descendant_node_ids(node_id, db)
 
     # (5) 실제로 연결되어 있던 TagNodeORM 삭제 (bulk)
-    await db.execute(
-        delete(TagNodeORM).where(
-            TagNodeORM.tag_id == tag_id,
-            TagNodeORM.node_id.in_(node_ids)
+    with span("tags.detach.delete"):
+        detached = await db.execute(
+            delete(TagNodeORM).where(
+                TagNodeORM.tag_id == tag_id,
+                TagNodeORM.node_id.in_(node_ids)
+            ).returning(TagNodeORM.node_id)
         )
-    )
-    await db.commit()
-    t6 = time.time()
-
-    print(f"타이밍: 권한:{t1-t0:.3f}s, 태그:{t2-t1:.3f}s, 노드:{t3-t2:.3f}s, 존재확인:{t4-t3:.3f}s, 자손수집:{t5-t4:.3f}s, 삭제:{t6-t5:.3f}s, 총합:{t6-t0:.3f}s")
+        detached_ids = detached.scalars().all()
+        await bump_tags(db, {tag_id: -len(detached_ids)})
+        await db.commit()
+    await emit_delta(project_id, "tag_node:detach", {"tag_id": tag_id, "node_ids": detached_ids})
 
     return {"tag_id": tag_id, "node_id": node_id, "status": "detached"}
-
-# 자식노드 리스트를 전부 반환하는 메소드
-async def get_descendant_node_ids(node_id: int,db: AsyncSession = Depends(get_db)) -> list[int]:
-    """
-    node_id를 루트로 하는 모든 자손 노드들의 id를 리스트로 반환 (자기 자신 포함)
-    """
-    result = [node_id]
-    queue = [node_id]
-    while queue:
-        current_id = queue.pop()
-        rows = await db.execute(
-            select(NodeORM.id).where(NodeORM.parent_id == current_id)
-        )
-        children = [row[0] for row in rows.all()]
-        result.extend(children)
-        queue.extend(children)
-    return result
\ No newline at end of file
@@ -1,9 +1,9 @@
 # backend/app/routers/users.py
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, and_
 
 from app.models.user import UserRead  # Pydantic
 from app.db.models.user import User    # ORM
@@ -13,14 +13,10 @@ from app.db.models.node import Node
 from app.db.models.project_user_role import ProjectUserRole
 from app.db.models.tag_node import TagNode
 from app.core.security import get_current_user_id as _uid
-from app.db.session import AsyncSessionLocal
+from app.db.session import get_db
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
-
 
 @router.get("/me", response_model=UserRead)
 async def me(
@@ -36,55 +32,53 @@ async def me(
 
 @router.get("/me/tag-summaries", response_model=List[Dict[str, Any]])
 async def my_tag_summaries(
+    response: Response,
+    after_id: Optional[int] = Query(None, description="keyset 커서: 이 tag_id 다음부터"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
     uid: str = Depends(_uid),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    - 사용자가 속한 모든 프로젝트를 ProjectUserRole에서 조회
-    - 각 프로젝트별로 Tag 테이블을 조회
-    - TagNode 매핑을 통해 '이 태그에 속한 노드들'을 조회
-    - Node.author_id == uid 인 개수를 세서 nodes_contributed로 반환
+    사용자가 속한 모든 프로젝트의 태그별로, 그 태그가 붙은 노드 중
+    사용자가 작성한 노드 수(nodes_contributed)를 반환합니다.
+    - project_user_role ⨝ tag ⟕ tag_node ⟕ node 를 한 번에 GROUP BY 집계 (쿼리 1회)
+    - after_id/limit: tag_id 기준 keyset 페이지네이션 (다음 커서는 X-Next-Cursor 헤더)
     """
-    # 1) 이 사용자가 속한 프로젝트 ID 목록
-    projects_result = await db.execute(
-        select(ProjectUserRole.project_id).where(ProjectUserRole.user_id == int(uid))
-    )
-    project_ids = [pid for (pid,) in projects_result.all()]
-
-    summaries: List[Dict[str, Any]] = []
-    for pid in project_ids:
-        # 2) 프로젝트별 태그
-        tags_result = await db.execute(
-            select(Tag).where(Tag.project_id == pid)
+    user_id = int(uid)
+    query = (
+        select(
+            Tag.project_id,
+            Tag.id.label("tag_id"),
+            Tag.name.label("tag_name"),
+            func.count(Node.id).label("nodes_contributed"),
         )
-        tags = tags_result.scalars().all()
-
-        for tag in tags:
-            # 3) 이 태그에 연결된 모든 node_id 조회 (TagNode)
-            node_ids_result = await db.execute(
-                select(TagNode.node_id).where(TagNode.tag_id == tag.id)
-            )
-            node_ids_for_tag = [nid for (nid,) in node_ids_result.all()]
-
-            if not node_ids_for_tag:
-                contributed_count = 0
-            else:
-                # 4) 이 사용자가 작성한 노드 중, 위 node_ids_for_tag에 속하는 것만 카운트
-                contrib_nodes_result = await db.execute(
-                    select(func.count(Node.id)).where(
-                        Node.id.in_(node_ids_for_tag),
-                        Node.author_id == uid
-                    )
-                )
-                contributed_count = contrib_nodes_result.scalar_one()
+        .join(ProjectUserRole, and_(
+            ProjectUserRole.project_id == Tag.project_id,
+            ProjectUserRole.user_id == user_id,
+        ))
+        .outerjoin(TagNode, TagNode.tag_id == Tag.id)
+        # 사용자가 작성한 노드만 조인해 count(Node.id) 가 곧 기여 수가 되도록 함
+        .outerjoin(Node, and_(Node.id == TagNode.node_id, Node.author_id == user_id))
+        .group_by(Tag.id)
+        .order_by(Tag.id)
+    )
+    if after_id is not None:
+        query = query.where(Tag.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
 
-            summaries.append({
-                "project_id": pid,
-                "tag_id": tag.id,
-                "tag_name": tag.name,
-                # Tag 모델에 summary 컬럼이 있으면 사용, 없으면 빈 문자열로 처리
-                "summary": getattr(tag, "summary", "") or "",
-                "nodes_contributed": contributed_count,
-            })
+    rows = (await db.execute(query)).all()
+    summaries: List[Dict[str, Any]] = [
+        {
+            "project_id": row.project_id,
+            "tag_id": row.tag_id,
+            "tag_name": row.tag_name,
+            "summary": "",  # Tag 모델에 summary 컬럼이 없으므로 빈 문자열
+            "nodes_contributed": row.nodes_contributed,
+        }
+        for row in rows
+    ]
 
+    if limit is not None and len(summaries) == limit:
+        response.headers["X-Next-Cursor"] = str(summaries[-1]["tag_id"])
     return summaries
@@ -13,17 +13,15 @@ from app.core.security import get_current_user_id as _uid
 from app.utils.helpers import ensure_member as _m, ensure_owner as _o
 from app.utils.ws_manager import broadcast
 from app.utils.time import utc_now as _now
+from app.utils.tracing import span
 
 from app.db.models.vote import Vote            # ORM: 투표 레코드
 from app.db.models.tag_summary import TagSummary
 from app.db.models.history import ProjectHistory
-from app.db.session import AsyncSessionLocal
+from app.db.session import get_db
 
 router = APIRouter(prefix="/projects/{project_id}", tags=["Votes"])
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
 
 @router.post(
     "/tags/{tag_id}/vote",
@@ -91,7 +89,7 @@ async def confirm_votes(
     db: AsyncSession = Depends(get_db),
 ):
     # 1) 프로젝트 소유자(또는 관리자)여야 함
-    await _o(int(uid), project_id, db)
+    await _o(int(uid), project_id, db, load_project=False)
 
     # 2) 해당 프로젝트의 투표(미확정) 목록 조회 → TagSummary ID 기준으로 집계
     vote_stmt = select(Vote).where(
@@ -151,10 +149,11 @@ async def confirm_votes(
     )
     db.add(new_history)
     # 5) 해당 프로젝트에 속한 모든 Vote 레코드를 삭제 (투표 초기화)
-    await db.execute(
-        Vote.__table__.delete().where(Vote.tag_summary_id.in_(summary_ids))
-    )
-    await db.commit()
+    with span("votes.confirm.reset"):
+        await db.execute(
+            Vote.__table__.delete().where(Vote.tag_summary_id.in_(summary_ids))
+        )
+        await db.commit()
     await db.refresh(new_history)
 
     # 6) WebSocket 브로드캐스트 (선택 사항)
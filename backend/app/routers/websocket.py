@@ -1,9 +1,14 @@
 # backend/app/routers/websocket.py
 
-from fastapi import APIRouter, WebSocket, Query
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, Query
 from jose import jwt, JWTError
 from app.core.security import SECRET_KEY, ALGORITHM
-from app.utils.ws_manager import connect, disconnect
+from app.db.session import AsyncSessionLocal
+from app.utils.helpers import ensure_member
+from app.utils.ws_manager import connect, disconnect, WS_CLOSE_FORBIDDEN, WS_CLOSE_TIMEOUT
 
 router = APIRouter()
 
@@ -11,7 +16,11 @@ router = APIRouter()
 async def project_ws(
     project_id: str,
     websocket: WebSocket,
-    token: str = Query(...)
+    token: str = Query(...),
+    since: Optional[int] = Query(None),   # 마지막으로 적용한 delta seq (재연결 시)
+    epoch: Optional[str] = Query(None),   # hello 로 받은 epoch
+    encoding: Optional[str] = Query(None),  # "msgpack" 이면 바이너리 프레임 (기본 JSON)
+    heartbeat: bool = Query(False),         # true 이면 앱 ping 에 pong 으로 응답 (응답 없으면 4408)
 ):
     # 1) 토큰 검증
     try:
@@ -23,13 +32,35 @@ async def project_ws(
         await websocket.close(code=4401)
         return
 
-    # 2) WS 매니저에 연결 등록
-    await connect(project_id, websocket)
+    # 2) 프로젝트 멤버 확인 (노드/태그 내용과 delta 재전송이 흐르므로 멤버만)
+    try:
+        async with AsyncSessionLocal() as db:
+            await ensure_member(int(payload["sub"]), int(project_id), db)
+    except (HTTPException, ValueError):
+        await websocket.close(code=WS_CLOSE_FORBIDDEN)
+        return
+
+    # 3) WS 매니저에 연결 등록 (since/epoch 가 있으면 놓친 delta 를 재전송, 불가능하면 resync)
+    #    연결 수 상한을 넘으면 connect 가 4429 로 닫고 None 을 반환
+    conn = await connect(
+        project_id, websocket, since, epoch, encoding, user_id=str(payload["sub"]), heartbeat=heartbeat,
+    )
+    if conn is None:
+        return
 
     try:
-        while True:
-            # 필요에 따라 클라이언트가 보내는 메시지도 처리할 수 있음
-            await websocket.receive_text()
+        # 하트비트 클라이언트에는 서버가 주기적으로 ping 을 보내므로 WS_RECEIVE_TIMEOUT 안에 반드시 pong 이 옴
+        # 그 시간 동안 아무것도 오지 않으면 반쯤 끊긴 연결로 보고 정리 (하트비트 정리로 닫힌 경우도 여기서 빠져나감)
+        # 그 외 클라이언트는 제한 없이 기다리고, 끊긴 연결은 서버의 프로토콜 ping 시간 초과로 감지됨
+        while not conn.closed:
+            try:
+                message = await asyncio.wait_for(websocket.receive(), timeout=conn.receive_timeout)
+            except asyncio.TimeoutError:
+                conn.reap("receive_timeout", WS_CLOSE_TIMEOUT)
+                break
+            if message["type"] == "websocket.disconnect":
+                break
+            conn.on_receive(message)
     finally:
         # 연결이 끊어질 때 반드시 호출하여 clean-up
         disconnect(project_id, websocket)
@@ -1,8 +1,14 @@
 from .time import utc_now
 from .helpers import ensure_member, ensure_owner, get_node, get_tag
 from .ws_manager import connect, disconnect, broadcast
+from .tree import (
+    subtree_select, ancestor_select, get_descendant_node_ids, get_ancestor_node_ids,
+    link_node, link_nodes, move_subtree,
+)
 __all__ = [
     "utc_now",
     "ensure_member", "ensure_owner", "get_node", "get_tag",
     "connect", "disconnect", "broadcast",
+    "subtree_select", "ancestor_select", "get_descendant_node_ids", "get_ancestor_node_ids",
+    "link_node", "link_nodes", "move_subtree",
 ]
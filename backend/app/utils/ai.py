@@ -0,0 +1,220 @@
+# app/utils/ai.py
+
+import asyncio
+import os
+import re
+import time
+from typing import AsyncIterator, Awaitable, List, Optional, TypeVar, Union
+
+from fastapi import HTTPException, Request, status
+from openai import AsyncOpenAI
+
+from app.utils.ai_cache import suggestion_cache
+from app.utils.metrics import LLM_LATENCY, LLM_TOKENS
+
+T = TypeVar("T")
+
+# ── 설정 ──────────────────────────────────────────────────────────────
+AI_MODEL = os.getenv("AI_MODEL", "gpt-3.5-turbo")
+AI_TEMPERATURE = float(os.getenv("AI_TEMPERATURE", "0.7"))
+AI_MAX_TOKENS = int(os.getenv("AI_MAX_TOKENS", "256"))
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))   # 동시에 진행할 LLM 호출 수
+AI_TIMEOUT = float(os.getenv("AI_TIMEOUT", "30"))                 # LLM 호출 1회 제한 시간(초)
+AI_QUEUE_TIMEOUT = float(os.getenv("AI_QUEUE_TIMEOUT", "10"))     # 동시 실행 슬롯 대기 제한(초)
+AI_BATCH_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", str(max(1, AI_MAX_CONCURRENCY // 2))))  # 배치 하나가 쥘 슬롯 수
+DISCONNECT_POLL_INTERVAL = 0.5
+
+_client: Optional[AsyncOpenAI] = None
+_limiter = asyncio.Semaphore(AI_MAX_CONCURRENCY)
+
+
+def get_client() -> AsyncOpenAI:
+    """
+    AsyncOpenAI 클라이언트를 지연 생성합니다 (OPENAI_API_KEY / OPENAI_BASE_URL 환경 변수 사용).
+    """
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=AI_TIMEOUT)
+    return _client
+
+
+def build_messages(prompt: str) -> List[dict]:
+    return [
+        {"role": "system", "content": "당신은 창의적인 아이디어를 제공하는 도우미입니다."},
+        {"role": "user", "content": f"다음 주제와 관련된 새로운 아이디어를 간략한 문장 형태로 한 개 작성해줘: {prompt}"},
+    ]
+
+
+def _record_usage(usage) -> None:
+    if usage is not None:
+        LLM_TOKENS.inc(usage.prompt_tokens or 0, type="prompt")
+        LLM_TOKENS.inc(usage.completion_tokens or 0, type="completion")
+
+
+def parse_ideas(answer: str) -> List[str]:
+    """
+    LLM 응답에서 첫 줄만 취해 "1. " 같은 번호를 떼고 아이디어 목록으로 만듭니다.
+    """
+    first_line = answer.strip().split('\n')[0]
+    return [re.sub(r'^\d+\.\s*', '', first_line).strip()]
+
+
+async def _acquire_slot(batch: bool = False) -> None:
+    # 배치 호출은 자기 차례까지 기다림 (동시에 쥐는 슬롯 수는 generate_many 가 제한)
+    try:
+        await asyncio.wait_for(_limiter.acquire(), timeout=None if batch else AI_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI generation is busy, try again later"
+        )
+
+
+async def complete(prompt: str, batch: bool = False) -> str:
+    """
+    이벤트 루프를 막지 않는 LLM 호출.
+    - 동시 실행 수는 AI_MAX_CONCURRENCY 로 제한 (batch=True 이면 슬롯 대기 제한 없음)
+    - 호출마다 AI_TIMEOUT 초 제한
+    """
+    await _acquire_slot(batch)
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        response = await asyncio.wait_for(
+            get_client().chat.completions.create(
+                model=AI_MODEL,
+                messages=build_messages(prompt),
+                max_tokens=AI_MAX_TOKENS,
+                temperature=AI_TEMPERATURE,
+            ),
+            timeout=AI_TIMEOUT,
+        )
+        outcome = "ok"
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="AI generation timed out")
+    except HTTPException:
+        raise
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        _limiter.release()
+        LLM_LATENCY.observe(time.perf_counter() - start, mode="complete", outcome=outcome)
+    _record_usage(response.usage)
+    return response.choices[0].message.content or ""
+
+
+async def generate_ideas(prompt: str, batch: bool = False) -> List[str]:
+    """
+    캐시를 거쳐 아이디어를 생성합니다. 같은 프롬프트의 동시 요청은 LLM 호출 하나를 공유합니다.
+    """
+    answer = await suggestion_cache.get_or_compute(
+        prompt, AI_MODEL, AI_TEMPERATURE, lambda: complete(prompt, batch=batch)
+    )
+    return parse_ideas(answer)
+
+
+async def generate_many(prompts: List[str]) -> List[Union[List[str], BaseException]]:
+    """
+    여러 프롬프트의 아이디어를 병렬로 생성합니다 (배치 확장용).
+    - 슬롯 대기 제한 없이 차례를 기다리므로 개수가 많아도 503 으로 잘리지 않음
+    - 한 배치가 동시에 쥐는 슬롯은 AI_BATCH_CONCURRENCY 개까지 (단건 요청이 들어갈 자리를 남김)
+    결과는 prompts 순서대로이며, 실패한 항목 자리에는 예외 객체가 들어갑니다.
+    """
+    gate = asyncio.Semaphore(AI_BATCH_CONCURRENCY)
+
+    async def _one(prompt: str) -> List[str]:
+        async with gate:
+            return await generate_ideas(prompt, batch=True)
+
+    return await asyncio.gather(*(_one(p) for p in prompts), return_exceptions=True)
+
+
+async def remember_answer(prompt: str, answer: str) -> None:
+    await suggestion_cache.remember(prompt, AI_MODEL, AI_TEMPERATURE, answer)
+
+
+async def stream_completion(prompt: str) -> AsyncIterator[str]:
+    """
+    LLM 응답을 토큰 조각(delta) 단위로 흘려보내는 async generator.
+    complete()와 같은 동시 실행 제한을 따르며, 전체 스트림에 AI_TIMEOUT 마감 시간을 둡니다.
+    소비자가 중간에 멈추면(aclose) 업스트림 스트림도 닫힙니다.
+    캐시(메모리/DB)에 있거나 같은 프롬프트의 생성이 진행 중이면 LLM 을 따로 호출하지 않고
+    그 응답을 한 번에 내보냅니다.
+    """
+    cached = await suggestion_cache.lookup(prompt, AI_MODEL, AI_TEMPERATURE)
+    if cached is not None:
+        yield cached
+        return
+
+    await _acquire_slot()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + AI_TIMEOUT
+        try:
+            stream = await asyncio.wait_for(
+                get_client().chat.completions.create(
+                    model=AI_MODEL,
+                    messages=build_messages(prompt),
+                    max_tokens=AI_MAX_TOKENS,
+                    temperature=AI_TEMPERATURE,
+                    stream=True,
+                    stream_options={"include_usage": True},   # 마지막 조각에 토큰 사용량 포함
+                ),
+                timeout=AI_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="AI generation timed out")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        stream.__anext__(), timeout=max(deadline - loop.time(), 0)
+                    )
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    outcome = "timeout"
+                    raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="AI generation timed out")
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=str(e))
+                _record_usage(getattr(chunk, "usage", None))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            outcome = "ok"
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            raise
+        finally:
+            await stream.close()
+    finally:
+        _limiter.release()
+        LLM_LATENCY.observe(time.perf_counter() - start, mode="stream", outcome=outcome)
+
+
+async def cancel_on_disconnect(request: Request, aw: Awaitable[T]) -> T:
+    """
+    aw 를 실행하되, 그 사이 클라이언트 연결이 끊기면 작업을 취소합니다.
+    (LLM 호출처럼 오래 걸리는 작업에만 사용하고, DB 쓰기는 감싸지 마세요)
+    """
+    task = asyncio.ensure_future(aw)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,207 @@
+# app/utils/ai_cache.py
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db.models.ai_suggestion import AiSuggestion
+from app.db.session import AsyncSessionLocal
+
+# ── 설정 ──────────────────────────────────────────────────────────────
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1024"))
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "3600"))          # 초
+AI_CACHE_DB = os.getenv("AI_CACHE_DB", "false").lower() in ("1", "true", "yes")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    거의 같은 프롬프트가 같은 키를 갖도록 정규화합니다.
+    (유니코드 NFKC, 대소문자 무시, 공백 축약, 끝 문장부호 제거)
+    """
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(" .!?~")
+
+
+def cache_key(prompt: str, model: str, temperature: float) -> str:
+    raw = f"{model}\x00{temperature:.3f}\x00{normalize_prompt(prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SuggestionCache:
+    """
+    AI 응답 캐시.
+    - 1차: 프로세스 메모리 (LRU + TTL, 최대 max_entries 개)
+    - 2차: Postgres ai_suggestion 테이블 (AI_CACHE_DB=true 일 때)
+    - 같은 키의 동시 요청은 업스트림 호출 하나를 공유합니다 (single-flight).
+      공유 호출은 기다리는 요청이 모두 취소되었을 때만 취소됩니다.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, use_db: bool = False):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.use_db = use_db
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, List] = {}   # key -> [task, waiters]
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    # ── 메모리 계층 ──
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    # ── Postgres 계층 ──
+    async def _db_get(self, key: str) -> Optional[str]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(AiSuggestion.answer).where(
+                    AiSuggestion.key == key,
+                    AiSuggestion.created_at > datetime.utcnow() - timedelta(seconds=self.ttl),
+                )
+            )
+            return result.scalar_one_or_none()
+
+    async def _db_put(self, key: str, model: str, temperature: float, value: str) -> None:
+        stmt = pg_insert(AiSuggestion).values(
+            key=key, model=model, temperature=temperature, answer=value, created_at=datetime.utcnow()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AiSuggestion.key],
+            set_={"answer": stmt.excluded.answer, "created_at": stmt.excluded.created_at},
+        )
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    # ── 조회 + 계산 ──
+    async def get_or_compute(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        compute: Callable[[], Awaitable[str]],
+    ) -> str:
+        key = cache_key(prompt, model, temperature)
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        entry = self._inflight.get(key)
+        if entry is not None:
+            self.coalesced += 1
+        else:
+            entry = [asyncio.ensure_future(self._load(key, model, temperature, compute)), 0]
+            self._inflight[key] = entry
+            entry[0].add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+
+        return await self._join(entry)
+
+    async def _join(self, entry: List) -> str:
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # 이 요청만 취소된 경우: 아무도 기다리지 않으면 업스트림 호출도 취소
+            if entry[1] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    async def _load(self, key: str, model: str, temperature: float, compute: Callable[[], Awaitable[str]]) -> str:
+        if self.use_db:
+            value = await self._db_get(key)
+            if value is not None:
+                self.db_hits += 1
+                self.put(key, value)
+                return value
+        self.misses += 1
+        value = await compute()
+        self.put(key, value)
+        if self.use_db:
+            await self._db_put(key, model, temperature, value)
+        return value
+
+    async def lookup(self, prompt: str, model: str, temperature: float) -> Optional[str]:
+        """
+        스트리밍 경로용 조회: 메모리 → 진행 중인 같은 키의 계산 → DB 순서로 찾습니다.
+        모든 계층에 없을 때만 miss 로 셉니다. None 을 받은 호출자는 직접 LLM 을 호출하고
+        remember() 로 결과를 넣어야 합니다.
+        """
+        key = cache_key(prompt, model, temperature)
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        entry = self._inflight.get(key)
+        if entry is not None:
+            self.coalesced += 1
+            return await self._join(entry)
+        if self.use_db:
+            value = await self._db_get(key)
+            if value is not None:
+                self.db_hits += 1
+                self.put(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    async def remember(self, prompt: str, model: str, temperature: float, value: str) -> None:
+        """
+        스트리밍처럼 get_or_compute 밖에서 얻은 응답을 캐시에 넣습니다 (DB 계층 포함).
+        """
+        key = cache_key(prompt, model, temperature)
+        self.put(key, value)
+        if self.use_db:
+            await self._db_put(key, model, temperature, value)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.db_hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+            "hit_ratio": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+        }
+
+
+suggestion_cache = SuggestionCache(AI_CACHE_MAX_ENTRIES, AI_CACHE_TTL, use_db=AI_CACHE_DB)
@@ -0,0 +1,208 @@
+# app/utils/backplane.py
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# ── 설정 ──────────────────────────────────────────────────────────────
+WS_BACKPLANE = os.getenv("WS_BACKPLANE", "local")                       # local | postgres
+WS_BACKPLANE_CHANNEL = os.getenv("WS_BACKPLANE_CHANNEL", "ws_broadcast")
+WS_BACKPLANE_QUEUE = int(os.getenv("WS_BACKPLANE_QUEUE", "10000"))      # 발행 대기열 최대 길이
+NOTIFY_MAX_BYTES = 7900                                                 # Postgres NOTIFY payload 한도(8000B) 여유분
+RECONNECT_DELAY = 1.0
+
+BACKPLANE_MESSAGES = Counter(
+    "ws_backplane_messages_total", "Messages exchanged with other workers via the backplane", ["direction"]
+)
+
+# 다른 워커에서 온 메시지를 이 워커의 소켓에 전달하는 콜백 (project_id, text, key, delta_op)
+# delta_op 가 있으면 text 는 seq 가 붙기 전의 delta 본문입니다 (ws_manager 가 워커별 seq 를 붙임)
+OnMessage = Callable[[str, str, Optional[Hashable], Optional[str]], None]
+# 메시지가 유실되었을 수 있을 때 (재연결, 너무 큰 payload) 호출 (ws_manager.request_resync)
+OnGap = Callable[[Optional[str], str], None]
+
+
+class Backplane:
+    """
+    워커 간 WebSocket 브로드캐스트 전달 인터페이스.
+    - publish(): 이 워커가 보낸 메시지를 다른 워커들에 전달 (이 워커의 소켓은 ws_manager 가 직접 전달)
+    - start(on_message, on_gap): 다른 워커의 메시지를 받기 시작
+    """
+
+    origin = uuid.uuid4().hex  # 자기 자신이 보낸 메시지를 걸러내기 위한 워커 id
+
+    async def start(self, on_message: OnMessage, on_gap: OnGap) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def publish(
+        self, project_id: str, text: str, key: Optional[Hashable] = None, delta_op: Optional[str] = None
+    ) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": WS_BACKPLANE, "origin": self.origin}
+
+
+class LocalBackplane(Backplane):
+    """
+    단일 워커용: 다른 워커가 없으므로 아무것도 하지 않습니다.
+    """
+
+
+class PostgresBackplane(Backplane):
+    """
+    기존 Postgres 의 LISTEN/NOTIFY 로 워커 간 메시지를 전달합니다.
+    - 수신용 / 발행용 asyncpg 커넥션을 하나씩 따로 둡니다 (SQLAlchemy 풀과 무관).
+    - 발행은 대기열에 넣고 즉시 반환하며, 전용 태스크가 순서대로 pg_notify 합니다.
+    - 8000B 를 넘는 메시지는 NOTIFY 로 보낼 수 없으므로, 다른 워커에는 해당 프로젝트의 resync 를 알립니다.
+    - 수신 커넥션이 끊기면 재연결하고, 그 사이 유실 가능성이 있으므로 모든 소켓에 resync 를 알립니다.
+    """
+
+    def __init__(self, dsn: Optional[str], channel: str, max_queue: int):
+        self.dsn = dsn  # None 이면 start() 에서 app.db.session 의 DATABASE_URL 사용
+        self.channel = channel
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._on_message: Optional[OnMessage] = None
+        self._on_gap: Optional[OnGap] = None
+        self._listen_conn = None
+        self._tasks = []
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self.oversized = 0
+        self.reconnects = 0
+
+    async def start(self, on_message: OnMessage, on_gap: OnGap) -> None:
+        if self.dsn is None:
+            # app.db.session → app.utils.metrics → app.utils(ws_manager) → backplane 순환 import 를 피하려고 여기서 읽음
+            from app.db.session import DATABASE_URL
+            self.dsn = _asyncpg_dsn(DATABASE_URL)
+        self._on_message, self._on_gap = on_message, on_gap
+        self._tasks = [
+            asyncio.create_task(self._listen_loop()),
+            asyncio.create_task(self._publish_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ── 발행 ──
+    def publish(
+        self, project_id: str, text: str, key: Optional[Hashable] = None, delta_op: Optional[str] = None
+    ) -> None:
+        payload = json.dumps(
+            {"o": self.origin, "p": project_id, "k": key, "d": delta_op, "m": text},
+            ensure_ascii=False, separators=(",", ":"),
+        )
+        if len(payload.encode("utf-8")) > NOTIFY_MAX_BYTES:
+            self.oversized += 1
+            payload = json.dumps({"o": self.origin, "p": project_id, "gap": "payload_too_large"})
+        try:
+            self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("ws backplane queue full, dropping message for project %s", project_id)
+
+    async def _publish_loop(self) -> None:
+        import asyncpg
+
+        conn = None
+        while True:
+            payload = await self._queue.get()
+            while True:
+                try:
+                    if conn is None or conn.is_closed():
+                        conn = await asyncpg.connect(self.dsn)
+                    await conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+                    self.published += 1
+                    BACKPLANE_MESSAGES.inc(direction="out")
+                    break
+                except asyncio.CancelledError:
+                    if conn is not None:
+                        await conn.close()
+                    raise
+                except Exception as e:
+                    logger.warning("ws backplane publish failed: %r", e)
+                    conn = None
+                    await asyncio.sleep(RECONNECT_DELAY)
+
+    # ── 수신 ──
+    def _handle(self, _conn, _pid, _channel, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+        if data.get("o") == self.origin:
+            return
+        self.received += 1
+        BACKPLANE_MESSAGES.inc(direction="in")
+        if "gap" in data:
+            self._on_gap(data["p"], data["gap"])
+            return
+        key = data.get("k")
+        self._on_message(data["p"], data["m"], tuple(key) if isinstance(key, list) else key, data.get("d"))
+
+    async def _listen_loop(self) -> None:
+        import asyncpg
+
+        first = True
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                await conn.add_listener(self.channel, self._handle)
+                if not first:
+                    self.reconnects += 1
+                    self._on_gap(None, "backplane_reconnected")  # 끊긴 동안의 메시지는 알 수 없음
+                first = False
+                try:
+                    while not conn.is_closed():
+                        await asyncio.sleep(RECONNECT_DELAY)
+                finally:
+                    if not conn.is_closed():
+                        await conn.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("ws backplane listener failed: %r", e)
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "channel": self.channel,
+            "queue_depth": self._queue.qsize(),
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+            "oversized": self.oversized,
+            "reconnects": self.reconnects,
+        }
+
+
+def _asyncpg_dsn(url: str) -> str:
+    # SQLAlchemy URL(postgresql+asyncpg://...) → asyncpg DSN(postgresql://...)
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+BACKPLANES: Dict[str, Callable[[], Backplane]] = {
+    "local": LocalBackplane,
+    "postgres": lambda: PostgresBackplane(None, WS_BACKPLANE_CHANNEL, WS_BACKPLANE_QUEUE),
+}
+
+if WS_BACKPLANE not in BACKPLANES:
+    raise ValueError(f"WS_BACKPLANE 값이 올바르지 않습니다: {WS_BACKPLANE}")
+
+backplane: Backplane = BACKPLANES[WS_BACKPLANE]()
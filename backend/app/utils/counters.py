@@ -0,0 +1,202 @@
+# app/utils/counters.py
+
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import event, update, values, column, select, func, or_, BigInteger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.db.models.project import Project
+from app.db.models.tag import Tag
+from app.db.models.node import Node
+from app.db.models.tag_node import TagNode
+from app.db.session import AsyncSessionLocal
+from app.utils.summary_cache import summary_cache
+
+logger = logging.getLogger(__name__)
+
+COUNTER_RECONCILE_INTERVAL = float(os.getenv("COUNTER_RECONCILE_INTERVAL", "3600"))  # 초, 0 이면 주기 실행 안 함
+
+
+# ── 증분 갱신 (호출자의 트랜잭션에 모아 두었다가 커밋 직전에 반영) ──────
+# 노드/태그를 만들 때마다 바로 UPDATE 하면 project/tag 행 잠금을 트랜잭션 끝까지 잡게 되어
+# 같은 프로젝트의 동시 생성이 줄을 섭니다. 그래서 증감량은 세션에 모아 두고,
+# 커밋 직전(before_commit)에 테이블마다 UPDATE 한 문장으로 반영해 잠금은 커밋하는 동안만 잡힙니다.
+# 롤백되면 모아 둔 증감량도 버립니다. (같은 트랜잭션 안에서 읽는 카운터 값에는 아직 반영되지 않음)
+_PENDING = "counter_deltas"
+
+
+async def _pending(db: AsyncSession) -> Dict[str, Counter]:
+    await db.connection()  # 트랜잭션을 시작해 두어야 롤백/종료 시 _drop_pending 이 불림
+    return db.sync_session.info.setdefault(_PENDING, {"nodes": Counter(), "tags": Counter(), "tag_nodes": Counter()})
+
+
+async def bump_project(db: AsyncSession, project_id: int, nodes: int = 0, tags: int = 0) -> None:
+    """
+    project.node_count / tag_count 증감을 예약합니다 (커밋 직전 UPDATE ... SET x = x + n).
+    """
+    pending = await _pending(db)
+    pending["nodes"][project_id] += nodes
+    pending["tags"][project_id] += tags
+
+
+async def bump_tags(db: AsyncSession, deltas: Mapping[int, int]) -> None:
+    """
+    {tag_id: 증감량} 을 tag.node_count 에 반영하도록 예약합니다 (커밋 직전 UPDATE ... FROM (VALUES ...) 한 문장).
+    """
+    (await _pending(db))["tag_nodes"].update(deltas)
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    # 여러 행을 갱신할 때 잠금 순서가 트랜잭션마다 같도록 id 순으로
+    projects = sorted(
+        (pid, pending["nodes"][pid], pending["tags"][pid])
+        for pid in set(pending["nodes"]) | set(pending["tags"])
+        if pending["nodes"][pid] or pending["tags"][pid]
+    )
+    if projects:
+        d = values(
+            column("id", BigInteger),
+            column("nodes", BigInteger),
+            column("tags", BigInteger),
+            name="project_delta",
+        ).data(projects)
+        session.execute(
+            update(Project)
+            .where(Project.id == d.c.id)
+            .values(node_count=Project.node_count + d.c.nodes, tag_count=Project.tag_count + d.c.tags)
+            .execution_options(synchronize_session=False)
+        )
+    rows = sorted((tag_id, delta) for tag_id, delta in pending["tag_nodes"].items() if delta)
+    if rows:
+        d = values(
+            column("id", BigInteger),
+            column("delta", BigInteger),
+            name="tag_delta",
+        ).data(rows)
+        session.execute(
+            update(Tag)
+            .where(Tag.id == d.c.id)
+            .values(node_count=Tag.node_count + d.c.delta)
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:  # 최상위 트랜잭션이 롤백/종료되면 반영하지 못한 증감량 폐기
+        session.info.pop(_PENDING, None)
+
+
+def tally(tag_ids: Iterable[int], sign: int = 1) -> Dict[int, int]:
+    """
+    RETURNING 으로 받은 tag_id 목록을 {tag_id: ±개수} 로 모읍니다.
+    """
+    return {tag_id: sign * n for tag_id, n in Counter(tag_ids).items()}
+
+
+# ── 정합성 점검 / 복구 ────────────────────────────────────────────────
+async def reconcile(db: AsyncSession, project_id: Optional[int] = None) -> Dict[str, List[int]]:
+    """
+    저장된 카운터를 실제 COUNT 와 비교해, 어긋난 행만 고쳐 쓰고 그 id 를 반환합니다.
+    touched_projects 는 고쳐진 프로젝트/태그가 속한 프로젝트 id 입니다 (요약 캐시 무효화용).
+    project_id 를 주면 해당 프로젝트와 그 태그만 검사합니다. (커밋은 호출자가)
+    """
+    actual_nodes = select(func.count(Node.id)).where(Node.project_id == Project.id).scalar_subquery()
+    actual_tags = select(func.count(Tag.id)).where(Tag.project_id == Project.id).scalar_subquery()
+    proj_stmt = (
+        update(Project)
+        .where(or_(Project.node_count != actual_nodes, Project.tag_count != actual_tags))
+        .values(node_count=actual_nodes, tag_count=actual_tags)
+        .returning(Project.id)
+        .execution_options(synchronize_session=False)
+    )
+
+    actual_tag_nodes = select(func.count()).select_from(TagNode).where(TagNode.tag_id == Tag.id).scalar_subquery()
+    tag_stmt = (
+        update(Tag)
+        .where(Tag.node_count != actual_tag_nodes)
+        .values(node_count=actual_tag_nodes)
+        .returning(Tag.id, Tag.project_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    if project_id is not None:
+        proj_stmt = proj_stmt.where(Project.id == project_id)
+        tag_stmt = tag_stmt.where(Tag.project_id == project_id)
+
+    projects = [pid for (pid,) in (await db.execute(proj_stmt)).all()]
+    tag_rows = (await db.execute(tag_stmt)).all()
+    tags = [tid for tid, _ in tag_rows]
+    touched = set(projects) | {pid for _, pid in tag_rows}
+    if projects or tags:
+        logger.warning("counter drift repaired: projects=%s tags=%s", projects, tags)
+    return {"projects": projects, "tags": tags, "touched_projects": sorted(touched)}
+
+
+class CounterReconciler:
+    """
+    interval 초마다 전체 카운터를 reconcile() 로 점검/복구하는 백그라운드 작업.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.repaired_projects = 0
+        self.repaired_tags = 0
+        self.last_run: Optional[datetime] = None
+        self.last_result: Dict[str, List[int]] = {}
+
+    async def run_once(self, project_id: Optional[int] = None) -> Dict[str, List[int]]:
+        async with AsyncSessionLocal() as session:
+            result = await reconcile(session, project_id)
+            await session.commit()
+        for pid in result.pop("touched_projects"):
+            summary_cache.touch(pid)  # 카운터가 고쳐진 프로젝트의 요약 캐시 무효화
+        self.runs += 1
+        self.repaired_projects += len(result["projects"])
+        self.repaired_tags += len(result["tags"])
+        self.last_run = datetime.utcnow()
+        self.last_result = result
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("counter reconcile failed")
+
+    async def start(self) -> None:
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "repaired_projects": self.repaired_projects,
+            "repaired_tags": self.repaired_tags,
+            "last_run": self.last_run,
+            "last_result": self.last_result,
+        }
+
+
+counter_reconciler = CounterReconciler(COUNTER_RECONCILE_INTERVAL)
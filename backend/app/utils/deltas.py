@@ -0,0 +1,110 @@
+# app/utils/deltas.py
+
+import os
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.utils.summary_cache import summary_cache
+
+# ── 설정 ──────────────────────────────────────────────────────────────
+DELTA_LOG_SIZE = int(os.getenv("DELTA_LOG_SIZE", "1000"))             # 프로젝트별 보관할 최근 delta 수
+DELTA_LOG_PROJECTS = int(os.getenv("DELTA_LOG_PROJECTS", "10000"))     # 로그를 유지할 프로젝트 수 (LRU)
+
+# 요약(/summary) 결과에 영향을 주지 않는 연산 (요약 캐시 버전을 올리지 않음)
+NO_SUMMARY_OPS = {"node:move"}
+
+_worker = uuid.uuid4().hex[:8]
+
+
+class _ProjectLog:
+    __slots__ = ("epoch", "seq", "entries")
+
+    def __init__(self, epoch: str, size: int):
+        self.epoch = epoch
+        self.seq = 0
+        self.entries: Deque[Tuple[int, str]] = deque(maxlen=size)
+
+
+class DeltaLog:
+    """
+    프로젝트별 delta 이벤트 로그 (워커 메모리, 크기 제한).
+    - record() 가 seq 를 1씩 붙이고 최근 size 개를 보관합니다.
+    - epoch 는 "이 워커의 이 프로젝트 로그"를 가리킵니다. seq 는 같은 epoch 안에서만 의미가 있으므로
+      다른 워커에 재접속하거나 로그가 LRU 로 정리되면 epoch 가 달라져 전체 재조회(resync)가 필요합니다.
+    - since() 는 재접속한 클라이언트가 놓친 delta 를 돌려주고, 로그가 그 구간을 덮지 못하면 None 입니다.
+    """
+
+    def __init__(self, size: int, max_projects: int):
+        self.size = size
+        self.max_projects = max_projects
+        self._logs: "OrderedDict[str, _ProjectLog]" = OrderedDict()
+        self._created = 0
+        self.recorded = 0
+        self.replayed = 0
+        self.resyncs = 0
+
+    def _log(self, project_id: str) -> _ProjectLog:
+        log = self._logs.get(project_id)
+        if log is None:
+            self._created += 1
+            log = _ProjectLog(f"{_worker}-{self._created}", self.size)
+            self._logs[project_id] = log
+            while len(self._logs) > self.max_projects:
+                self._logs.popitem(last=False)
+        else:
+            self._logs.move_to_end(project_id)
+        return log
+
+    def record(self, project_id: str, op: str, body: str) -> str:
+        """
+        body: 직렬화된 {"op": ..., "data": ...} JSON 객체 문자열.
+        seq/epoch 를 붙인 최종 메시지 문자열을 반환합니다 (본문은 다시 직렬화하지 않음).
+        """
+        log = self._log(project_id)
+        log.seq += 1
+        text = f'{{"type":"delta","epoch":"{log.epoch}","seq":{log.seq},{body[1:]}'
+        log.entries.append((log.seq, text))
+        self.recorded += 1
+        if op not in NO_SUMMARY_OPS:
+            summary_cache.touch(int(project_id))
+        return text
+
+    def reset(self, project_id: Optional[str] = None) -> None:
+        """
+        로그가 불완전해졌을 때 (backplane 유실 등) 버려서, 이후 그 구간으로의 재개가 resync 가 되게 합니다.
+        """
+        if project_id is None:
+            self._logs.clear()
+        else:
+            self._logs.pop(project_id, None)
+
+    def head(self, project_id: str) -> Tuple[str, int]:
+        log = self._log(project_id)
+        return log.epoch, log.seq
+
+    def since(self, project_id: str, epoch: Optional[str], seq: int) -> Optional[List[str]]:
+        log = self._logs.get(project_id)
+        if log is None or epoch != log.epoch or seq > log.seq:
+            self.resyncs += 1
+            return None
+        if seq == log.seq:
+            return []
+        if not log.entries or log.entries[0][0] > seq + 1:
+            self.resyncs += 1
+            return None
+        missed = [text for s, text in log.entries if s > seq]
+        self.replayed += len(missed)
+        return missed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "projects": len(self._logs),
+            "log_size": self.size,
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "resyncs": self.resyncs,
+        }
+
+
+delta_log = DeltaLog(DELTA_LOG_SIZE, DELTA_LOG_PROJECTS)
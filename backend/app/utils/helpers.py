@@ -1,56 +1,149 @@
 # app/utils/helpers.py
 
+import os
+import time
+from typing import Dict, Optional, Tuple
+
 from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models.project_user_role import ProjectUserRole
+from app.db.models.project_user_role import ProjectUserRole, RoleType
 from app.db.models.project import Project
 from app.db.models.node import Node
 from app.db.models.tag import Tag
+from app.utils.tracing import span, traced
+
+MEMBERSHIP_CACHE_TTL = float(os.getenv("MEMBERSHIP_CACHE_TTL", "30"))       # 초
+MEMBERSHIP_CACHE_MAX = int(os.getenv("MEMBERSHIP_CACHE_MAX", "50000"))
+_MISSING = object()
+
+
+class MembershipCache:
+    """
+    (user_id, project_id) → 역할, project_id → 삭제 여부를 짧은 TTL로 캐시합니다.
+    ProjectUserRole 변경이나 프로젝트 soft-delete 시 invalidate()로 즉시 무효화합니다.
+    (다른 워커의 변경은 TTL 이내에 반영됩니다)
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._roles: Dict[Tuple[int, int], Tuple[float, Optional[RoleType]]] = {}
+        self._projects: Dict[int, Tuple[float, bool]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _lookup(self, table: dict, key):
+        entry = table.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            table.pop(key, None)
+            self.misses += 1
+            return _MISSING
+        self.hits += 1
+        return entry[1]
+
+    def _store(self, table: dict, key, value) -> None:
+        if len(table) >= self.max_entries:
+            table.clear()  # 단순 상한: 가득 차면 비우고 다시 채움
+        table[key] = (time.monotonic() + self.ttl, value)
+
+    def get_role(self, uid: int, project_id: int):
+        return self._lookup(self._roles, (uid, project_id))
+
+    def set_role(self, uid: int, project_id: int, role: Optional[RoleType]) -> None:
+        self._store(self._roles, (uid, project_id), role)
+
+    def get_alive(self, project_id: int):
+        return self._lookup(self._projects, project_id)
+
+    def set_alive(self, project_id: int, alive: bool) -> None:
+        self._store(self._projects, project_id, alive)
+
+    def invalidate(self, project_id: int, uid: Optional[int] = None) -> None:
+        self.invalidations += 1
+        self._projects.pop(project_id, None)
+        if uid is not None:
+            self._roles.pop((uid, project_id), None)
+        else:
+            for key in [k for k in self._roles if k[1] == project_id]:
+                del self._roles[key]
+
+    def clear(self) -> None:
+        self._roles.clear()
+        self._projects.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "roles": len(self._roles),
+            "projects": len(self._projects),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+membership_cache = MembershipCache(MEMBERSHIP_CACHE_TTL, MEMBERSHIP_CACHE_MAX)
+
+
+async def _get_role(uid: int, project_id: int, db: AsyncSession) -> Optional[RoleType]:
+    role = membership_cache.get_role(uid, project_id)
+    if role is _MISSING:
+        with span("helpers.role_query"):   # 캐시 miss 일 때만 기록됨
+            result = await db.execute(
+                select(ProjectUserRole.role).where(
+                    ProjectUserRole.project_id == project_id,
+                    ProjectUserRole.user_id == uid
+                )
+            )
+            role = result.scalar_one_or_none()
+        membership_cache.set_role(uid, project_id, role)
+    return role
 
 
-async def ensure_member(uid: int, project_id: int, db: AsyncSession):
+@traced("helpers.ensure_member")
+async def ensure_member(uid: int, project_id: int, db: AsyncSession) -> RoleType:
     """
     프로젝트 멤버 검증: ProjectUserRole에 uid, project_id 레코드가 있는지 확인합니다.
+    반환값은 ProjectUserRole 행이 아니라 역할(RoleType)입니다. 캐시 hit 시 행을 읽지 않으므로
+    invited_at / accepted_at 같은 다른 컬럼이 필요하면 호출자가 직접 조회해야 합니다.
+    (라우터들은 반환값을 쓰지 않고 검사 용도로만 호출합니다)
     """
-    stmt = select(ProjectUserRole).where(
-        ProjectUserRole.project_id == project_id,
-        ProjectUserRole.user_id == uid
-    )
-    result = await db.execute(stmt)
-    membership = result.scalar_one_or_none()
-    if not membership:
+    role = await _get_role(uid, project_id, db)
+    if role is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not a project member"
         )
-    return membership
+    return role
 
 
-async def ensure_owner(uid: int, project_id: int, db: AsyncSession):
+@traced("helpers.ensure_owner")
+async def ensure_owner(uid: int, project_id: int, db: AsyncSession, load_project: bool = True):
     """
     프로젝트 소유자(Owner) 검증:  
     1) 프로젝트가 존재하는지, 삭제되지 않았는지 검사  
     2) ProjectUserRole에 OWNER 권한 레코드가 있는지 검사  
+    load_project=False 이면 Project 객체를 읽지 않고(캐시 hit 시 쿼리 0회) None을 반환합니다.
     """
     # 1) 프로젝트 존재 여부 확인 (soft-delete: is_deleted=False)
-    proj = await db.get(Project, project_id)
-    if proj is None or proj.is_deleted:
+    proj = None
+    alive = membership_cache.get_alive(project_id)
+    if alive is _MISSING or load_project:
+        proj = await db.get(Project, project_id)
+        alive = proj is not None and not proj.is_deleted
+        membership_cache.set_alive(project_id, alive)
+    if not alive:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
 
     # 2) 해당 uid가 OWNER인지 검사
-    stmt = select(ProjectUserRole).where(
-        ProjectUserRole.project_id == project_id,
-        ProjectUserRole.user_id == uid,
-        ProjectUserRole.role == "OWNER"
-    )
-    result = await db.execute(stmt)
-    owner_record = result.scalar_one_or_none()
-    if not owner_record:
+    if await _get_role(uid, project_id, db) != RoleType.OWNER:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Owner permission required"
@@ -58,6 +151,7 @@ async def ensure_owner(uid: int, project_id: int, db: AsyncSession):
     return proj
 
 
+@traced("helpers.get_node")
 async def get_node(node_id: int, project_id: int, db: AsyncSession):
     """
     Node 조회 + project_id 일치 여부 확인.
@@ -71,6 +165,7 @@ async def get_node(node_id: int, project_id: int, db: AsyncSession):
     return node
 
 
+@traced("helpers.get_tag")
 async def get_tag(tag_id: int, project_id: int, db: AsyncSession):
     """
     Tag 조회 + project_id 일치 여부 확인.
@@ -0,0 +1,198 @@
+# app/utils/jobs.py
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.utils.ws_manager import broadcast
+
+logger = logging.getLogger(__name__)
+
+# ── 설정 ──────────────────────────────────────────────────────────────
+AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", "4"))
+AI_JOB_MAX_QUEUE = int(os.getenv("AI_JOB_MAX_QUEUE", "1000"))
+AI_JOB_KEEP_FINISHED = int(os.getenv("AI_JOB_KEEP_FINISHED", "5000"))   # 폴링용으로 보관할 완료 작업 수
+AI_JOB_DRAIN_TIMEOUT = float(os.getenv("AI_JOB_DRAIN_TIMEOUT", "30"))   # 종료 시 남은 작업을 기다릴 시간(초)
+STATS_WINDOW = 500                                                   # 대기시간 통계용 최근 작업 수
+
+
+class Job:
+    def __init__(self, project_id: int, kind: str, handler: Callable[..., Awaitable[Any]], args: tuple):
+        self.id = uuid.uuid4().hex
+        self.project_id = project_id
+        self.kind = kind
+        self.status = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._enqueued = time.perf_counter()
+        self._handler = handler
+        self._args = args
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "project_id": self.project_id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    프로세스 내 비동기 작업 큐.
+    - submit() 은 즉시 Job 을 돌려주고, 워커 태스크가 순서대로 실행합니다.
+    - 완료/실패 시 프로젝트 WebSocket 으로 {"type": "job:done" | "job:failed"} 를 브로드캐스트합니다.
+    - 큐 깊이, 대기 시간, 워커 사용률을 stats() 로 제공합니다.
+    - 프로세스 메모리 큐이므로 종료 시 stop() 이 남은 작업을 AI_JOB_DRAIN_TIMEOUT 초까지 처리하고,
+      그때까지 끝내지 못한 작업은 실패("shutdown" / "cancelled")로 기록합니다 (재시작 후 이어서 실행되지 않음).
+    """
+
+    def __init__(self, workers: int, max_queue: int, keep_finished: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.keep_finished = keep_finished
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._closing = False
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._started_at = 0.0
+        self._waits: Deque[float] = deque(maxlen=STATS_WINDOW)
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._closing = False
+        self._started_at = time.perf_counter()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = AI_JOB_DRAIN_TIMEOUT) -> None:
+        """
+        새 작업을 받지 않고, 대기/실행 중인 작업을 drain_timeout 초까지 기다린 뒤 워커를 멈춥니다.
+        """
+        self._closing = True
+        if self._queue is not None and self._tasks and drain_timeout > 0:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("job queue drain timed out, %d job(s) still queued", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # 시작하지 못한 작업: 폴링하는 클라이언트가 끝없이 queued 를 보지 않도록 실패로 기록
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            job.status, job.error = "failed", "shutdown"
+            job.finished_at = datetime.utcnow()
+            self.failed += 1
+            self._queue.task_done()
+
+    def submit(self, project_id: int, kind: str, handler: Callable[..., Awaitable[Any]], *args) -> Job:
+        if self._queue is None:
+            raise RuntimeError("JobQueue is not started")
+        if self._closing:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is shutting down, try again later"
+            )
+        job = Job(project_id, kind, handler, args)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Job queue is full, try again later"
+            )
+        self.jobs[job.id] = job
+        self._trim()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def _trim(self) -> None:
+        # 오래된 "완료" 작업부터 정리 (대기/실행 중 작업은 유지)
+        overflow = len(self.jobs) - self.keep_finished
+        if overflow <= 0:
+            return
+        for job_id in [j.id for j in self.jobs.values() if j.status in ("done", "failed")][:overflow]:
+            del self.jobs[job_id]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            started = time.perf_counter()
+            self._waits.append(started - job._enqueued)
+            self._busy += 1
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            try:
+                job.result = await job._handler(*job._args)
+                job.status = "done"
+                self.completed += 1
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "cancelled"
+                self.failed += 1
+                self._queue.task_done()
+                raise
+            except HTTPException as e:
+                job.status, job.error = "failed", str(e.detail)
+                self.failed += 1
+            except Exception as e:
+                job.status, job.error = "failed", str(e)
+                self.failed += 1
+            finally:
+                job.finished_at = datetime.utcnow()
+                self._busy -= 1
+                self._busy_seconds += time.perf_counter() - started
+
+            try:
+                await broadcast(job.project_id, {
+                    "type": f"job:{job.status}",
+                    "job_id": job.id,
+                    "kind": job.kind,
+                    "result": job.result,
+                    "error": job.error,
+                })
+            except Exception:
+                logger.exception("job %s (%s) broadcast failed", job.id, job.kind)
+            finally:
+                self._queue.task_done()  # 결과 알림까지 끝나야 stop() 의 drain 이 끝남
+
+    def stats(self) -> Dict[str, Any]:
+        uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+        waits = list(self._waits)
+        return {
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_seconds_avg": round(sum(waits) / len(waits), 4) if waits else 0.0,
+            "wait_seconds_max": round(max(waits), 4) if waits else 0.0,
+            "utilization": round(self._busy_seconds / (self.workers * uptime), 4) if uptime else 0.0,
+        }
+
+
+job_queue = JobQueue(AI_JOB_WORKERS, AI_JOB_MAX_QUEUE, AI_JOB_KEEP_FINISHED)
@@ -0,0 +1,198 @@
+# app/utils/metrics.py
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Prometheus text exposition format (0.0.4) 로 내보내는 최소한의 메트릭 모음.
+# 외부 의존성 없이 프로세스 메모리에만 보관합니다 (워커 프로세스마다 따로 집계).
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        super().__init__(name, doc, labels)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """
+    set/inc/dec 로 조정하거나, set_function 으로 수집 시점에 값을 계산합니다.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        super().__init__(name, doc, labels)
+        self._values: Dict[LabelKey, float] = {}
+        self._fn: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        value = self._values.get(key, 0) - amount
+        if value <= 0 and self.labels:
+            self._values.pop(key, None)     # 라벨 조합이 계속 쌓이지 않도록 0 이 되면 정리
+        else:
+            self._values[key] = value
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        self._fn = fn
+
+    def _samples(self) -> List[str]:
+        if self._fn is not None:
+            return [f"{self.name} {_fmt_value(self._fn())}"]
+        return [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, List[float]] = {}   # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [0] * (len(self.buckets) + 2)
+        idx = bisect_left(self.buckets, value)
+        if idx < len(self.buckets):
+            entry[idx] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        lines: List[str] = []
+        for key, entry in self._values.items():
+            labels = _fmt_labels(self.labels, key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, inf)} {entry[-1]}")
+            lines.append(f"{self.name}_sum{labels} {_fmt_value(entry[-2])}")
+            lines.append(f"{self.name}_count{labels} {entry[-1]}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# ── HTTP ──────────────────────────────────────────────────────────────
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served", ["method"])
+
+# ── DB 커넥션 풀 ──────────────────────────────────────────────────────
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled DB connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "DB connections currently checked out")
+
+# ── LLM ───────────────────────────────────────────────────────────────
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds", "Upstream LLM call latency",
+    ["mode", "outcome"], buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens consumed", ["type"])
+
+# ── WebSocket ─────────────────────────────────────────────────────────
+WS_CONNECTIONS = Gauge("ws_connections", "Open WebSocket connections per project", ["project_id"])
+WS_DROPPED = Counter("ws_messages_dropped_total", "WebSocket messages dropped or replaced before delivery", ["reason"])
+WS_LIVE = Gauge("ws_connections_live", "Open WebSocket connections on this worker")
+WS_REAPED = Counter("ws_connections_reaped_total", "WebSocket connections closed by the server", ["reason"])
+WS_REJECTED = Counter("ws_connections_rejected_total", "WebSocket connections refused at connect time", ["reason"])
+
+# ── 코드 구간(span, app.utils.tracing 에서 기록) ──────────────────────
+SPAN_LATENCY = Histogram("span_duration_seconds", "Duration of named code sections", ["span"])
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    커넥션 checkout 대기 시간을 DB_POOL_WAIT 에 기록하는 풀.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
@@ -0,0 +1,191 @@
+# app/utils/positions.py
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import update, values, column, BigInteger, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.node import Node
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+POSITION_FLUSH_INTERVAL = float(os.getenv("POSITION_FLUSH_INTERVAL", "1.0"))  # 최대 지연(초)
+POSITION_IDLE_FLUSH = float(os.getenv("POSITION_IDLE_FLUSH", "0.25"))        # 입력이 멈춘 뒤 flush(초)
+
+
+async def bulk_update_positions(
+    db: AsyncSession, project_id: int, rows: Iterable[Tuple[int, float, float]]
+) -> int:
+    """
+    (node_id, pos_x, pos_y) 목록을 UPDATE ... FROM (VALUES ...) 한 문장으로 반영합니다.
+    같은 node_id가 여러 번 오면 마지막 값만 사용합니다. 다른 프로젝트의 노드는 무시됩니다.
+    반환값은 실제로 갱신된 행 수입니다. (커밋은 호출자가)
+    """
+    latest = {node_id: (node_id, x, y) for node_id, x, y in rows}
+    if not latest:
+        return 0
+    pos = values(
+        column("id", BigInteger),
+        column("pos_x", Float),
+        column("pos_y", Float),
+        name="pos",
+    ).data(list(latest.values()))
+
+    result = await db.execute(
+        update(Node)
+        .where(Node.id == pos.c.id, Node.project_id == project_id)
+        .values(pos_x=pos.c.pos_x, pos_y=pos.c.pos_y, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+class PositionBuffer:
+    """
+    드래그 중 쏟아지는 pos_x/pos_y 변경을 모아 쓰는 버퍼.
+    - 노드별 마지막 위치만 메모리에 보관
+    - 프로젝트별로 마지막 입력 후 idle 초가 지나거나, 첫 입력 후 interval 초가 지나면 flush
+    - 해당 프로젝트를 읽기 전에 flush(project_id) 를 호출해 읽기 일관성을 보장
+    - 버퍼를 거치지 않는 위치 쓰기는 direct_write() 안에서 (flush 와 같은 프로젝트 잠금)
+    - 종료 시 stop() 에서 남은 위치를 모두 flush
+    """
+
+    def __init__(self, interval: float, idle: float):
+        self.interval = interval
+        self.idle = idle
+        self._pending: Dict[int, Dict[int, Tuple[float, float]]] = {}
+        self._first_put: Dict[int, float] = {}
+        self._last_put: Dict[int, float] = {}
+        self._locks: Dict[int, List] = {}   # project_id -> [Lock, 사용 중인 수]
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.written = 0
+        self.flushes = 0
+        self.flush_errors = 0
+
+    def put(self, project_id: int, node_id: int, pos_x: float, pos_y: float) -> None:
+        now = time.monotonic()
+        self._pending.setdefault(project_id, {})[node_id] = (pos_x, pos_y)
+        self._first_put.setdefault(project_id, now)
+        self._last_put[project_id] = now
+        self.received += 1
+
+    def pending(self, project_id: int, node_id: int) -> Optional[Tuple[float, float]]:
+        return self._pending.get(project_id, {}).get(node_id)
+
+    def discard(self, project_id: int, node_ids: Iterable[int]) -> None:
+        """
+        직접 DB에 쓴 노드의 버퍼 값을 버립니다 (나중 flush가 새 값을 덮어쓰지 않도록).
+        """
+        pending = self._pending.get(project_id)
+        if pending:
+            for node_id in node_ids:
+                pending.pop(node_id, None)
+            if not pending:
+                del self._pending[project_id]
+                self._first_put.pop(project_id, None)
+                self._last_put.pop(project_id, None)
+
+    @asynccontextmanager
+    async def _locked(self, project_id: int) -> AsyncIterator[None]:
+        # 프로젝트별 잠금. 기다리거나 잡고 있는 쪽이 없어지면 지워서 프로젝트 수만큼 쌓이지 않게 합니다.
+        entry = self._locks.get(project_id)
+        if entry is None:
+            entry = self._locks[project_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[project_id]
+
+    @asynccontextmanager
+    async def direct_write(self, project_id: int, node_ids: Iterable[int]) -> AsyncIterator[None]:
+        """
+        버퍼를 거치지 않고 위치를 직접 쓰는 구간 (쓰기와 커밋을 이 안에서).
+        flush 와 같은 잠금을 잡고 해당 노드의 버퍼 값을 버리므로,
+        이미 시작된 flush 의 예전 값이 직접 쓴 값을 덮어쓰지 못합니다.
+        """
+        async with self._locked(project_id):
+            self.discard(project_id, node_ids)
+            yield
+
+    async def flush(self, project_id: int) -> int:
+        async with self._locked(project_id):
+            pending = self._pending.pop(project_id, None)
+            self._first_put.pop(project_id, None)
+            self._last_put.pop(project_id, None)
+            if not pending:
+                return 0
+            rows = [(node_id, x, y) for node_id, (x, y) in pending.items()]
+            try:
+                async with AsyncSessionLocal() as session:
+                    updated = await bulk_update_positions(session, project_id, rows)
+                    await session.commit()
+            except Exception:
+                # 실패 시 그 사이 들어온 더 새로운 값은 유지하고 나머지를 되돌려 놓음
+                restored = self._pending.setdefault(project_id, {})
+                for node_id, pos in pending.items():
+                    restored.setdefault(node_id, pos)
+                self._first_put.setdefault(project_id, time.monotonic())
+                self._last_put.setdefault(project_id, time.monotonic())
+                raise
+            self.written += len(rows)
+            self.flushes += 1
+            return updated
+
+    async def flush_all(self) -> None:
+        for project_id in list(self._pending):
+            await self.flush(project_id)
+
+    async def _run(self) -> None:
+        tick = max(min(self.interval, self.idle) / 2, 0.01)
+        while True:
+            await asyncio.sleep(tick)
+            now = time.monotonic()
+            due = [
+                pid for pid in list(self._pending)
+                if now - self._last_put.get(pid, now) >= self.idle
+                or now - self._first_put.get(pid, now) >= self.interval
+            ]
+            for pid in due:
+                try:
+                    await self.flush(pid)
+                except Exception:
+                    # 값은 버퍼에 되돌려 놓았으므로 다음 tick 에 재시도
+                    self.flush_errors += 1
+                    logger.exception("position flush for project %s failed", pid)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush_all()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "pending_projects": len(self._pending),
+            "pending_nodes": sum(len(p) for p in self._pending.values()),
+            "locks": len(self._locks),
+            "received": self.received,
+            "written": self.written,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "coalesce_ratio": round(self.received / self.written, 2) if self.written else 0.0,
+        }
+
+
+position_buffer = PositionBuffer(POSITION_FLUSH_INTERVAL, POSITION_IDLE_FLUSH)
@@ -0,0 +1,91 @@
+# app/utils/summary_cache.py
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", "30"))       # 초 (다른 워커의 변경 반영 상한)
+SUMMARY_CACHE_MAX = int(os.getenv("SUMMARY_CACHE_MAX", "10000"))
+
+
+def make_etag(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match 헤더(여러 개 / W/ 약한 비교 / * 허용)가 etag 와 일치하는지 확인합니다.
+    """
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+class SummaryCache:
+    """
+    프로젝트 요약(/projects/{id}/summary) 결과 캐시.
+    - 프로젝트별 버전 번호를 두고, 노드/태그/태그 연결 변경 후 touch() 로 올립니다.
+    - 저장된 결과는 계산 시작 시점의 버전과 현재 버전이 같고 TTL 이내일 때만 사용합니다.
+      (계산 도중 변경이 커밋되면 그 결과는 다음 조회에서 버려짐)
+    - ETag 는 결과 내용의 해시이므로 워커/재시작과 무관하게 같은 내용이면 같은 값입니다.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._versions: Dict[int, int] = {}
+        self._entries: Dict[int, Tuple[int, float, str, Dict[str, Any]]] = {}  # pid -> (version, expires, etag, payload)
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def version(self, project_id: int) -> int:
+        return self._versions.get(project_id, 0)
+
+    def touch(self, project_id: int) -> None:
+        """
+        프로젝트 요약에 영향을 주는 변경이 커밋된 뒤 호출합니다.
+        """
+        self._versions[project_id] = self._versions.get(project_id, 0) + 1
+        self._entries.pop(project_id, None)
+        self.invalidations += 1
+
+    def get(self, project_id: int) -> Optional[Tuple[str, Dict[str, Any]]]:
+        entry = self._entries.get(project_id)
+        if entry is None or entry[0] != self.version(project_id) or entry[1] < time.monotonic():
+            self._entries.pop(project_id, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[2], entry[3]
+
+    def put(self, project_id: int, version: int, payload: Dict[str, Any]) -> str:
+        etag = make_etag(payload)
+        if version == self.version(project_id):
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()  # 단순 상한: 가득 차면 비우고 다시 채움
+            self._entries[project_id] = (version, time.monotonic() + self.ttl, etag, payload)
+        return etag
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "tracked_projects": len(self._versions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+summary_cache = SummaryCache(SUMMARY_CACHE_TTL, SUMMARY_CACHE_MAX)
@@ -0,0 +1,205 @@
+# app/utils/tracing.py
+
+import functools
+import json
+import os
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from app.utils.metrics import SPAN_LATENCY
+
+# ── 설정 ──────────────────────────────────────────────────────────────
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))   # 요청 중 트레이스를 남길 비율 (0~1)
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "200"))      # 메모리에 보관할 최근 트레이스 수
+TRACE_FILE = os.getenv("TRACE_FILE")                                # 지정하면 JSONL 로 추가 기록
+
+
+class Span:
+    __slots__ = ("id", "parent_id", "name", "attrs", "start", "duration", "error")
+
+    def __init__(self, name: str, parent_id: Optional[str], attrs: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.error: Optional[str] = None
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "offset_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attrs": self.attrs,
+            "error": self.error,
+        }
+
+
+class Trace:
+    __slots__ = ("id", "name", "started_at", "root", "spans")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = datetime.utcnow()
+        self.root = Span(name, None, attrs)
+        self.spans: List[Span] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        origin = self.root.start
+        return {
+            "trace_id": self.id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.root.duration * 1000, 3),
+            "spans": [self.root.to_dict(origin)] + [s.to_dict(origin) for s in self.spans],
+        }
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+# ── 내보내기(exporter) ────────────────────────────────────────────────
+class RingBufferExporter:
+    """
+    최근 트레이스 N개를 메모리에 보관합니다 (/_debug/traces 에서 조회).
+    """
+
+    def __init__(self, size: int):
+        self.traces: Deque[Dict[str, Any]] = deque(maxlen=size)
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        self.traces.append(trace)
+
+    def recent(self, limit: int, name: Optional[str] = None, min_ms: float = 0.0) -> List[Dict[str, Any]]:
+        out = [
+            t for t in reversed(self.traces)
+            if (name is None or name in t["name"]) and t["duration_ms"] >= min_ms
+        ]
+        return out[:limit]
+
+
+class FileExporter:
+    """
+    트레이스를 한 줄에 하나씩 JSONL 파일에 덧붙입니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(trace, ensure_ascii=False, default=str) + "\n")
+
+
+ring_buffer = RingBufferExporter(TRACE_BUFFER_SIZE)
+EXPORTERS: List[Any] = [ring_buffer]
+if TRACE_FILE:
+    EXPORTERS.append(FileExporter(TRACE_FILE))
+
+
+def add_exporter(exporter: Any) -> None:
+    """
+    export(trace_dict) 메서드를 가진 객체를 exporter 로 등록합니다.
+    """
+    EXPORTERS.append(exporter)
+
+
+# ── 트레이스 / 스팬 ───────────────────────────────────────────────────
+def start_trace(name: str, sample_rate: Optional[float] = None, **attrs: Any) -> Optional[Trace]:
+    """
+    요청 하나의 트레이스를 시작합니다. 샘플링에서 빠지면 None 을 반환하고,
+    그 안의 span() 은 메트릭만 기록합니다.
+    """
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or random.random() >= rate:
+        _trace.set(None)
+        _span.set(None)
+        return None
+    trace = Trace(name, attrs)
+    _trace.set(trace)
+    _span.set(trace.root)
+    return trace
+
+
+def finish_trace(trace: Optional[Trace], name: Optional[str] = None, **attrs: Any) -> None:
+    if trace is None:
+        return
+    trace.root.duration = time.perf_counter() - trace.root.start
+    if name:
+        trace.name = trace.root.name = name
+    trace.root.attrs.update(attrs)
+    data = trace.to_dict()
+    for exporter in EXPORTERS:
+        try:
+            exporter.export(data)
+        except Exception:
+            pass
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """
+    코드 구간을 span 으로 기록합니다.
+    - 항상: span_duration_seconds{span=name} 히스토그램에 소요 시간 기록
+    - 샘플링된 트레이스 안이면: 현재 span 의 자식으로 트레이스에 추가
+        with span("nodes.create.insert", count=len(rows)):
+            ...
+    """
+    trace = _trace.get()
+    current: Optional[Span] = None
+    token = None
+    if trace is not None:
+        parent = _span.get()
+        current = Span(name, parent.id if parent else None, attrs)
+        trace.spans.append(current)
+        token = _span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        if current is not None:
+            current.error = type(e).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        SPAN_LATENCY.observe(elapsed, span=name)
+        if current is not None:
+            current.duration = elapsed
+            _span.reset(token)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    async 함수 전체를 span 으로 감싸는 데코레이터.
+        @traced("helpers.ensure_member")
+        async def ensure_member(...): ...
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(span_name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_attr(key: str, value: Any) -> None:
+    """
+    현재 span 에 속성을 추가합니다 (샘플링되지 않았으면 아무 일도 하지 않음).
+    """
+    current = _span.get()
+    if current is not None:
+        current.attrs[key] = value
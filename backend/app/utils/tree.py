@@ -0,0 +1,171 @@
+# app/utils/tree.py
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, insert, delete, update, literal, values, column, cast, BigInteger, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.db.models.node import Node, NodeStateEnum
+from app.db.models.node_closure import NodeClosure
+from app.utils.tracing import traced
+
+
+# ── 조회: closure table 인덱스 범위 스캔 ──────────────────────────────
+def subtree_select(
+    node_id: int,
+    max_depth: Optional[int] = None,
+    states: Optional[Iterable[NodeStateEnum]] = None,
+) -> Select:
+    """
+    node_id를 루트로 하는 서브트리의 id를 구하는 SELECT를 만듭니다 (자기 자신 포함).
+    - node_closure PK(ancestor_id, descendant_id) 범위 스캔 한 번으로 계산합니다.
+    - max_depth: 루트로부터의 상대 깊이 제한 (0이면 자기 자신만)
+    - states: 지정하면 해당 상태의 노드만 결과에 포함
+    UPDATE/DELETE의 IN (...) 서브쿼리로 그대로 넣을 수도 있습니다.
+    """
+    stmt = select(NodeClosure.descendant_id).where(NodeClosure.ancestor_id == node_id)
+    if max_depth is not None:
+        stmt = stmt.where(NodeClosure.depth <= max_depth)
+    if states is not None:
+        stmt = (
+            stmt.join(Node, Node.id == NodeClosure.descendant_id)
+                .where(Node.state.in_(list(states)))
+        )
+    return stmt
+
+
+def ancestor_select(node_id: int, include_self: bool = False) -> Select:
+    """
+    node_id의 조상 id를 루트 → 부모 순서로 구하는 SELECT를 만듭니다.
+    """
+    stmt = select(NodeClosure.ancestor_id).where(NodeClosure.descendant_id == node_id)
+    if not include_self:
+        stmt = stmt.where(NodeClosure.depth > 0)
+    return stmt.order_by(NodeClosure.depth.desc())
+
+
+@traced("tree.get_descendant_node_ids")
+async def get_descendant_node_ids(
+    node_id: int,
+    db: AsyncSession,
+    max_depth: Optional[int] = None,
+    states: Optional[Iterable[NodeStateEnum]] = None,
+) -> List[int]:
+    """
+    node_id를 루트로 하는 모든 자손 노드들의 id를 리스트로 반환 (자기 자신 포함).
+    노드 수와 관계없이 DB 왕복은 한 번입니다.
+    """
+    rows = await db.execute(subtree_select(node_id, max_depth, states))
+    return [row[0] for row in rows.all()]
+
+
+async def get_ancestor_node_ids(node_id: int, db: AsyncSession, include_self: bool = False) -> List[int]:
+    """
+    루트부터 부모까지의 조상 id 리스트를 반환합니다.
+    """
+    rows = await db.execute(ancestor_select(node_id, include_self))
+    return [row[0] for row in rows.all()]
+
+
+async def get_tree_depth(node_id: int, db: AsyncSession) -> int:
+    """
+    루트로부터 node_id까지의 실제 트리 깊이 (루트 = 0).
+    """
+    result = await db.execute(
+        select(func.coalesce(func.max(NodeClosure.depth), 0))
+        .where(NodeClosure.descendant_id == node_id)
+    )
+    return result.scalar_one()
+
+
+# ── 유지: 생성 / 이동 (삭제는 FK ON DELETE CASCADE로 정리) ─────────────
+@traced("tree.link_nodes")
+async def link_nodes(db: AsyncSession, pairs: Sequence[Tuple[int, Optional[int]]]) -> None:
+    """
+    새로 flush된 노드들의 closure 행을 한 번의 INSERT ... SELECT로 추가합니다.
+    pairs: (node_id, parent_id) 목록. parent_id가 None이면 루트 노드입니다.
+    같은 배치 안에서 서로 부모/자식인 노드는 지원하지 않습니다 (부모를 먼저 link 하세요).
+    """
+    if not pairs:
+        return
+    v = values(
+        column("node_id", BigInteger),
+        column("parent_id", BigInteger),
+        name="new_nodes",
+    ).data([(nid, pid) for nid, pid in pairs])
+
+    # 루트만 있는 배치는 VALUES 의 parent_id 가 NULL 뿐이라 text 로 추론되므로 명시적으로 캐스팅
+    inherited = (
+        select(NodeClosure.ancestor_id, v.c.node_id, NodeClosure.depth + 1)
+        .select_from(NodeClosure)
+        .join(v, NodeClosure.descendant_id == cast(v.c.parent_id, BigInteger))
+    )
+    self_rows = select(v.c.node_id, v.c.node_id, literal(0))
+
+    await db.execute(
+        insert(NodeClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            inherited.union_all(self_rows),
+        )
+    )
+
+
+async def link_node(db: AsyncSession, node_id: int, parent_id: Optional[int]) -> None:
+    await link_nodes(db, [(node_id, parent_id)])
+
+
+@traced("tree.move_subtree")
+async def move_subtree(db: AsyncSession, node: Node, new_parent: Node) -> None:
+    """
+    node 서브트리를 new_parent 아래로 옮깁니다 (reparent).
+    closure 행을 재작성하고, 서브트리 전체의 Node.depth도 새 위치에 맞게 보정합니다.
+    """
+    # 자기 자신/자손 아래로는 이동 불가 (순환 방지)
+    cycle = await db.execute(
+        select(NodeClosure.depth).where(
+            NodeClosure.ancestor_id == node.id,
+            NodeClosure.descendant_id == new_parent.id,
+        )
+    )
+    if cycle.first() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot move a node under its own subtree"
+        )
+
+    sub = select(NodeClosure.descendant_id).where(NodeClosure.ancestor_id == node.id)
+    old_ancestors = select(NodeClosure.ancestor_id).where(
+        NodeClosure.descendant_id == node.id,
+        NodeClosure.ancestor_id != node.id,
+    )
+
+    # (1) 서브트리와 기존 조상 사이의 경로 제거
+    await db.execute(
+        delete(NodeClosure).where(
+            NodeClosure.descendant_id.in_(sub),
+            NodeClosure.ancestor_id.in_(old_ancestors),
+        )
+    )
+
+    # (2) 새 부모의 조상(자기 포함) × 서브트리 경로 추가
+    sup_c = NodeClosure.__table__.alias("sup")
+    sub_c = NodeClosure.__table__.alias("sub")
+    await db.execute(
+        insert(NodeClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(sup_c.c.ancestor_id, sub_c.c.descendant_id, sup_c.c.depth + sub_c.c.depth + 1)
+            .where(sup_c.c.descendant_id == new_parent.id, sub_c.c.ancestor_id == node.id),
+        )
+    )
+
+    # (3) parent_id / depth 컬럼 보정
+    await db.execute(
+        update(Node)
+        .where(Node.id == NodeClosure.descendant_id, NodeClosure.ancestor_id == node.id)
+        .values(depth=new_parent.depth + 1 + NodeClosure.depth)
+        .execution_options(synchronize_session=False)
+    )
+    node.parent_id = new_parent.id
+    node.depth = new_parent.depth + 1
@@ -0,0 +1,116 @@
+# app/utils/ws_codec.py
+
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성: 없으면 JSON 만 사용
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성: 없으면 압축하지 않음
+    zstandard = None
+
+# ── 설정 ──────────────────────────────────────────────────────────────
+WS_ZSTD_MIN_BYTES = int(os.getenv("WS_ZSTD_MIN_BYTES", "1024"))   # 이보다 큰 msgpack 프레임만 zstd 압축 (0 이면 압축 안 함)
+WS_ZSTD_LEVEL = int(os.getenv("WS_ZSTD_LEVEL", "3"))
+
+# 바이너리 프레임 첫 바이트: 뒤따르는 msgpack 본문의 압축 여부
+FLAG_RAW = 0x00
+FLAG_ZSTD = 0x01
+
+# Sec-WebSocket-Protocol 로 인코딩을 고를 때 쓰는 이름
+SUBPROTOCOLS = {
+    "brainshare.json": "json",
+    "brainshare.msgpack": "msgpack",
+}
+
+_compressor = zstandard.ZstdCompressor(level=WS_ZSTD_LEVEL) if zstandard is not None else None
+_stats = {"binary_frames": 0, "compressed_frames": 0, "compress_in_bytes": 0, "compress_out_bytes": 0}
+
+
+def available() -> Dict[str, bool]:
+    return {"json": True, "msgpack": msgpack is not None}
+
+
+def negotiate(ws: WebSocket, encoding: Optional[str]) -> Tuple[str, Optional[str]]:
+    """
+    연결 시 사용할 인코딩과 응답할 subprotocol 을 고릅니다.
+    - ?encoding=msgpack 쿼리 또는 "brainshare.msgpack" subprotocol 로 MessagePack 을 요청할 수 있습니다.
+    - msgpack 이 설치되어 있지 않으면 JSON 으로 대체합니다 (기본값도 JSON).
+    - 클라이언트가 제시한 subprotocol 중 선택한 인코딩과 맞는 것이 있으면 그 이름을 돌려줍니다.
+    """
+    offered = [p for p in ws.scope.get("subprotocols", []) if p in SUBPROTOCOLS]
+    wanted = (encoding or "").lower() or (SUBPROTOCOLS[offered[0]] if offered else "json")
+    chosen = wanted if available().get(wanted) else "json"
+    if chosen != wanted:
+        logger.info("ws encoding %r unavailable, falling back to json", wanted)
+    subprotocol = next((p for p in offered if SUBPROTOCOLS[p] == chosen), None)
+    return chosen, subprotocol
+
+
+class Frame:
+    """
+    브로드캐스트 메시지 하나. JSON 텍스트는 항상 갖고 있고,
+    바이너리(msgpack[+zstd]) 프레임은 처음 필요할 때 한 번만 만들어 모든 연결이 공유합니다.
+    obj 가 없으면 JSON 텍스트를 한 번 파싱해서 씁니다 (backplane / delta 로그에서 온 메시지).
+    """
+
+    __slots__ = ("text", "obj", "_binary")
+
+    def __init__(self, text: str, obj: Any = None):
+        self.text = text
+        self.obj = obj
+        self._binary: Optional[bytes] = None
+
+    def binary(self) -> bytes:
+        if self._binary is None:
+            obj = self.obj if self.obj is not None else json.loads(self.text)
+            body = msgpack.packb(obj, default=str, use_bin_type=True)
+            self._binary = _frame(body)
+        return self._binary
+
+
+def _frame(body: bytes) -> bytes:
+    _stats["binary_frames"] += 1
+    if _compressor is not None and 0 < WS_ZSTD_MIN_BYTES <= len(body):
+        packed = _compressor.compress(body)
+        if len(packed) < len(body):
+            _stats["compressed_frames"] += 1
+            _stats["compress_in_bytes"] += len(body)
+            _stats["compress_out_bytes"] += len(packed)
+            return bytes((FLAG_ZSTD,)) + packed
+    return bytes((FLAG_RAW,)) + body
+
+
+def decode(data: bytes) -> Any:
+    """
+    클라이언트가 보낸 바이너리 프레임(플래그 1바이트 + msgpack)을 풉니다.
+    압축은 서버 → 클라이언트 방향에만 씁니다. 클라이언트가 보낸 zstd 프레임은 풀지 않고 거절합니다
+    (작은 프레임이 아주 큰 출력으로 풀리는 압축 폭탄을 막기 위해).
+    """
+    if msgpack is None or not data:
+        raise ValueError("binary frames are not supported")
+    flag, body = data[0], data[1:]
+    if flag == FLAG_ZSTD:
+        raise ValueError("compressed frames are not accepted from clients")
+    if flag != FLAG_RAW:
+        raise ValueError(f"unknown frame flag: {flag}")
+    return msgpack.unpackb(body, raw=False)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "available": available(),
+        "zstd": zstandard is not None,
+        "zstd_min_bytes": WS_ZSTD_MIN_BYTES,
+        **_stats,
+    }
@@ -1,23 +1,437 @@
+# app/utils/ws_manager.py
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, Optional, Union
+
 from fastapi import WebSocket
-from fastapi.websockets import WebSocketDisconnect
-from collections import defaultdict
-from typing import Dict, Set, Any, List
 
-WS_CONNECTIONS: Dict[str, Set[WebSocket]] = defaultdict(set)
+from app.utils.metrics import WS_CONNECTIONS as WS_GAUGE, WS_DROPPED, WS_LIVE, WS_REAPED, WS_REJECTED
+from app.utils.backplane import backplane
+from app.utils.deltas import delta_log
+from app.utils.ws_codec import Frame, decode, negotiate, stats as codec_stats
+
+logger = logging.getLogger(__name__)
+
+# ── 설정 ──────────────────────────────────────────────────────────────
+WS_SEND_QUEUE = int(os.getenv("WS_SEND_QUEUE", "256"))          # 연결별 송신 대기열 최대 길이
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "10"))     # 메시지 하나 전송 제한(초), 넘으면 연결 종료
+# 대기열이 가득 찼을 때의 정책
+#   drop_oldest: 가장 오래된 메시지를 버림
+#   coalesce:    밀린 메시지를 모두 버리고 {"type": "resync"} 하나로 대체 (클라이언트가 다시 조회)
+#   disconnect:  연결을 끊음 (클라이언트가 재접속 후 다시 조회)
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+if WS_SLOW_CONSUMER_POLICY not in ("drop_oldest", "coalesce", "disconnect"):
+    raise ValueError(f"WS_SLOW_CONSUMER_POLICY 값이 올바르지 않습니다: {WS_SLOW_CONSUMER_POLICY}")
+WS_CLOSE_SLOW_CONSUMER = 1013  # "Try Again Later"
+RESYNC_KEY = ("resync",)
+
+# 애플리케이션 하트비트 (?heartbeat=1 로 접속한 클라이언트만):
+# WS_PING_INTERVAL 마다 {"type": "ping", "id"} 를 보내고 {"type": "pong", "id"} 응답을 기다림.
+# 그 외 클라이언트는 프로토콜 ping/pong 으로 확인합니다 (uvicorn --ws-ping-interval / --ws-ping-timeout, startup.sh).
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "20"))   # 초, 0 이면 하트비트 끔
+WS_PONG_TIMEOUT = float(os.getenv("WS_PONG_TIMEOUT", "10"))     # ping 후 이 시간 안에 pong 이 없으면 끊음
+WS_IDLE_TIMEOUT = float(os.getenv("WS_IDLE_TIMEOUT", "0"))      # pong 외 메시지가 없는 채로 지난 시간(초), 0 이면 끔
+# 하트비트 클라이언트가 아무것도 보내지 않은 채 이 시간이 지나면 receive 루프가 끊긴 연결로 봄 (하트비트를 끄면 제한 없음)
+WS_RECEIVE_TIMEOUT = WS_PING_INTERVAL + WS_PONG_TIMEOUT if WS_PING_INTERVAL > 0 else None
+# 워커당 연결 수 상한 (0 이면 제한 없음)
+WS_MAX_PER_PROJECT = int(os.getenv("WS_MAX_PER_PROJECT", "500"))
+WS_MAX_PER_USER = int(os.getenv("WS_MAX_PER_USER", "20"))
+WS_CLOSE_LIMIT = 4429          # 연결 수 상한 초과
+WS_CLOSE_TIMEOUT = 4408        # pong / 수신 시간 초과
+WS_CLOSE_FORBIDDEN = 4403      # 프로젝트 멤버가 아님
+WS_CLOSE_IDLE = 1001           # "Going Away"
+PING_KEY = ("ping",)
+
+
+class Connection:
+    """
+    WebSocket 연결 하나와 그 송신 대기열.
+    - broadcast 는 offer() 로 대기열에 넣기만 하고 즉시 반환합니다 (느린 클라이언트가 다른 연결을 막지 않음).
+    - 연결별 writer 태스크가 대기열을 순서대로 전송합니다.
+    - key 가 있는 메시지는 아직 전송되지 않은 같은 key 의 메시지를 대체합니다 (예: 같은 노드의 위치 이동).
+    - 대기열이 가득 차면 policy(WS_SLOW_CONSUMER_POLICY)에 따라 처리합니다.
+    - encoding 이 "msgpack" 이면 Frame 의 바이너리 인코딩을, 아니면 JSON 텍스트를 보냅니다.
+    - heartbeat 이면 앱 ping 에 pong 으로 답하기로 한 클라이언트입니다 (응답이 없으면 정리 대상).
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        ws: WebSocket,
+        max_queue: int,
+        policy: str,
+        encoding: str = "json",
+        user_id: Optional[str] = None,
+        heartbeat: bool = False,
+    ):
+        self.project_id = project_id
+        self.ws = ws
+        self.max_queue = max_queue
+        self.policy = policy
+        self.encoding = encoding
+        self.user_id = user_id
+        self.heartbeat = heartbeat and WS_PING_INTERVAL > 0
+        now = time.monotonic()
+        self.last_seen = now           # 마지막으로 무엇이든 받은 시각
+        self.last_active = now         # 마지막으로 pong 이 아닌 메시지를 받은 시각
+        self.ping_id = 0
+        self.ping_sent: Optional[float] = None   # 응답을 기다리는 ping 을 보낸 시각
+        self.rtt: Optional[float] = None
+        self._queue: "OrderedDict[Hashable, Frame]" = OrderedDict()
+        self._seq = 0
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._writer())
+
+    def offer(self, frame: Frame, key: Optional[Hashable] = None) -> None:
+        if self.closed:
+            return
+        if key is not None and key in self._queue:
+            self._queue[key] = frame         # 위치는 유지하고 내용만 최신으로
+            self.coalesced += 1
+            WS_DROPPED.inc(reason="coalesced")
+            return
+        if len(self._queue) >= self.max_queue:
+            if self.policy == "disconnect":
+                WS_DROPPED.inc(len(self._queue) + 1, reason="disconnected")
+                self.reap("slow_consumer", WS_CLOSE_SLOW_CONSUMER)
+                return
+            if self.policy == "coalesce":
+                self.dropped += len(self._queue) + 1
+                WS_DROPPED.inc(len(self._queue) + 1, reason="resync")
+                self._queue.clear()
+                self._queue[RESYNC_KEY] = Frame(encode({"type": "resync", "reason": "slow_consumer"}))
+                self._ready.set()
+                return
+            self._queue.popitem(last=False)
+            self.dropped += 1
+            WS_DROPPED.inc(reason="queue_full")
+        self._seq += 1
+        self._queue[key if key is not None else ("seq", self._seq)] = frame
+        self._ready.set()
+
+    async def _writer(self) -> None:
+        binary = self.encoding == "msgpack"
+        try:
+            while True:
+                await self._ready.wait()
+                while self._queue:
+                    _, frame = self._queue.popitem(last=False)
+                    send = self.ws.send_bytes(frame.binary()) if binary else self.ws.send_text(frame.text)
+                    await asyncio.wait_for(send, timeout=WS_SEND_TIMEOUT)
+                    self.sent += 1
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 전송 실패 / 시간 초과: 연결 정리 (receive 루프도 곧 끊김을 감지)
+            logger.info("ws writer stopped for project %s: %r", self.project_id, e)
+            if isinstance(e, asyncio.TimeoutError):
+                self.reap("send_timeout", WS_CLOSE_SLOW_CONSUMER)
+            else:
+                self.reap("send_failed")
+
+    def on_receive(self, message: Dict[str, Any]) -> None:
+        """
+        receive 루프가 받은 ASGI 메시지를 기록합니다. pong 이면 대기 중인 ping 을 해제합니다.
+        """
+        now = time.monotonic()
+        self.last_seen = now
+        try:
+            if message.get("text") is not None:
+                msg = json.loads(message["text"])
+            elif message.get("bytes") is not None:
+                msg = decode(message["bytes"])
+            else:
+                msg = None
+        except Exception:  # 형식이 잘못된 클라이언트 메시지는 내용 없이 활동으로만 기록
+            msg = None
+        if isinstance(msg, dict) and msg.get("type") == "pong":
+            if self.ping_sent is not None and msg.get("id") == self.ping_id:
+                self.rtt = now - self.ping_sent
+                self.ping_sent = None
+            return
+        self.last_active = now
+
+    @property
+    def receive_timeout(self) -> Optional[float]:
+        # 하트비트에 응하지 않는 클라이언트는 아무것도 보내지 않을 수 있으므로 제한 없음
+        return WS_RECEIVE_TIMEOUT if self.heartbeat else None
 
-async def connect(project_id: str, ws: WebSocket):
-    await ws.accept()
-    WS_CONNECTIONS[project_id].add(ws)
+    def ping(self) -> None:
+        self.ping_id += 1
+        self.ping_sent = time.monotonic()
+        self.offer(Frame(encode({"type": "ping", "id": self.ping_id})), PING_KEY)
 
-def disconnect(project_id: str, ws: WebSocket):
-    WS_CONNECTIONS[project_id].discard(ws)
+    def reap(self, reason: str, code: Optional[int] = None) -> None:
+        """
+        서버 쪽 판단(응답 없음, 유휴, 전송 실패 등)으로 연결을 정리합니다.
+        """
+        if self.closed:
+            return
+        WS_REAPED.inc(reason=reason)
+        self.close(code)
 
-async def broadcast(project_id: str, msg: Dict[str, Any]):
-    dead: List[WebSocket] = []
-    for ws in WS_CONNECTIONS[project_id]:
+    def close(self, code: Optional[int] = None) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        disconnect(self.project_id, self.ws)
+        if code is not None:
+            asyncio.ensure_future(self._close_socket(code))
+
+    async def _close_socket(self, code: int) -> None:
         try:
-            await ws.send_json(msg)
-        except WebSocketDisconnect:
-            dead.append(ws)
-    for ws in dead:
-        disconnect(project_id, ws)
+            # 반쯤 끊긴 연결이면 close 프레임 전송이 끝나지 않을 수 있으므로 제한 시간을 둠
+            await asyncio.wait_for(self.ws.close(code=code), timeout=WS_SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        self.closed = True
+        if self._task and not self._task.done() and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+
+WS_CONNECTIONS: Dict[str, Dict[WebSocket, Connection]] = defaultdict(dict)
+USER_CONNECTIONS: Dict[str, int] = defaultdict(int)   # user_id → 이 워커의 연결 수
+_heartbeat_task: Optional[asyncio.Task] = None
+
+
+def _key(project_id: Union[int, str]) -> str:
+    # REST 핸들러는 int, WebSocket 경로는 str 로 넘기므로 한 형태로 맞춤
+    return str(project_id)
+
+
+async def connect(
+    project_id: Union[int, str],
+    ws: WebSocket,
+    since: Optional[int] = None,
+    epoch: Optional[str] = None,
+    encoding: Optional[str] = None,
+    user_id: Optional[str] = None,
+    heartbeat: bool = False,
+) -> Optional[Connection]:
+    """
+    연결을 등록하고 {"type": "hello", "epoch", "seq", "encoding"} 를 먼저 보냅니다.
+    since/epoch 를 주면 (재접속) 그 뒤로 놓친 delta 를 순서대로 다시 보내고,
+    로그가 그 구간을 덮지 못하면 {"type": "resync"} 를 보내 전체 재조회를 요청합니다.
+    encoding: "json"(기본) 또는 "msgpack" (subprotocol 로도 선택 가능, ws_codec.negotiate 참고)
+    heartbeat: 앱 ping/pong 에 참여할지 (hello 의 "heartbeat" 로 실제 적용 여부를 알려 줌)
+    프로젝트별/사용자별 연결 수 상한을 넘으면 4429 로 닫고 None 을 반환합니다.
+    """
+    encoding, subprotocol = negotiate(ws, encoding)
+    await ws.accept(subprotocol=subprotocol)  # 닫기 코드를 클라이언트가 받을 수 있도록 먼저 accept
+    pid = _key(project_id)
+    # 상한 검사와 등록 사이에 await 가 없으므로 동시 접속으로 상한을 넘지 않음
+    if WS_MAX_PER_PROJECT and len(WS_CONNECTIONS.get(pid, ())) >= WS_MAX_PER_PROJECT:
+        reason = "project_limit"
+    elif WS_MAX_PER_USER and user_id is not None and USER_CONNECTIONS.get(user_id, 0) >= WS_MAX_PER_USER:
+        reason = "user_limit"
+    else:
+        reason = None
+    if reason is not None:
+        WS_REJECTED.inc(reason=reason)
+        await ws.close(code=WS_CLOSE_LIMIT, reason=reason)
+        return None
+
+    conn = Connection(pid, ws, WS_SEND_QUEUE, WS_SLOW_CONSUMER_POLICY, encoding, user_id, heartbeat)
+    # 등록과 재전송 사이에 await 가 없으므로, 그 사이 새 delta 가 끼어들거나 빠지지 않음
+    WS_CONNECTIONS[pid][ws] = conn
+    if user_id is not None:
+        USER_CONNECTIONS[user_id] += 1
+    WS_GAUGE.inc(project_id=pid)
+    WS_LIVE.inc()
+    head_epoch, head_seq = delta_log.head(pid)
+    conn.offer(Frame(encode({
+        "type": "hello", "epoch": head_epoch, "seq": head_seq, "encoding": encoding, "heartbeat": conn.heartbeat,
+    })))
+    if since is not None:
+        missed = delta_log.since(pid, epoch, since)
+        if missed is None:
+            conn.offer(Frame(encode({"type": "resync", "reason": "log_gap", "epoch": head_epoch, "seq": head_seq})), RESYNC_KEY)
+        else:
+            for text in missed:
+                conn.offer(Frame(text))
+    conn.start()
+    return conn
+
+
+def disconnect(project_id: Union[int, str], ws: WebSocket) -> None:
+    pid = _key(project_id)
+    conns = WS_CONNECTIONS.get(pid)
+    if not conns or ws not in conns:
+        return
+    conn = conns.pop(ws)
+    conn.stop()
+    WS_GAUGE.dec(project_id=pid)
+    WS_LIVE.dec()
+    if not conns:
+        del WS_CONNECTIONS[pid]
+    if conn.user_id is not None:
+        USER_CONNECTIONS[conn.user_id] -= 1
+        if USER_CONNECTIONS[conn.user_id] <= 0:
+            del USER_CONNECTIONS[conn.user_id]
+
+
+def encode(msg: Dict[str, Any]) -> str:
+    return json.dumps(msg, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def deliver(project_id: str, text: str, key: Optional[Hashable] = None, obj: Any = None) -> None:
+    """
+    이미 직렬화된 메시지를 이 워커에 붙은 프로젝트 연결들의 송신 대기열에 넣습니다.
+    (backplane 이 다른 워커에서 받은 메시지도 이 함수로 전달)
+    모든 연결이 같은 Frame 을 공유하므로 msgpack 인코딩도 메시지당 한 번만 일어납니다.
+    obj: text 의 원본 객체 (있으면 msgpack 인코딩 시 JSON 을 다시 파싱하지 않음)
+    """
+    conns = WS_CONNECTIONS.get(project_id)
+    if not conns:
+        return
+    frame = Frame(text, obj)
+    for conn in list(conns.values()):
+        conn.offer(frame, key)
+
+
+def request_resync(project_id: Optional[str], reason: str) -> None:
+    """
+    메시지가 유실되었을 수 있을 때 클라이언트에게 다시 조회하라고 알립니다.
+    project_id 가 None 이면 이 워커의 모든 프로젝트에 보냅니다.
+    """
+    delta_log.reset(project_id)  # 유실된 delta 가 있으므로 기존 seq 로는 재개할 수 없음
+    for pid in ([project_id] if project_id is not None else list(WS_CONNECTIONS)):
+        head_epoch, head_seq = delta_log.head(pid)
+        deliver(pid, encode({"type": "resync", "reason": reason, "epoch": head_epoch, "seq": head_seq}), RESYNC_KEY)
+
+
+async def broadcast(project_id: Union[int, str], msg: Dict[str, Any], key: Optional[Hashable] = None) -> None:
+    """
+    프로젝트의 모든 연결(다른 워커 포함)에 msg 를 보냅니다.
+    직렬화는 한 번만 하고, 각 연결의 송신 대기열에 넣은 뒤 바로 반환합니다 (전송 완료를 기다리지 않음).
+    다른 워커로는 backplane(WS_BACKPLANE)을 통해 전달됩니다.
+    key: 같은 key 의 미전송 메시지를 최신 것으로 대체 (중간 상태가 의미 없는 이벤트용)
+    """
+    pid = _key(project_id)
+    text = encode(msg)
+    deliver(pid, text, key, msg)
+    backplane.publish(pid, text, key)
+
+
+async def emit_delta(project_id: Union[int, str], op: str, data: Any) -> None:
+    """
+    노드/태그/태그 연결 변경을 delta 이벤트로 보냅니다 (커밋 후 호출).
+    {"type": "delta", "epoch", "seq", "op", "data"} 형태이며, seq 는 워커마다 붙입니다.
+    클라이언트는 seq 가 건너뛰면 since=<마지막 seq>&epoch=<epoch> 로 재접속해 놓친 delta 를 받습니다.
+    """
+    pid = _key(project_id)
+    body = encode({"op": op, "data": data})
+    deliver(pid, delta_log.record(pid, op, body))
+    backplane.publish(pid, body, delta_op=op)
+
+
+def _on_remote(project_id: str, text: str, key: Optional[Hashable], delta_op: Optional[str]) -> None:
+    if delta_op is not None:
+        text = delta_log.record(project_id, delta_op, text)
+    deliver(project_id, text, key)
+
+
+# ── 하트비트 / 정리 ───────────────────────────────────────────────────
+def sweep(send_pings: bool = True) -> None:
+    """
+    모든 연결을 한 번 훑어서
+    - 보낸 ping 에 WS_PONG_TIMEOUT 안에 pong 이 없었던 연결 → 4408 로 정리
+    - WS_IDLE_TIMEOUT 동안 pong 외 메시지가 없던 연결 → 1001 로 정리
+    - send_pings 이면 나머지 중 응답 대기 중이 아닌 연결에 새 ping 을 보냅니다.
+    ping / pong 시간 초과는 하트비트에 참여한 연결에만 적용합니다
+    (pong 을 모르는 기존 클라이언트가 끊기지 않도록).
+    """
+    now = time.monotonic()
+    for conns in list(WS_CONNECTIONS.values()):
+        for conn in list(conns.values()):
+            if conn.ping_sent is not None and now - conn.ping_sent > WS_PONG_TIMEOUT:
+                conn.reap("pong_timeout", WS_CLOSE_TIMEOUT)
+            elif WS_IDLE_TIMEOUT > 0 and now - conn.last_active > WS_IDLE_TIMEOUT:
+                conn.reap("idle", WS_CLOSE_IDLE)
+            elif send_pings and conn.heartbeat and conn.ping_sent is None:
+                conn.ping()
+
+
+async def _heartbeat() -> None:
+    # 정리 검사는 pong 제한 시간 간격으로도 돌려서, 응답 없는 연결이 다음 ping 주기까지 남지 않게 함
+    tick = min(WS_PING_INTERVAL, WS_PONG_TIMEOUT) if WS_PONG_TIMEOUT > 0 else WS_PING_INTERVAL
+    last_ping = 0.0
+    while True:
+        await asyncio.sleep(tick)
+        now = time.monotonic()
+        send_pings = now - last_ping >= WS_PING_INTERVAL
+        if send_pings:
+            last_ping = now
+        try:
+            sweep(send_pings)
+        except Exception:
+            logger.exception("ws heartbeat sweep failed")
+
+
+async def start() -> None:
+    global _heartbeat_task
+    await backplane.start(_on_remote, request_resync)
+    if WS_PING_INTERVAL > 0 and _heartbeat_task is None:
+        _heartbeat_task = asyncio.create_task(_heartbeat())
+
+
+async def stop() -> None:
+    global _heartbeat_task
+    if _heartbeat_task is not None:
+        _heartbeat_task.cancel()
+        try:
+            await _heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        _heartbeat_task = None
+    await backplane.stop()
+
+
+def stats() -> Dict[str, Any]:
+    conns = [c for project in WS_CONNECTIONS.values() for c in project.values()]
+    return {
+        "policy": WS_SLOW_CONSUMER_POLICY,
+        "max_queue": WS_SEND_QUEUE,
+        "projects": len(WS_CONNECTIONS),
+        "connections": len(conns),
+        "queued": sum(c.depth for c in conns),
+        "max_depth": max((c.depth for c in conns), default=0),
+        "sent": sum(c.sent for c in conns),
+        "dropped": sum(c.dropped for c in conns),
+        "coalesced": sum(c.coalesced for c in conns),
+        "users": len(USER_CONNECTIONS),
+        "heartbeat_clients": sum(1 for c in conns if c.heartbeat),
+        "awaiting_pong": sum(1 for c in conns if c.ping_sent is not None),
+        "max_rtt_ms": round(max((c.rtt for c in conns if c.rtt is not None), default=0.0) * 1000, 1),
+        "heartbeat": {
+            "ping_interval": WS_PING_INTERVAL,
+            "pong_timeout": WS_PONG_TIMEOUT,
+            "idle_timeout": WS_IDLE_TIMEOUT,
+            "max_per_project": WS_MAX_PER_PROJECT,
+            "max_per_user": WS_MAX_PER_USER,
+        },
+        "encodings": dict(Counter(c.encoding for c in conns)),
+        "codec": codec_stats(),
+        "backplane": backplane.stats(),
+        "deltas": delta_log.stats(),
+    }
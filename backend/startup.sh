@@ -11,4 +11,6 @@ poetry run alembic upgrade head
 
 
 echo "Starting server..."
-poetry run uvicorn app.main:app --host 0.0.0.0 --port 8000
+# WebSocket 프로토콜 ping: 앱 하트비트(?heartbeat=1)를 쓰지 않는 클라이언트의 끊긴 연결도 정리
+poetry run uvicorn app.main:app --host 0.0.0.0 --port 8000 \
+  --ws-ping-interval "${UVICORN_WS_PING_INTERVAL:-20}" --ws-ping-timeout "${UVICORN_WS_PING_TIMEOUT:-20}"
@@ -0,0 +1,310 @@
+# backend/tests/test_ai.py
+"""
+app.utils.ai 의 비동기 LLM 호출 경로 (AsyncOpenAI 클라이언트를 가짜로 바꿔서 검사).
+- 제한 시간 초과 → 504, 동시 실행 슬롯 대기 초과 → 503
+- 클라이언트 연결이 끊기면 진행 중인 호출 취소
+- 호출이 진행 중인 동안에도 다른 엔드포인트는 응답
+- stream=true SSE: delta → node / error 순서, 첫 줄이 끝나면 업스트림을 닫고 노드 저장
+- 배치 확장: 슬롯 대기 제한에 잘리지 않고, 실패한 부모는 207 + failed 로 알림
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.db.models.node import Node, NodeStateEnum
+from app.utils import ai
+from app.utils.ai_cache import suggestion_cache
+
+
+class FakeStream:
+    """
+    stream=True 응답 대역. 조각을 하나씩 내보내고, 몇 개를 꺼냈는지와 close 여부를 기록합니다.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.consumed = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.consumed >= len(self.chunks):
+            raise StopAsyncIteration
+        text = self.chunks[self.consumed]
+        self.consumed += 1
+        await asyncio.sleep(0)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeCompletions:
+    """
+    chat.completions.create 대역. delay 초 뒤에 content 를 돌려줍니다.
+    stream=True 이면 chunks 를 흘려보내는 FakeStream 을, error 가 있으면 예외를 냅니다.
+    """
+
+    def __init__(self, content: str = "1. 아이디어", delay: float = 0.0):
+        self.content = content
+        self.delay = delay
+        self.chunks = ["1. 아이디어"]
+        self.error = None
+        self.fail_on = None     # 프롬프트에 이 문자열이 들어 있으면 error 를 냄
+        self.calls = 0
+        self.in_flight = 0
+        self.cancelled = 0
+        self.streams = []
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        if self.error is not None and (self.fail_on is None or self.fail_on in kwargs["messages"][-1]["content"]):
+            raise self.error
+        if kwargs.get("stream"):
+            self.streams.append(FakeStream(self.chunks))
+            return self.streams[-1]
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))],
+            usage=None,
+        )
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: int):
+        self.polls = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self) -> bool:
+        self.polls += 1
+        return self.polls >= self.disconnect_after
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    fake = FakeCompletions()
+    monkeypatch.setattr(ai, "_client", SimpleNamespace(chat=SimpleNamespace(completions=fake)))
+    monkeypatch.setattr(ai, "_limiter", asyncio.Semaphore(ai.AI_MAX_CONCURRENCY))
+    suggestion_cache.clear()
+    return fake
+
+
+def _events(body: str):
+    """
+    SSE 본문을 [(event, data), ...] 로 풉니다.
+    """
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+async def test_complete_returns_content(fake_llm):
+    assert await ai.complete("주제") == "1. 아이디어"
+    assert ai.parse_ideas(await ai.complete("주제")) == ["아이디어"]
+
+
+async def test_timeout_returns_504_and_releases_slot(fake_llm, monkeypatch):
+    monkeypatch.setattr(ai, "AI_TIMEOUT", 0.05)
+    fake_llm.delay = 5
+
+    with pytest.raises(HTTPException) as exc:
+        await ai.complete("주제")
+    assert exc.value.status_code == 504
+    assert fake_llm.cancelled == 1
+    assert ai._limiter._value == ai.AI_MAX_CONCURRENCY
+
+
+async def test_full_queue_returns_503(fake_llm, monkeypatch):
+    monkeypatch.setattr(ai, "_limiter", asyncio.Semaphore(1))
+    monkeypatch.setattr(ai, "AI_QUEUE_TIMEOUT", 0.05)
+    fake_llm.delay = 0.5
+
+    first = asyncio.create_task(ai.complete("첫 번째"))
+    await asyncio.sleep(0.01)
+    with pytest.raises(HTTPException) as exc:
+        await ai.complete("두 번째")
+    assert exc.value.status_code == 503
+    assert await first == "1. 아이디어"  # 먼저 들어간 호출은 영향 없음
+    assert fake_llm.calls == 1
+
+
+async def test_disconnect_cancels_generation(fake_llm, monkeypatch):
+    monkeypatch.setattr(ai, "DISCONNECT_POLL_INTERVAL", 0.01)
+    fake_llm.delay = 5
+    request = FakeRequest(disconnect_after=2)
+
+    start = time.perf_counter()
+    with pytest.raises(HTTPException) as exc:
+        await ai.cancel_on_disconnect(request, ai.complete("주제"))
+    assert exc.value.status_code == 499
+    assert time.perf_counter() - start < 1
+
+    await asyncio.sleep(0.05)  # 취소가 create() 까지 전달될 때까지 양보
+    assert fake_llm.cancelled == 1
+    assert ai._limiter._value == ai.AI_MAX_CONCURRENCY
+
+
+async def test_other_endpoints_serve_while_generations_in_flight(fake_llm):
+    from app.main import app
+
+    n = ai.AI_MAX_CONCURRENCY
+    fake_llm.delay = 0.5
+    generations = [asyncio.create_task(ai.complete(f"주제 {i}")) for i in range(n)]
+    await asyncio.sleep(0.01)
+    assert fake_llm.in_flight == n
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        start = time.perf_counter()
+        res = await client.get("/metrics")
+        elapsed = time.perf_counter() - start
+    assert res.status_code == 200
+    assert elapsed < 0.25                  # 생성이 끝나기(0.5초)를 기다리지 않음
+    assert fake_llm.in_flight == n         # 응답 시점에 생성은 아직 진행 중
+
+    assert await asyncio.gather(*generations) == ["1. 아이디어"] * n
+
+
+async def test_stream_sends_deltas_then_persists_first_line(client, db, project, fake_llm):
+    fake_llm.chunks = ["1. 새로운", " 아이디어", "\n2. 버려질 줄", " 계속"]
+
+    res = await client.post(
+        f"/projects/{project.id}/nodes?stream=true",
+        json={"ai_prompt": "주제", "parent_id": project.root_id, "depth": 1},
+        headers=project.headers,
+    )
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(res.text)
+    assert [e for e, _ in events] == ["delta", "delta", "node"]
+    assert "".join(d["text"] for e, d in events if e == "delta") == "1. 새로운 아이디어"
+    node = events[-1][1][0]
+    assert node["content"] == "새로운 아이디어"
+    assert node["parent_id"] == project.root_id
+
+    # 줄바꿈이 든 조각에서 멈추고 업스트림을 닫음 (뒤 조각은 읽지 않음)
+    stream = fake_llm.streams[0]
+    assert stream.consumed == 3 and stream.closed
+
+    saved = (await db.execute(select(Node).where(Node.id == node["id"]))).scalar_one()
+    assert saved.state == NodeStateEnum.GHOST
+    assert saved.content == "새로운 아이디어"
+
+
+async def test_stream_error_event_persists_nothing(client, db, project, fake_llm):
+    fake_llm.error = RuntimeError("upstream down")
+
+    res = await client.post(
+        f"/projects/{project.id}/nodes?stream=true",
+        json={"ai_prompt": "주제", "parent_id": project.root_id, "depth": 1},
+        headers=project.headers,
+    )
+    assert _events(res.text) == [("error", {"status": 500, "detail": "upstream down"})]
+    nodes = await db.execute(select(Node.id).where(Node.project_id == project.id))
+    assert nodes.scalars().all() == [project.root_id]
+
+
+async def test_stream_uses_cache_and_counts_one_miss(client, project, fake_llm):
+    fake_llm.chunks = ["1. 캐시될 아이디어\n"]
+    before = suggestion_cache.stats()
+
+    for _ in range(2):
+        res = await client.post(
+            f"/projects/{project.id}/nodes?stream=true",
+            json={"ai_prompt": "같은 주제", "parent_id": project.root_id, "depth": 1},
+            headers=project.headers,
+        )
+        assert [e for e, _ in _events(res.text)] == ["delta", "node"]
+    # 비스트리밍 경로도 스트림이 채운 캐시를 씀
+    res = await client.post(
+        f"/projects/{project.id}/nodes",
+        json={"ai_prompt": "같은 주제", "parent_id": project.root_id, "depth": 1},
+        headers=project.headers,
+    )
+    assert res.json()[0]["content"] == "캐시될 아이디어"
+
+    after = suggestion_cache.stats()
+    assert fake_llm.calls == 1
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 2
+
+
+async def test_stream_joins_inflight_generation(fake_llm):
+    fake_llm.delay = 0.1
+    before = suggestion_cache.stats()
+
+    pending = asyncio.create_task(ai.generate_ideas("주제"))
+    await asyncio.sleep(0.01)
+    streamed = [delta async for delta in ai.stream_completion("주제")]
+
+    assert streamed == ["1. 아이디어"]
+    assert await pending == ["아이디어"]
+    after = suggestion_cache.stats()
+    assert fake_llm.calls == 1                            # 스트림은 진행 중인 호출을 공유
+    assert after["misses"] - before["misses"] == 1
+    assert after["coalesced"] - before["coalesced"] == 1
+
+
+async def test_generate_many_waits_past_queue_timeout(fake_llm, monkeypatch):
+    monkeypatch.setattr(ai, "_limiter", asyncio.Semaphore(1))
+    monkeypatch.setattr(ai, "AI_QUEUE_TIMEOUT", 0.01)
+    monkeypatch.setattr(ai, "AI_BATCH_CONCURRENCY", 1)
+    fake_llm.delay = 0.02
+
+    outcomes = await ai.generate_many([f"주제 {i}" for i in range(5)])
+    assert outcomes == [["아이디어"]] * 5   # 단건이었다면 두 번째부터 503
+    assert fake_llm.calls == 5
+
+
+async def test_expand_reports_failed_parents(client, db, project, fake_llm):
+    from app.utils.tree import link_node
+
+    parents = [Node(project_id=project.id, parent_id=project.root_id, content=content,
+                    state=NodeStateEnum.ACTIVE, depth=1, order_index=i, pos_x=0.0, pos_y=0.0)
+               for i, content in enumerate(["정상", "실패"])]
+    db.add_all(parents)
+    await db.flush()
+    for parent in parents:
+        await link_node(db, parent.id, project.root_id)
+    await db.commit()
+    fake_llm.error = HTTPException(status_code=504, detail="AI generation timed out")
+    fake_llm.fail_on = "실패"
+
+    res = await client.post(
+        f"/projects/{project.id}/nodes/expand",
+        json={"parent_ids": [p.id for p in parents]},
+        headers=project.headers,
+    )
+    assert res.status_code == 207, res.text
+    body = res.json()
+    assert [n["parent_id"] for n in body["nodes"]] == [parents[0].id]
+    assert body["failed"] == [{"parent_id": parents[1].id, "status": 504, "detail": "AI generation timed out"}]
+
+
+async def test_expand_caps_parent_count(client, project):
+    from app.models.node import MAX_EXPAND_PARENTS
+
+    res = await client.post(
+        f"/projects/{project.id}/nodes/expand",
+        json={"parent_ids": list(range(MAX_EXPAND_PARENTS + 1))},
+        headers=project.headers,
+    )
+    assert res.status_code == 422
@@ -0,0 +1,64 @@
+# backend/tests/test_counters.py
+"""
+비정규화 카운터: 커밋 직전 반영, 롤백 시 폐기, 동시 생성이 project 행 잠금에 줄 서지 않음.
+"""
+
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.project import Project
+from app.db.models.tag import Tag
+from app.utils.counters import bump_project, bump_tags, reconcile
+
+
+async def _counts(db, project_id):
+    row = (await db.execute(
+        select(Project.node_count, Project.tag_count).where(Project.id == project_id)
+        .execution_options(populate_existing=True)
+    )).one()
+    return tuple(row)
+
+
+async def test_create_endpoints_keep_counters_exact(client, db, project):
+    for i in range(3):
+        res = await client.post(
+            f"/projects/{project.id}/nodes",
+            json={"content": f"n{i}", "parent_id": project.root_id, "depth": 1},
+            headers=project.headers,
+        )
+        assert res.status_code == 201, res.text
+    res = await client.post(f"/projects/{project.id}/tags", json={"name": "t"}, headers=project.headers)
+    assert res.status_code == 201, res.text
+
+    assert await _counts(db, project.id) == (4, 1)
+    assert await reconcile(db, project.id) == {"projects": [], "tags": [], "touched_projects": []}
+    await db.rollback()
+
+
+async def test_rollback_discards_pending_deltas(db_engine, project):
+    async with AsyncSession(db_engine) as session:
+        await bump_project(session, project.id, nodes=5)
+        await session.rollback()
+        await session.commit()  # 새 트랜잭션: 버려진 증감량이 반영되면 안 됨
+        assert await _counts(session, project.id) == (1, 0)
+
+
+async def test_concurrent_creates_do_not_wait_on_project_row(db_engine, project):
+    async with AsyncSession(db_engine) as first, AsyncSession(db_engine) as second:
+        tag = Tag(project_id=project.id, name="slow")
+        first.add(tag)
+        await first.flush()                         # 첫 트랜잭션은 열린 채로 진행 중
+        await bump_project(first, project.id, tags=1)
+        await bump_tags(first, {tag.id: 0})
+
+        async def _create_other():
+            second.add(Tag(project_id=project.id, name="fast"))
+            await bump_project(second, project.id, tags=1)
+            await second.commit()
+
+        await asyncio.wait_for(_create_other(), timeout=2)  # 첫 트랜잭션 커밋을 기다리지 않음
+
+        await first.commit()
+        assert await _counts(second, project.id) == (1, 2)
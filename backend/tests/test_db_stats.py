@@ -0,0 +1,53 @@
+# backend/tests/test_db_stats.py
+"""
+쿼리 계측 훅: 요청별 집계, 리스너(느린 쿼리 로그) 공유, 실패한 실행의 시작 시각 정리.
+"""
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.db import stats
+from app.db.slow_queries import SlowQueryLog
+
+
+@pytest.fixture
+def instrumented(db_engine, monkeypatch):
+    monkeypatch.setattr(stats, "_listeners", [])
+    stats.install(db_engine.sync_engine)
+    return db_engine
+
+
+async def test_failed_execute_does_not_leak_start_time(instrumented):
+    async with instrumented.connect() as conn:
+        with pytest.raises(DBAPIError):
+            await conn.exec_driver_sql("SELECT * FROM no_such_table")
+        await conn.rollback()
+        await conn.exec_driver_sql("SELECT 1")
+        assert conn.info.get("query_start") == []
+
+
+async def test_request_stats_and_listeners_share_one_timing(instrumented):
+    seen = []
+    stats.add_listener(lambda statement, parameters, executemany, elapsed: seen.append((statement, elapsed)))
+
+    current = stats.begin_request("GET /test")
+    async with instrumented.connect() as conn:
+        await conn.exec_driver_sql("SELECT pg_sleep(0.02)")
+    assert current.queries == 1
+    assert [s for s, _ in seen] == ["SELECT pg_sleep(0.02)"]
+    assert seen[0][1] == pytest.approx(current.db_time)
+    assert seen[0][1] >= 0.02
+
+
+async def test_slow_query_log_records_through_stats_hook(instrumented):
+    log = SlowQueryLog(threshold_ms=10, explain=False, max_entries=10)
+    log.install(instrumented)
+
+    stats.begin_request("GET /slow")
+    async with instrumented.connect() as conn:
+        await conn.exec_driver_sql("SELECT pg_sleep(0.02)")
+        await conn.exec_driver_sql("SELECT 1")
+
+    [entry] = log.snapshot()
+    assert entry["count"] == 1
+    assert entry["routes"] == {"GET /slow": 1}
@@ -0,0 +1,52 @@
+# backend/tests/test_debug.py
+"""
+/_debug 엔드포인트 접근 제어: ADMIN_USER_IDS 에 있는 사용자만 허용.
+"""
+
+import httpx
+import pytest
+
+from app.core import security
+from app.core.security import create_access_token
+from app.main import app
+
+# DB 를 쓰지 않는 통계 엔드포인트만 (GET)
+STATS_PATHS = ["/_debug/ai-cache", "/_debug/ai-jobs", "/_debug/positions", "/_debug/membership-cache",
+               "/_debug/db", "/_debug/traces", "/_debug/slow-queries", "/_debug/counters",
+               "/_debug/summary-cache", "/_debug/ws"]
+
+
+@pytest.fixture
+async def api():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
+def _auth(uid: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(uid)}"}
+
+
+async def test_debug_requires_token(api):
+    res = await api.get("/_debug/ai-cache")
+    assert res.status_code == 401
+
+
+@pytest.mark.parametrize("path", STATS_PATHS)
+async def test_debug_rejects_non_admin(api, monkeypatch, path):
+    monkeypatch.setattr(security, "ADMIN_USER_IDS", frozenset({"1"}))
+    res = await api.get(path, headers=_auth("2"))
+    assert res.status_code == 403
+    assert res.json()["detail"] == "Admin only"
+
+
+async def test_debug_mutations_reject_non_admin(api, monkeypatch):
+    monkeypatch.setattr(security, "ADMIN_USER_IDS", frozenset())
+    assert (await api.delete("/_debug/slow-queries", headers=_auth("1"))).status_code == 403
+    assert (await api.post("/_debug/counters/reconcile", headers=_auth("1"))).status_code == 403
+
+
+@pytest.mark.parametrize("path", STATS_PATHS)
+async def test_debug_allows_admin(api, monkeypatch, path):
+    monkeypatch.setattr(security, "ADMIN_USER_IDS", frozenset({"1"}))
+    res = await api.get(path, headers=_auth("1"))
+    assert res.status_code == 200, res.text
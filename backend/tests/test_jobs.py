@@ -0,0 +1,91 @@
+# backend/tests/test_jobs.py
+"""
+AI 작업 큐: 실패/취소 집계, 브로드캐스트 실패 로깅, 종료 시 남은 작업 처리.
+"""
+
+import asyncio
+import logging
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils import jobs
+from app.utils.jobs import JobQueue
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    messages = []
+
+    async def _broadcast(project_id, message):
+        messages.append(message)
+
+    monkeypatch.setattr(jobs, "broadcast", _broadcast)
+    return messages
+
+
+async def _ok(value):
+    return value
+
+
+async def _slow(seconds):
+    await asyncio.sleep(seconds)
+    return "late"
+
+
+async def test_failed_job_is_counted_and_broadcast(sent):
+    async def _boom():
+        raise RuntimeError("boom")
+
+    queue = JobQueue(workers=1, max_queue=10, keep_finished=10)
+    await queue.start()
+    job = queue.submit(1, "test", _boom)
+    await queue.stop()
+
+    assert (job.status, job.error) == ("failed", "boom")
+    assert queue.stats()["failed"] == 1
+    assert sent[0]["type"] == "job:failed"
+
+
+async def test_stop_drains_queued_jobs(sent):
+    queue = JobQueue(workers=1, max_queue=10, keep_finished=10)
+    await queue.start()
+    submitted = [queue.submit(1, "test", _ok, i) for i in range(3)]
+    await queue.stop(drain_timeout=1)
+
+    assert [j.status for j in submitted] == ["done"] * 3
+    assert [j.result for j in submitted] == [0, 1, 2]
+    assert queue.stats()["completed"] == 3
+
+
+async def test_stop_after_timeout_fails_leftover_jobs(sent):
+    queue = JobQueue(workers=1, max_queue=10, keep_finished=10)
+    await queue.start()
+    running = queue.submit(1, "test", _slow, 5)
+    waiting = queue.submit(1, "test", _ok, 1)
+    await asyncio.sleep(0.01)
+    await queue.stop(drain_timeout=0.05)
+
+    assert (running.status, running.error) == ("failed", "cancelled")
+    assert (waiting.status, waiting.error) == ("failed", "shutdown")
+    assert queue.stats()["failed"] == 2
+
+    with pytest.raises(HTTPException) as exc:
+        queue.submit(1, "test", _ok, 2)
+    assert exc.value.status_code == 503
+
+
+async def test_broadcast_error_is_logged(monkeypatch, caplog):
+    async def _broken(project_id, message):
+        raise RuntimeError("ws down")
+
+    monkeypatch.setattr(jobs, "broadcast", _broken)
+    monkeypatch.setattr(jobs.logger, "disabled", False)  # alembic fileConfig 가 기존 로거를 끄므로
+    queue = JobQueue(workers=1, max_queue=10, keep_finished=10)
+    await queue.start()
+    with caplog.at_level(logging.ERROR, logger=jobs.__name__):
+        job = queue.submit(1, "test", _ok, 1)
+        await queue.stop()
+
+    assert job.status == "done"
+    assert f"job {job.id} (test) broadcast failed" in caplog.text
@@ -0,0 +1,40 @@
+# backend/tests/test_membership.py
+"""
+ensure_member / ensure_owner 와 멤버십 캐시.
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app.db.models.project_user_role import RoleType
+from app.utils.helpers import ensure_member, ensure_owner, membership_cache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    membership_cache.clear()  # 테스트마다 id 가 다시 1부터 시작하므로
+
+
+async def test_ensure_member_returns_role_and_caches(db, project):
+    assert await ensure_member(project.user_id, project.id, db) == RoleType.OWNER
+    # 두 번째 호출은 캐시에서: 세션을 쓰지 않음
+    assert await ensure_member(project.user_id, project.id, None) == RoleType.OWNER
+
+
+async def test_ensure_member_rejects_non_member(db, make_project):
+    mine = await make_project()
+    other = await make_project()
+    with pytest.raises(HTTPException) as exc:
+        await ensure_member(other.user_id, mine.id, db)
+    assert exc.value.status_code == 403
+
+
+async def test_invalidate_drops_cached_role(db, project):
+    await ensure_owner(project.user_id, project.id, db, load_project=False)
+    misses = membership_cache.stats()["misses"]
+    await ensure_owner(project.user_id, project.id, db, load_project=False)
+    assert membership_cache.stats()["misses"] == misses
+
+    membership_cache.invalidate(project.id)
+    await ensure_owner(project.user_id, project.id, db, load_project=False)
+    assert membership_cache.stats()["misses"] == misses + 2  # 프로젝트 생존 여부 + 역할 다시 조회
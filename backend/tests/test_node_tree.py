@@ -0,0 +1,44 @@
+# backend/tests/test_node_tree.py
+"""
+노드 생성 경로의 closure table 유지 검사.
+"""
+
+from sqlalchemy import select
+
+from app.db.models.node import Node
+from app.db.models.node_closure import NodeClosure
+from app.utils.tree import get_ancestor_node_ids
+
+
+async def test_create_child_links_ancestors(client, db, project):
+    res = await client.post(
+        f"/projects/{project.id}/nodes",
+        json={"content": "child", "parent_id": project.root_id, "depth": 1},
+        headers=project.headers,
+    )
+    assert res.status_code == 201, res.text
+    child_id = res.json()[0]["id"]
+
+    assert await get_ancestor_node_ids(child_id, db) == [project.root_id]
+    assert await get_ancestor_node_ids(child_id, db, include_self=True) == [project.root_id, child_id]
+
+
+async def test_create_rejects_parent_from_other_project(client, db, make_project):
+    mine = await make_project()
+    other = await make_project()
+
+    res = await client.post(
+        f"/projects/{mine.id}/nodes",
+        json={"content": "child", "parent_id": other.root_id, "depth": 1},
+        headers=mine.headers,
+    )
+    assert res.status_code == 404
+    assert res.json()["detail"] == "Parent node not found"
+
+    # 노드도, 다른 프로젝트 루트를 조상으로 하는 closure 행도 생기지 않아야 함
+    nodes = await db.execute(select(Node.id).where(Node.project_id == mine.id))
+    assert nodes.scalars().all() == [mine.root_id]
+    under_other = await db.execute(
+        select(NodeClosure.descendant_id).where(NodeClosure.ancestor_id == other.root_id)
+    )
+    assert under_other.scalars().all() == [other.root_id]
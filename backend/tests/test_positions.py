@@ -0,0 +1,113 @@
+# backend/tests/test_positions.py
+"""
+위치 쓰기 버퍼: 직접 쓰기와 flush 의 순서 보장, 프로젝트별 잠금 정리,
+백그라운드 flush 실패 기록, 노드 수정 응답/delta 의 최신 위치.
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.db.models.node import Node
+from app.routers import nodes
+from app.utils import positions
+from app.utils.positions import PositionBuffer, position_buffer
+
+
+async def test_locks_are_pruned_when_idle():
+    buffer = PositionBuffer(interval=1.0, idle=0.25)
+
+    assert await buffer.flush(1) == 0
+    async with buffer.direct_write(2, [10]):
+        assert list(buffer._locks) == [2]
+    assert buffer._locks == {}
+
+    # 기다리는 쪽이 있는 동안에는 같은 잠금을 공유
+    order = []
+
+    async def _hold(tag):
+        async with buffer.direct_write(3, [tag]):
+            order.append(tag)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(_hold(1), _hold(2), _hold(3))
+    assert order == [1, 2, 3]
+    assert buffer._locks == {}
+
+
+async def test_discard_drops_drained_project():
+    buffer = PositionBuffer(interval=1.0, idle=0.25)
+    buffer.put(1, 10, 1.0, 2.0)
+    buffer.discard(1, [10])
+    assert buffer.stats()["pending_projects"] == 0
+    assert buffer._first_put == {} and buffer._last_put == {}
+
+
+async def test_direct_write_waits_for_inflight_flush(client, db, project, monkeypatch):
+    real_update = positions.bulk_update_positions
+    started = asyncio.Event()
+
+    async def _slow_update(session, project_id, rows):
+        started.set()
+        await asyncio.sleep(0.1)  # flush 가 예전 값을 들고 있는 동안 직접 쓰기가 끼어들도록
+        return await real_update(session, project_id, rows)
+
+    monkeypatch.setattr(positions, "bulk_update_positions", _slow_update)
+    position_buffer.put(project.id, project.root_id, 1.0, 1.0)
+    flushing = asyncio.create_task(position_buffer.flush(project.id))
+    await started.wait()
+
+    res = await client.patch(
+        f"/projects/{project.id}/nodes/positions",
+        json={"positions": [{"node_id": project.root_id, "pos_x": 9.0, "pos_y": 9.0}]},
+        headers=project.headers,
+    )
+    assert res.status_code == 200, res.text
+    await flushing
+
+    pos = (await db.execute(select(Node.pos_x, Node.pos_y).where(Node.id == project.root_id))).one()
+    assert tuple(pos) == (9.0, 9.0)
+    assert position_buffer._locks == {}
+
+
+async def test_background_flush_failure_is_logged_and_counted(monkeypatch, caplog):
+    buffer = PositionBuffer(interval=0.02, idle=0.01)
+    monkeypatch.setattr(positions.logger, "disabled", False)  # alembic fileConfig 가 끈 경우 대비
+
+    async def _broken(session, project_id, rows):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(positions, "bulk_update_positions", _broken)
+    buffer.put(1, 10, 1.0, 2.0)
+    with caplog.at_level(logging.ERROR, logger=positions.logger.name):
+        await buffer.start()
+        await asyncio.sleep(0.05)
+        buffer._task.cancel()
+        await asyncio.gather(buffer._task, return_exceptions=True)
+
+    assert buffer.stats()["flush_errors"] >= 1
+    assert buffer.pending(1, 10) == (1.0, 2.0)   # 값은 재시도를 위해 남아 있음
+    assert "position flush for project 1 failed" in caplog.text
+
+
+async def test_node_update_carries_buffered_position(client, project, monkeypatch):
+    sent = []
+
+    async def _record(project_id, kind, payload):
+        sent.append((kind, payload))
+
+    monkeypatch.setattr(nodes, "emit_delta", _record)
+    position_buffer.put(project.id, project.root_id, 5.0, 6.0)   # 드래그 위치가 아직 버퍼에만 있음
+
+    res = await client.patch(
+        f"/projects/{project.id}/nodes/{project.root_id}",
+        json={"content": "바뀐 내용"},
+        headers=project.headers,
+    )
+    assert res.status_code == 200, res.text
+    assert (res.json()["pos_x"], res.json()["pos_y"]) == (5.0, 6.0)
+    kind, payload = sent[-1]
+    assert kind == "node:update"
+    assert (payload["node"]["pos_x"], payload["node"]["pos_y"]) == (5.0, 6.0)
+    assert payload["node"]["content"] == "바뀐 내용"
@@ -0,0 +1,113 @@
+# backend/tests/test_query_plans.py
+"""
+라우터의 hot path 조회가 인덱스를 탈 수 있는지 EXPLAIN 으로 확인하는 회귀 테스트.
+
+시드 데이터를 넣고 ANALYZE 한 뒤 enable_seqscan = off 로 계획을 세웁니다.
+이 설정에서도 Seq Scan 이 나오면 그 접근 경로에 쓸 수 있는 인덱스가 없다는 뜻입니다
+(작은 테이블에서 planner 가 일부러 seq scan 을 고르는 경우와 구분하기 위함).
+또한 각 조회가 기대한 인덱스를 쓰는지 확인합니다. Postgres 는 선두 컬럼이 다른 복합 인덱스
+(예: tag_node PK(tag_id, node_id))에도 node_id 조건을 걸 수 있는데, 이 경우 인덱스 전체를 훑으므로
+Seq Scan 과 다를 바 없습니다.
+"""
+
+import json
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Set, Tuple
+
+from sqlalchemy import select, insert, text
+from sqlalchemy.dialects import postgresql
+
+from app.db.models.node import Node, NodeStateEnum
+from app.db.models.project import Project
+from app.db.models.project_user_role import ProjectUserRole
+from app.db.models.tag import Tag
+from app.db.models.tag_node import TagNode
+from app.db.models.tag_summary import TagSummary
+from app.db.models.vote import Vote
+from app.utils.tree import ancestor_select, subtree_select
+
+SEED_NODES = 2000
+SEED_TAGS = 20
+
+# (이름, ctx → SELECT, 써야 하는 인덱스) : 라우터/유틸이 실제로 쓰는 접근 경로
+HOT_QUERIES: List[Tuple[str, Callable, Set[str]]] = [
+    ("node by project", lambda c: select(Node.id).where(Node.project_id == c.project_id),
+     {"ix_node_project_id"}),
+    ("node children", lambda c: select(Node.id).where(Node.parent_id == c.node_id),
+     {"ix_node_parent_id"}),
+    ("active root check", lambda c: select(Node.id).where(
+        Node.project_id == c.project_id, Node.parent_id.is_(None), Node.state == NodeStateEnum.ACTIVE,
+    ), {"ix_node_project_active_root"}),
+    ("active project", lambda c: select(Project.id).where(
+        Project.id == c.project_id, Project.is_deleted.is_(False),
+    ), {"project_pkey", "ix_project_active"}),
+    ("tags by project", lambda c: select(Tag.id).where(Tag.project_id == c.project_id),
+     {"ix_tag_project_id"}),
+    ("tags of node", lambda c: select(TagNode.tag_id).where(TagNode.node_id == c.node_id),
+     {"ix_tag_node_node_id"}),
+    ("tag summary by tag", lambda c: select(TagSummary.id).where(TagSummary.tag_id == c.tag_id),
+     {"ix_tag_summary_tag_id"}),
+    ("votes by tag summary", lambda c: select(Vote.id).where(Vote.tag_summary_id == c.summary_id),
+     {"vote_tag_summary_id_voter_id_key"}),
+    ("projects of user", lambda c: select(ProjectUserRole.project_id).where(ProjectUserRole.user_id == c.user_id),
+     {"ix_project_user_role_user_id"}),
+    ("subtree", lambda c: subtree_select(c.node_id), {"node_closure_pkey"}),
+    ("ancestors", lambda c: ancestor_select(c.node_id), {"ix_node_closure_descendant_depth"}),
+]
+
+
+def _scans(plan: Dict) -> Iterator[Tuple[str, str]]:
+    """
+    계획 트리의 스캔 노드를 (종류, 인덱스 이름 또는 테이블 이름) 으로 나열합니다.
+    """
+    node_type = plan.get("Node Type", "")
+    if node_type == "Seq Scan":
+        yield node_type, plan.get("Relation Name", "?")
+    elif "Index Name" in plan:
+        yield node_type, plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from _scans(child)
+
+
+async def _seed(db, project, seed_tree) -> SimpleNamespace:
+    await seed_tree(project.id, project.root_id, SEED_NODES)
+    tag_ids = (await db.execute(
+        insert(Tag).returning(Tag.id),
+        [dict(project_id=project.id, name=f"t{i}") for i in range(SEED_TAGS)],
+    )).scalars().all()
+    node_ids = (await db.execute(select(Node.id).where(Node.project_id == project.id))).scalars().all()
+    await db.execute(insert(TagNode), [
+        dict(tag_id=tag_ids[i % SEED_TAGS], node_id=nid) for i, nid in enumerate(node_ids)
+    ])
+    summary_ids = (await db.execute(
+        insert(TagSummary).returning(TagSummary.id),
+        [dict(tag_id=tid, summary_text="s") for tid in tag_ids],
+    )).scalars().all()
+    await db.execute(insert(Vote), [dict(tag_summary_id=sid, voter_id=project.user_id) for sid in summary_ids])
+    await db.commit()
+    await db.execute(text("ANALYZE"))
+    return SimpleNamespace(
+        project_id=project.id, user_id=project.user_id, node_id=node_ids[len(node_ids) // 2],
+        tag_id=tag_ids[0], summary_id=summary_ids[0],
+    )
+
+
+async def test_hot_queries_use_indexes(db, project, seed_tree):
+    ctx = await _seed(db, project, seed_tree)
+
+    offenders = []
+    await db.execute(text("SET LOCAL enable_seqscan = off"))  # 이 트랜잭션에만 적용
+    for name, build, expected in HOT_QUERIES:
+        sql = str(build(ctx).compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        raw = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar_one()
+        plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+        scans = set(_scans(plan))
+        seq = sorted(target for kind, target in scans if kind == "Seq Scan")
+        used = {target for kind, target in scans if kind != "Seq Scan"}
+        if seq:
+            offenders.append(f"{name}: Seq Scan on {', '.join(seq)}")
+        elif not used & expected:
+            offenders.append(f"{name}: expected one of {sorted(expected)}, plan used {sorted(used)}")
+    await db.rollback()
+
+    assert not offenders, "인덱스 없이 순차 스캔하는 조회:\n" + "\n".join(offenders)
@@ -0,0 +1,51 @@
+# backend/tests/test_slow_queries.py
+"""
+느린 쿼리 로그: 바인드 파라미터 가림, EXPLAIN ANALYZE 대상 선별.
+"""
+
+import pytest
+
+from app.db import slow_queries, stats
+from app.db.slow_queries import SlowQueryLog, explain_options, redact
+
+
+@pytest.mark.parametrize("statement, analyze", [
+    ("SELECT id FROM node WHERE id = $1", True),
+    ("  select count(*) from tag", True),
+    ("SELECT id FROM project WHERE id = $1 FOR UPDATE", False),
+    ("SELECT id FROM node FOR NO KEY UPDATE", False),
+    ("SELECT id FROM node FOR SHARE", False),
+    ("WITH t AS (SELECT 1) SELECT * FROM t", False),
+    ("WITH d AS (DELETE FROM node WHERE id = $1 RETURNING id) SELECT * FROM d", False),
+    ("UPDATE node SET content = $1 WHERE id = $2", False),
+])
+def test_only_plain_selects_are_analyzed(statement, analyze):
+    assert ("ANALYZE" in explain_options(statement)) is analyze
+
+
+def test_redact_hides_strings_keeps_scalars():
+    params = (42, "$2b$12$secrethash", b"\x00\x01", None, True, ["token-abc", 7], {"email": "a@b.c"})
+    assert redact(params) == [42, "<str:17>", "<bytes:2>", None, True, ["<str:9>", 7], {"email": "<str:5>"}]
+
+
+def test_samples_store_redacted_params(monkeypatch):
+    monkeypatch.setattr(slow_queries, "DB_SLOW_QUERY_RAW_PARAMS", False)
+    log = SlowQueryLog(threshold_ms=0, explain=False, max_entries=10)
+    log.record("UPDATE app_user SET pw_hash = $1 WHERE id = $2", ("$2b$12$secrethash", 3), 250.0, "PATCH /users/me")
+
+    [sample] = log.snapshot()[0]["samples"]
+    assert "secrethash" not in sample["params"]
+    assert sample["params"] == "['<str:17>', 3]"
+
+
+async def test_explain_analyzes_select_but_not_cte(db_engine, monkeypatch):
+    monkeypatch.setattr(stats, "_listeners", [])  # install() 이 붙이는 리스너를 테스트 밖으로 남기지 않음
+    log = SlowQueryLog(threshold_ms=0, explain=True, max_entries=10)
+    log.install(db_engine)
+
+    select_entry, cte_entry = {}, {}
+    await log._explain(select_entry, "SELECT id FROM node WHERE id = $1", (1,))
+    await log._explain(cte_entry, "WITH d AS (DELETE FROM node WHERE id = $1 RETURNING id) SELECT * FROM d", (1,))
+
+    assert "Actual Total Time" in select_entry["explain"][0]["Plan"]
+    assert "Actual Total Time" not in cte_entry["explain"][0]["Plan"]
@@ -0,0 +1,65 @@
+# backend/tests/test_subtree_benchmark.py
+"""
+서브트리 조회 벤치마크: get_descendant_node_ids (closure table, 왕복 1회) 와
+예전 방식(노드마다 SELECT id FROM node WHERE parent_id = ?)의 지연 시간을 서브트리 크기별로 비교합니다.
+
+    TEST_DATABASE_URL=postgresql+asyncpg://... pytest -m benchmark -s backend/tests/test_subtree_benchmark.py
+
+기본 실행(pytest)에서는 제외되고 -m benchmark 로만 실행됩니다.
+BENCH_SUBTREE_SIZES 로 크기 목록을 바꿀 수 있습니다 (기본 10,100,1000,5000).
+"""
+
+import os
+import statistics
+import time
+from typing import List
+
+import pytest
+from sqlalchemy import select
+
+from app.db.models.node import Node
+from app.utils.tree import get_descendant_node_ids
+
+SIZES = [int(s) for s in os.getenv("BENCH_SUBTREE_SIZES", "10,100,1000,5000").split(",")]
+REPEAT = int(os.getenv("BENCH_REPEAT", "5"))
+
+pytestmark = pytest.mark.benchmark
+
+
+async def _bfs_descendant_ids(node_id: int, db) -> List[int]:
+    # 이전 구현 (비교용): 방문한 노드마다 자식 조회 한 번
+    result, queue = [], [node_id]
+    while queue:
+        current = queue.pop(0)
+        result.append(current)
+        rows = await db.execute(select(Node.id).where(Node.parent_id == current))
+        queue.extend(row[0] for row in rows.all())
+    return result
+
+
+async def _measure(fn, *args) -> List[float]:
+    await fn(*args)  # warm-up
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        await fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+@pytest.mark.parametrize("size", SIZES)
+async def test_subtree_latency_by_size(db, project, seed_tree, size, capsys):
+    await seed_tree(project.id, project.root_id, size)
+
+    ids = await get_descendant_node_ids(project.root_id, db)
+    assert len(ids) == size + 1  # 루트 포함
+    assert sorted(ids) == sorted(await _bfs_descendant_ids(project.root_id, db))
+
+    cte = await _measure(get_descendant_node_ids, project.root_id, db)
+    bfs = await _measure(_bfs_descendant_ids, project.root_id, db)
+    with capsys.disabled():
+        print(
+            f"\nsubtree size={size:>6}  closure median={statistics.median(cte):8.2f}ms"
+            f"  per-node BFS median={statistics.median(bfs):8.2f}ms"
+            f"  speedup={statistics.median(bfs) / max(statistics.median(cte), 1e-6):6.1f}x"
+        )
@@ -0,0 +1,116 @@
+# backend/tests/test_ws.py
+"""
+WebSocket: 앱 하트비트는 참여한 연결에만 적용, 클라이언트 zstd 프레임 거절,
+프로젝트 멤버가 아니면 4403 으로 차단.
+"""
+
+import asyncio
+import json
+import time
+
+import msgpack
+import pytest
+import zstandard
+
+from app.utils import ws_codec, ws_manager
+from app.utils.ws_manager import Connection
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        self.sent.append(ws_codec.decode(data))
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = code
+
+
+@pytest.fixture
+def register(monkeypatch):
+    monkeypatch.setattr(ws_manager, "WS_CONNECTIONS", ws_manager.defaultdict(dict))
+    monkeypatch.setattr(ws_manager, "WS_PING_INTERVAL", 20.0)
+
+    def _register(heartbeat: bool) -> Connection:
+        ws = FakeWebSocket()
+        conn = Connection("1", ws, 16, "drop_oldest", heartbeat=heartbeat)
+        ws_manager.WS_CONNECTIONS["1"][ws] = conn
+        return conn
+
+    return _register
+
+
+async def test_legacy_client_is_never_pinged_or_reaped(register):
+    legacy = register(heartbeat=False)
+    legacy.ping_sent = None
+
+    ws_manager.sweep(send_pings=True)
+    assert legacy.ping_sent is None and legacy.depth == 0
+    assert legacy.receive_timeout is None
+
+    legacy.last_seen = time.monotonic() - 3600   # 오래 조용해도 유지
+    ws_manager.sweep(send_pings=True)
+    assert not legacy.closed
+
+
+async def test_heartbeat_client_is_pinged_and_reaped_without_pong(register):
+    opted = register(heartbeat=True)
+    assert opted.receive_timeout == ws_manager.WS_RECEIVE_TIMEOUT
+
+    ws_manager.sweep(send_pings=True)
+    assert opted.ping_sent is not None and opted.depth == 1
+
+    opted.on_receive({"type": "websocket.receive", "text": json.dumps({"type": "pong", "id": opted.ping_id})})
+    assert opted.ping_sent is None and opted.rtt is not None
+
+    ws_manager.sweep(send_pings=True)
+    opted.ping_sent -= ws_manager.WS_PONG_TIMEOUT + 1
+    ws_manager.sweep(send_pings=False)
+    assert opted.closed
+    await asyncio.sleep(0.01)  # close 프레임 전송 태스크가 돌도록
+    assert opted.ws.closed_with == ws_manager.WS_CLOSE_TIMEOUT
+
+
+def test_decode_rejects_client_zstd_frames():
+    bomb = bytes((ws_codec.FLAG_ZSTD,)) + zstandard.ZstdCompressor().compress(b"\x00" * (64 << 20))
+    assert len(bomb) < 64 << 10
+    with pytest.raises(ValueError, match="compressed frames"):
+        ws_codec.decode(bomb)
+
+    raw = bytes((ws_codec.FLAG_RAW,)) + msgpack.packb({"type": "pong", "id": 1})
+    assert ws_codec.decode(raw) == {"type": "pong", "id": 1}
+
+
+async def test_non_member_is_rejected(client, make_project, monkeypatch):
+    from app.core.security import create_access_token
+    from app.routers import websocket
+
+    owner, outsider = await make_project(), await make_project()
+    connected = []
+
+    async def _connect(project_id, ws, *args, **kwargs):
+        connected.append(project_id)
+        return None
+
+    monkeypatch.setattr(websocket, "connect", _connect)
+
+    async def _open(project_id, user_id):
+        ws = FakeWebSocket()
+        token = create_access_token(str(user_id))
+        await websocket.project_ws(project_id, ws, token=token, since=None, epoch=None,
+                                   encoding=None, heartbeat=False)
+        return ws
+
+    ws = await _open(str(owner.id), outsider.user_id)
+    assert ws.closed_with == ws_manager.WS_CLOSE_FORBIDDEN
+    ws = await _open("not-a-number", owner.user_id)
+    assert ws.closed_with == ws_manager.WS_CLOSE_FORBIDDEN
+    assert connected == []
+
+    ws = await _open(str(owner.id), owner.user_id)   # 멤버는 등록까지 진행
+    assert ws.closed_with is None and connected == [str(owner.id)]